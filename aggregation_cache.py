@@ -0,0 +1,116 @@
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Frames longer than this are sized from a sample instead of a deep scan of every string
+SIZE_SAMPLE_ROWS = 10_000
+
+
+def result_nbytes(result) -> int:
+    """Approximate memory held by a cached aggregation result"""
+    if isinstance(result, pd.DataFrame):
+        rows = len(result)
+        if rows > SIZE_SAMPLE_ROWS:
+            sample = result.iloc[:SIZE_SAMPLE_ROWS].memory_usage(deep=True, index=True).sum()
+            return int(sample * rows / SIZE_SAMPLE_ROWS)
+        return int(result.memory_usage(deep=True, index=True).sum())
+    if isinstance(result, (pd.Series, pd.Index)):
+        if len(result) > SIZE_SAMPLE_ROWS:
+            return int(result[:SIZE_SAMPLE_ROWS].memory_usage(deep=True) * len(result) / SIZE_SAMPLE_ROWS)
+        return int(result.memory_usage(deep=True))
+    if isinstance(result, np.ndarray):
+        return int(result.nbytes)
+    if isinstance(result, (tuple, list)):
+        return sys.getsizeof(result) + sum(result_nbytes(item) for item in result)
+    return sys.getsizeof(result)
+
+
+class AggregationCache:
+    """Process-wide LRU of aggregation results, bounded by their memory size.
+
+    Keys are ``(dataset version, normalized filter state, aggregation spec)``,
+    so a rerun that does not change the data or the filters (a tab switch, an
+    unrelated widget, saving a dashboard) reuses every group-by instead of
+    recomputing it. Results are shared between sessions and must be treated
+    as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, sizeof: Callable = result_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, version: str, filter_state: tuple, spec: tuple, compute: Callable):
+        """Cached result of ``compute()`` for this dataset version, filter state and spec"""
+        key = (version, filter_state, spec)
+        result = self.lookup(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def lookup(self, key: tuple):
+        """The cached result for a full key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, result):
+        size = self.sizeof(result)
+        if size > self.max_bytes:
+            logger.debug(f"Result for {key[2]} ({size} bytes) exceeds the cache size; not cached")
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def scoped(self, version: str, filter_state: tuple = ()) -> Callable:
+        """``aggregate(spec, compute)`` bound to one dataset version and filter state"""
+        return lambda spec, compute: self.get(version, filter_state, spec, compute)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+# Create global instance
+aggregation_cache = AggregationCache(max_bytes=int(os.getenv("AGGREGATION_CACHE_MB", "256")) * 1024 * 1024)
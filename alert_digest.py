@@ -0,0 +1,47 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from alert_engine import AlertEvaluation
+
+
+class AlertDigestQueue:
+    """Collects alert firings per recipient until their digest window closes.
+
+    The window starts with the first firing queued for a recipient; once it
+    has been open ``window_seconds`` every firing collected for that
+    recipient is handed out together so it can go out as a single email.
+    """
+
+    def __init__(self, window_seconds: float = 300, clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, recipient: str, username: str, alert_id: str, rule: Dict,
+            evaluation: AlertEvaluation, triggered_at: str):
+        key = (recipient.strip().lower(), username)
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = {'opened': self.clock(), 'recipient': recipient.strip(), 'items': []}
+            self._pending[key]['items'].append({
+                'alert_id': alert_id, 'rule': rule, 'evaluation': evaluation, 'triggered_at': triggered_at
+            })
+
+    def pop_due(self, force: bool = False) -> List[Tuple[str, str, List[Dict]]]:
+        """Remove and return (recipient, username, items) for every window that has closed"""
+        now = self.clock()
+        due = []
+        with self._lock:
+            for key in list(self._pending):
+                digest = self._pending[key]
+                if force or now - digest['opened'] >= self.window_seconds:
+                    del self._pending[key]
+                    due.append((digest['recipient'], key[1], digest['items']))
+        return due
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(digest['items']) for digest in self._pending.values())
@@ -0,0 +1,395 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import KLLSketch
+from rolling_window import ROLLING_CONDITIONS, ROLLING_OPERATORS, RollingWindow, rolling_condition_met
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_OPERATORS = ('greater_than', 'less_than', 'equals', 'not_equals')
+TREND_OPERATORS = ('increasing', 'decreasing')
+ROW_CONDITIONS = ('threshold', 'anomaly')
+
+
+def _numeric_values(frame: pd.DataFrame, column: str) -> Optional[np.ndarray]:
+    """Column values as float64, or None if the column is missing or not numeric"""
+    if column not in frame.columns:
+        return None
+    series = frame[column]
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+        return None
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def threshold_first_hits(values: np.ndarray, operator: str, thresholds: np.ndarray):
+    """Evaluate many thresholds against one column in a single vectorized pass.
+
+    Returns ``(hit_counts, first_hit_index)`` arrays aligned with
+    ``thresholds``; ``first_hit_index == len(values)`` means no hit. NaN
+    compares like pandas does: never greater, less or equal, always not-equal.
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(len(thresholds), dtype=np.int64), np.zeros(len(thresholds), dtype=np.int64)
+
+    if operator == 'greater_than':
+        clean = np.where(np.isnan(values), -np.inf, values)
+        # The running max is non-decreasing, so the first row above each threshold is a binary search away
+        first = np.searchsorted(np.maximum.accumulate(clean), thresholds, side='right')
+        counts = n - np.searchsorted(np.sort(clean), thresholds, side='right')
+    elif operator == 'less_than':
+        clean = np.where(np.isnan(values), np.inf, values)
+        first = np.searchsorted(-np.minimum.accumulate(clean), -thresholds, side='right')
+        counts = np.searchsorted(np.sort(clean), thresholds, side='left')
+    elif operator in ('equals', 'not_equals'):
+        sorted_values = np.sort(values)
+        equal_counts = (np.searchsorted(sorted_values, thresholds, side='right')
+                        - np.searchsorted(sorted_values, thresholds, side='left'))
+        if operator == 'equals':
+            unique_values, first_positions = np.unique(values, return_index=True)
+            pos = np.minimum(np.searchsorted(unique_values, thresholds), len(unique_values) - 1)
+            first = np.where(unique_values[pos] == thresholds, first_positions[pos], n)
+            counts = equal_counts
+        else:
+            differs = values != values[0]
+            first_other = int(np.argmax(differs)) if differs.any() else n
+            first = np.where(thresholds != values[0], 0, first_other)
+            counts = n - equal_counts
+    else:
+        return np.zeros(len(thresholds), dtype=np.int64), np.full(len(thresholds), n, dtype=np.int64)
+
+    return counts.astype(np.int64), first.astype(np.int64)
+
+
+def threshold_mask(values: np.ndarray, operator: str, threshold: float) -> np.ndarray:
+    """Row-level hit mask for one threshold rule"""
+    if operator == 'greater_than':
+        return values > threshold
+    if operator == 'less_than':
+        return values < threshold
+    if operator == 'equals':
+        return values == threshold
+    if operator == 'not_equals':
+        return values != threshold
+    return np.zeros(len(values), dtype=bool)
+
+
+def _iqr_fences(q1: float, q3: float):
+    iqr = q3 - q1
+    if iqr == 0:
+        return None
+    return float(q1 - 1.5 * iqr), float(q3 + 1.5 * iqr)
+
+
+def iqr_bounds(values: np.ndarray):
+    """1.5 x IQR anomaly bounds, or None when there is too little data or no spread"""
+    clean = values[~np.isnan(values)]
+    if len(clean) < 2:
+        return None
+    q1, q3 = np.percentile(clean, [25, 75])
+    return _iqr_fences(q1, q3)
+
+
+def sketch_iqr_bounds(sketch: KLLSketch):
+    """1.5 x IQR anomaly bounds estimated from a streaming quantile sketch"""
+    if sketch.n < 2:
+        return None
+    q1, q3 = sketch.quantiles([0.25, 0.75])
+    return _iqr_fences(q1, q3)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def series_mask(series: pd.Series, operator: str, value) -> np.ndarray:
+    """Threshold hit mask for columns or values the numeric path cannot handle"""
+    if operator == 'greater_than':
+        return (series > value).to_numpy(dtype=bool)
+    if operator == 'less_than':
+        return (series < value).to_numpy(dtype=bool)
+    if operator == 'equals':
+        return (series == value).to_numpy(dtype=bool)
+    if operator == 'not_equals':
+        return (series != value).to_numpy(dtype=bool)
+    return np.zeros(len(series), dtype=bool)
+
+
+def column_summary(values: np.ndarray) -> Dict:
+    """Summary statistics of a full numeric column, as plain floats"""
+    if len(values) == 0 or np.isnan(values).all():
+        return {'total_records': len(values)}
+    return {
+        'total_records': len(values),
+        'min': float(np.nanmin(values)),
+        'max': float(np.nanmax(values)),
+        'mean': float(np.nanmean(values)),
+        'median': float(np.nanmedian(values)),
+        'latest': float(values[-1])
+    }
+
+
+class AlertEvaluation:
+    """Evidence for one rule firing, computed once and shared by the log, notification and email builders.
+
+    ``hit_mask`` covers the rows the rule was checked against (the sync delta
+    for threshold and anomaly rules); ``triggered_values`` holds at most
+    ``MAX_VALUES`` of the hits as plain Python values. Rolling rules carry
+    their window ``statistic``, size and first/last values in ``window``.
+    """
+
+    MAX_VALUES = 8
+
+    def __init__(self, alert_id: str, rule: Dict, hit_mask: np.ndarray, triggered_values: list,
+                 bounds=None, stats: Dict = None, last_value: float = None, avg_value: float = None,
+                 window: Dict = None):
+        self.alert_id = alert_id
+        self.rule = rule
+        self.hit_mask = hit_mask
+        self.hit_count = int(hit_mask.sum())
+        self.triggered = self.hit_count > 0
+        self.triggered_values = triggered_values
+        self.bounds = bounds
+        self.stats = stats or {}
+        self.last_value = last_value
+        self.avg_value = avg_value
+        self.window = window
+
+    @property
+    def triggered_value(self):
+        """The first value that met the condition"""
+        return self.triggered_values[0] if self.triggered_values else None
+
+    @property
+    def change_percent(self) -> Optional[float]:
+        """Deviation of the latest value from the column mean, for trend rules"""
+        if self.last_value is None or not self.avg_value:
+            return None
+        return (self.last_value - self.avg_value) / self.avg_value * 100
+
+
+class CompiledAlertRules:
+    """A user's active alert rules, grouped for vectorized evaluation.
+
+    Rules are grouped by (column, condition type, operator). Each threshold
+    group compares the column once against the array of its thresholds; all
+    anomaly rules on a column share one set of IQR bounds and all trend
+    rules on a column share one last value and mean. Rolling rules each
+    keep their own window, so every one of them is its own group.
+    """
+
+    def __init__(self, alerts: Dict[str, Dict]):
+        self.rules = {alert_id: alert_config['rule'] for alert_id, alert_config in alerts.items()}
+        self.groups = defaultdict(list)
+        self.unsupported = []
+
+        for alert_id, rule in self.rules.items():
+            condition_type = rule.get('condition_type')
+            operator = rule.get('operator')
+            value = rule.get('value')
+            if condition_type == 'threshold' and operator in THRESHOLD_OPERATORS and isinstance(value, (int, float)):
+                self.groups[(rule.get('column'), 'threshold', operator)].append(alert_id)
+            elif condition_type == 'trend' and operator in TREND_OPERATORS and isinstance(value, (int, float)):
+                self.groups[(rule.get('column'), 'trend', operator)].append(alert_id)
+            elif condition_type == 'anomaly':
+                self.groups[(rule.get('column'), 'anomaly', None)].append(alert_id)
+            elif (condition_type in ROLLING_CONDITIONS and operator in ROLLING_OPERATORS[condition_type]
+                  and isinstance(value, (int, float))):
+                self.groups[(rule.get('column'), condition_type, alert_id)].append(alert_id)
+            else:
+                self.unsupported.append(alert_id)
+
+    def evaluate(self, data: pd.DataFrame, delta: Dict = None, anomaly_bounds: Dict = None,
+                 windows: Dict[str, RollingWindow] = None) -> Dict[str, Dict]:
+        """Evaluate every compiled rule and return a result per alert id.
+
+        Threshold and anomaly rules are checked against the delta rows when a
+        sync delta is given; trend rules always use the full data. Anomaly
+        rules listed in ``anomaly_bounds`` use those bounds, the rest share
+        exact IQR bounds over the full column. Rolling rules are decided by
+        their window in ``windows``. Rules on missing or non-numeric columns,
+        rolling rules without a window and unsupported rules are left out so
+        callers can fall back to per-rule evaluation.
+        """
+        scope = delta['rows'] if delta is not None else data
+        results = {}
+
+        for (column, condition_type, operator), alert_ids in self.groups.items():
+            full_values = _numeric_values(data, column)
+            if full_values is None:
+                continue
+            values = _numeric_values(scope, column) if condition_type in ROW_CONDITIONS else full_values
+            if values is None:
+                continue
+
+            if condition_type == 'threshold':
+                thresholds = np.array([float(self.rules[a]['value']) for a in alert_ids])
+                counts, first = threshold_first_hits(values, operator, thresholds)
+                for i, alert_id in enumerate(alert_ids):
+                    results[alert_id] = self._result(values, counts[i], first[i])
+
+            elif condition_type == 'anomaly':
+                exact_bounds, hits_by_bounds = None, {}
+                for alert_id in alert_ids:
+                    if anomaly_bounds is not None and alert_id in anomaly_bounds:
+                        bounds = anomaly_bounds[alert_id]
+                    else:
+                        if exact_bounds is None:
+                            exact_bounds = (iqr_bounds(full_values),)
+                        bounds = exact_bounds[0]
+                    if bounds is None:
+                        results[alert_id] = self._result(values, 0, len(values))
+                        continue
+                    if bounds not in hits_by_bounds:
+                        outside = (values < bounds[0]) | (values > bounds[1])
+                        count = int(outside.sum())
+                        hits_by_bounds[bounds] = (count, int(np.argmax(outside)) if count else len(values))
+                    count, first = hits_by_bounds[bounds]
+                    results[alert_id] = dict(self._result(values, count, first), bounds=bounds)
+
+            elif condition_type == 'trend':
+                if len(values) < 2:
+                    for alert_id in alert_ids:
+                        results[alert_id] = self._result(values, 0, len(values))
+                    continue
+                last_value = values[-1]
+                avg_value = np.nanmean(values)
+                thresholds = np.array([float(self.rules[a]['value']) for a in alert_ids])
+                if operator == 'increasing':
+                    met = last_value > avg_value * (1 + thresholds / 100)
+                else:
+                    met = last_value < avg_value * (1 - thresholds / 100)
+                for i, alert_id in enumerate(alert_ids):
+                    results[alert_id] = dict(
+                        self._result(values, int(met[i]), len(values) - 1 if met[i] else len(values)),
+                        last_value=last_value,
+                        avg_value=avg_value
+                    )
+
+            elif condition_type in ROLLING_CONDITIONS:
+                alert_id = alert_ids[0]
+                window = (windows or {}).get(alert_id)
+                if window is None:
+                    continue
+                statistic = window.statistic(condition_type)
+                met = bool(rolling_condition_met(self.rules[alert_id], np.array([statistic]))[0])
+                results[alert_id] = dict(
+                    self._result(values, int(met), len(values) - 1 if met else len(values)),
+                    statistic=statistic
+                )
+
+        return results
+
+    @staticmethod
+    def _result(values: np.ndarray, hit_count: int, first_index: int) -> Dict:
+        triggered = int(first_index) < len(values)
+        return {
+            'triggered': triggered,
+            'hit_count': int(hit_count),
+            'first_hit_index': int(first_index) if triggered else None,
+            'first_hit_value': float(values[first_index]) if triggered else None
+        }
+
+    def hit_mask(self, alert_id: str, data: pd.DataFrame, delta: Dict = None, bounds=None,
+                 window: RollingWindow = None) -> Optional[np.ndarray]:
+        """Row-level hit mask for one rule over the rows it is evaluated against"""
+        rule = self.rules[alert_id]
+        column = rule.get('column')
+        condition_type = rule.get('condition_type')
+        scope = delta['rows'] if delta is not None and condition_type in ROW_CONDITIONS else data
+        values = _numeric_values(scope, column)
+        if values is None:
+            return None
+
+        if condition_type == 'threshold':
+            return threshold_mask(values, rule.get('operator'), float(rule.get('value')))
+        if condition_type == 'anomaly':
+            if bounds is None:
+                full_values = _numeric_values(data, column)
+                bounds = iqr_bounds(full_values) if full_values is not None else None
+            if bounds is None:
+                return np.zeros(len(values), dtype=bool)
+            return (values < bounds[0]) | (values > bounds[1])
+        # Trend and rolling rules are decided by the latest row only
+        mask = np.zeros(len(values), dtype=bool)
+        if condition_type in ROLLING_CONDITIONS:
+            if window is not None and len(values):
+                mask[-1] = rolling_condition_met(rule, np.array([window.statistic(condition_type)]))[0]
+        elif len(values) >= 2:
+            last_value, avg_value, threshold = values[-1], np.nanmean(values), float(rule.get('value'))
+            if rule.get('operator') == 'increasing':
+                mask[-1] = last_value > avg_value * (1 + threshold / 100)
+            elif rule.get('operator') == 'decreasing':
+                mask[-1] = last_value < avg_value * (1 - threshold / 100)
+        return mask
+
+    def scoped_mask(self, alert_id: str, data: pd.DataFrame, delta: Dict = None, bounds=None,
+                    window: RollingWindow = None):
+        """The rows a rule is checked against and its hit mask over them.
+
+        Threshold rules on non-numeric columns or values fall back to a pandas
+        comparison; a rule on a missing column gets an empty mask.
+        """
+        rule = self.rules[alert_id]
+        column = rule.get('column')
+        condition_type = rule.get('condition_type')
+        scope = delta['rows'] if delta is not None and condition_type in ROW_CONDITIONS else data
+        if column not in scope.columns:
+            return scope, np.zeros(len(scope), dtype=bool)
+        try:
+            mask = self.hit_mask(alert_id, data, delta, bounds, window)
+        except (TypeError, ValueError):
+            mask = None
+        if mask is None:
+            mask = series_mask(scope[column], rule.get('operator'), rule.get('value')) \
+                if condition_type == 'threshold' else np.zeros(len(scope), dtype=bool)
+        return scope, mask
+
+    def explain(self, alert_id: str, data: pd.DataFrame, delta: Dict = None, bounds=None,
+                stats_cache: Dict = None, window: RollingWindow = None, scoped: tuple = None) -> AlertEvaluation:
+        """Build the shared evidence for one rule.
+
+        ``bounds`` overrides the exact IQR bounds of anomaly rules,
+        ``window`` is a rolling rule's window, ``stats_cache`` lets rules
+        on the same column share one summary and ``scoped`` is the
+        ``(scope, mask)`` pair from ``scoped_mask`` when the caller already has it.
+        """
+        rule = self.rules[alert_id]
+        column = rule.get('column')
+        condition_type = rule.get('condition_type')
+        if column not in data.columns:
+            return AlertEvaluation(alert_id, rule, np.zeros(0, dtype=bool), [])
+
+        full_values = _numeric_values(data, column)
+        if condition_type == 'anomaly' and bounds is None and full_values is not None:
+            bounds = iqr_bounds(full_values)
+        scope, mask = scoped if scoped is not None else self.scoped_mask(alert_id, data, delta, bounds, window)
+
+        hit_positions = np.flatnonzero(mask)[:AlertEvaluation.MAX_VALUES]
+        triggered_values = [_plain(v) for v in scope[column].iloc[hit_positions].tolist()]
+
+        if stats_cache is not None and column in stats_cache:
+            stats = stats_cache[column]
+        else:
+            stats = column_summary(full_values) if full_values is not None else {'total_records': len(data)}
+            if stats_cache is not None:
+                stats_cache[column] = stats
+
+        last_value = avg_value = None
+        if condition_type == 'trend' and full_values is not None and len(full_values):
+            last_value, avg_value = float(full_values[-1]), float(np.nanmean(full_values))
+        window_summary = window.summary(condition_type) if window is not None else None
+        return AlertEvaluation(alert_id, rule, mask, triggered_values, bounds, stats, last_value, avg_value,
+                               window_summary)
+
+
+def compile_user_rules(alerts_config: Dict[str, Dict], username: str) -> CompiledAlertRules:
+    """Compile the active alert rules belonging to one user"""
+    return CompiledAlertRules({
+        alert_id: alert_config for alert_id, alert_config in alerts_config.items()
+        if alert_config['username'] == username and alert_config['is_active']
+    })
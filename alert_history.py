@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import atexit
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    """Serialize NumPy scalars and anything else json does not know about"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class AlertHistoryStore:
+    """Append-only alert firing history.
+
+    Firings are appended as JSON lines to one file per day
+    (``alerts_YYYYMMDD.jsonl``). A SQLite index keyed on (alert_id,
+    timestamp) records the file and byte offset of every line, so a window
+    query reads just the matching lines. Appends go to the OS right away;
+    fsync and the index commit are batched every ``fsync_interval`` seconds
+    or ``batch_size`` firings. Day files older than ``retention_days`` are
+    dropped when the day rolls over.
+    """
+
+    def __init__(self, log_dir: str = "alert_logs", fsync_interval: float = 2.0,
+                 batch_size: int = 100, retention_days: int = 30):
+        self.log_dir = log_dir
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        os.makedirs(log_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_day = None
+        self._pending = []
+        self._last_sync = time.monotonic()
+        self._db = sqlite3.connect(os.path.join(log_dir, "history_index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS firings ("
+            "alert_id TEXT NOT NULL, username TEXT, timestamp TEXT NOT NULL, "
+            "day TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_firings_alert_time ON firings (alert_id, timestamp)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_firings_user_time ON firings (username, timestamp)")
+        self._db.commit()
+        atexit.register(self.close)
+
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.log_dir, f"alerts_{day}.jsonl")
+
+    def _open_day(self, day: str):
+        if self._file_day == day:
+            return
+        if self._file is not None:
+            self._sync_locked()
+            self._file.close()
+        self._file = open(self._day_path(day), 'ab')
+        self._file_day = day
+        self._prune_locked(day)
+
+    def append(self, entry: Dict):
+        """Append one firing; ``entry`` needs ``alert_id`` and an ISO ``timestamp``"""
+        timestamp = entry.setdefault('timestamp', datetime.now().isoformat())
+        line = (json.dumps(entry, separators=(',', ':'), default=_json_default) + "\n").encode()
+        day = timestamp[:10].replace('-', '')
+        with self._lock:
+            self._open_day(day)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._pending.append((entry['alert_id'], entry.get('username'), timestamp, day, offset, len(line)))
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+
+    def flush(self):
+        """fsync appended lines and commit their index rows"""
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if not self._pending:
+            return
+        try:
+            os.fsync(self._file.fileno())
+            self._db.executemany(
+                "INSERT INTO firings (alert_id, username, timestamp, day, offset, length) VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+            self._db.commit()
+            self._pending = []
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Could not persist alert history batch: {e}")
+        self._last_sync = time.monotonic()
+
+    def _prune_locked(self, today: str):
+        if not self.retention_days:
+            return
+        cutoff = (datetime.strptime(today, '%Y%m%d') - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+        for name in os.listdir(self.log_dir):
+            if name.startswith('alerts_') and name.endswith('.jsonl') and name[7:15] < cutoff:
+                try:
+                    os.remove(os.path.join(self.log_dir, name))
+                except OSError as e:
+                    logger.warning(f"Could not remove expired alert history {name}: {e}")
+        try:
+            self._db.execute("DELETE FROM firings WHERE day < ?", (cutoff,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not prune alert history index: {e}")
+
+    def _select(self, query: str, params: tuple) -> List[tuple]:
+        self.flush()
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def firings(self, alert_id: str, start=None, end=None, limit: int = None) -> List[Dict]:
+        """Firings of one rule in [start, end], newest first"""
+        query = "SELECT day, offset, length FROM firings WHERE alert_id = ? AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp DESC"
+        params = (alert_id, _iso(start) or '', _iso(end) or '9999')
+        if limit:
+            query += " LIMIT ?"
+            params += (int(limit),)
+        return self._read_lines(self._select(query, params))
+
+    def count_firings(self, alert_id: str, start=None, end=None) -> int:
+        """Number of firings of one rule in [start, end], answered from the index alone"""
+        rows = self._select(
+            "SELECT COUNT(*) FROM firings WHERE alert_id = ? AND timestamp >= ? AND timestamp <= ?",
+            (alert_id, _iso(start) or '', _iso(end) or '9999')
+        )
+        return rows[0][0]
+
+    def user_firings(self, username: str, start=None, end=None, limit: int = None) -> List[Dict]:
+        """Firings of all of a user's rules in [start, end], newest first"""
+        query = "SELECT day, offset, length FROM firings WHERE username = ? AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp DESC"
+        params = (username, _iso(start) or '', _iso(end) or '9999')
+        if limit:
+            query += " LIMIT ?"
+            params += (int(limit),)
+        return self._read_lines(self._select(query, params))
+
+    def _read_lines(self, locations: List[tuple]) -> List[Dict]:
+        entries = []
+        handles = {}
+        try:
+            for day, offset, length in locations:
+                if day not in handles:
+                    path = self._day_path(day)
+                    if not os.path.exists(path):
+                        continue
+                    handles[day] = open(path, 'rb')
+                handle = handles[day]
+                handle.seek(offset)
+                try:
+                    entries.append(json.loads(handle.read(length)))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable alert history line in {day} at {offset}")
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return entries
+
+    def close(self):
+        """Flush pending firings and close the day file"""
+        with self._lock:
+            if self._file is not None:
+                self._sync_locked()
+                self._file.close()
+                self._file = None
+                self._file_day = None
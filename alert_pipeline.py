@@ -0,0 +1,146 @@
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUE_WAIT_SECONDS = metrics.histogram('inferaboard_alert_pipeline_queue_wait_seconds', 'Time items wait in an alert pipeline queue')
+STAGE_SECONDS = metrics.histogram('inferaboard_alert_pipeline_stage_seconds', 'Time spent processing one item in an alert pipeline stage')
+BLOCKED_SECONDS = metrics.counter('inferaboard_alert_pipeline_blocked_seconds_total', 'Time producers spent blocked on a full pipeline queue')
+QUEUE_DEPTH = metrics.gauge('inferaboard_alert_pipeline_queue_depth', 'Items waiting in an alert pipeline queue')
+
+
+class AlertPipeline:
+    """Runs alert evaluation and delivery off the sync thread.
+
+    The sync thread submits (user, dataset version, data, delta) events to a
+    bounded evaluation queue drained by one evaluator thread, which keeps rule
+    state changes single-threaded (the manager also holds its config lock
+    while evaluating, so config merges from disk never interleave). Each
+    firing it returns goes to a bounded delivery queue served by a pool of
+    I/O workers that write logs and notifications and send email. A full
+    queue blocks its producer, so a slow mail server first slows evaluation
+    and then syncing instead of growing memory without limit.
+    """
+
+    def __init__(self, evaluate: Callable[[str, pd.DataFrame, Dict], List[Dict]], deliver: Callable[[Dict], None],
+                 evaluate_queue_size: int = 100, delivery_queue_size: int = 1000, delivery_workers: int = 4):
+        self.evaluate = evaluate
+        self.deliver = deliver
+        self.delivery_workers = delivery_workers
+        self.evaluate_queue = queue.Queue(maxsize=evaluate_queue_size)
+        self.delivery_queue = queue.Queue(maxsize=delivery_queue_size)
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._threads = [threading.Thread(target=self._evaluate_worker, name="alert-evaluator", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._delivery_worker, name=f"alert-delivery-{i}", daemon=True)
+            for i in range(self.delivery_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Alert pipeline started with {self.delivery_workers} delivery workers")
+
+    def stop(self, timeout: float = 30):
+        """Let queued events and deliveries drain (up to ``timeout``), then stop the workers"""
+        deadline = time.monotonic() + timeout
+        while (self.evaluate_queue.unfinished_tasks or self.delivery_queue.unfinished_tasks) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()) + 1)
+        self._threads = []
+
+    def _put(self, target: queue.Queue, stage: str, payload, block: bool = True) -> bool:
+        item = (time.monotonic(), payload)
+        if not block:
+            try:
+                target.put_nowait(item)
+                return True
+            except queue.Full:
+                return False
+        blocked_since = None
+        while not self._stop_event.is_set():
+            try:
+                target.put(item, timeout=1)
+                break
+            except queue.Full:
+                if blocked_since is None:
+                    blocked_since = time.monotonic()
+                    logger.warning(f"Alert pipeline {stage} queue is full; waiting for workers to catch up")
+        else:
+            return False
+        if blocked_since is not None:
+            BLOCKED_SECONDS.inc(time.monotonic() - blocked_since, stage=stage)
+        QUEUE_DEPTH.set(target.qsize(), stage=stage)
+        return True
+
+    def submit(self, username: str, version: str, data: pd.DataFrame, delta: Dict = None) -> bool:
+        """Queue a data change for evaluation, blocking while the evaluation queue is full"""
+        return self._put(self.evaluate_queue, 'evaluate', (username, version, data, delta))
+
+    def submit_task(self, task: Callable, *args, block: bool = False) -> bool:
+        """Run an arbitrary I/O task (e.g. sending due digests) on the delivery pool"""
+        return self._put(self.delivery_queue, 'deliver', (task, args), block=block)
+
+    def _next(self, source: queue.Queue, stage: str):
+        try:
+            enqueued_at, payload = source.get(timeout=0.5)
+        except queue.Empty:
+            return None
+        QUEUE_WAIT_SECONDS.observe(time.monotonic() - enqueued_at, stage=stage)
+        QUEUE_DEPTH.set(source.qsize(), stage=stage)
+        return payload
+
+    def _evaluate_worker(self):
+        while not self._stop_event.is_set():
+            event = self._next(self.evaluate_queue, 'evaluate')
+            if event is None:
+                continue
+            username, version, data, delta = event
+            try:
+                with STAGE_SECONDS.time(stage='evaluate'):
+                    firings = self.evaluate(username, data, delta)
+                logger.info(f"Evaluated {username} data version {version}: {len(firings)} firings to deliver")
+                for firing in firings:
+                    self._put(self.delivery_queue, 'deliver', (self.deliver, (firing,)))
+            except Exception as e:
+                logger.error(f"Alert evaluation failed for {username}: {e}")
+            finally:
+                self.evaluate_queue.task_done()
+
+    def _delivery_worker(self):
+        while not self._stop_event.is_set():
+            job = self._next(self.delivery_queue, 'deliver')
+            if job is None:
+                continue
+            task, args = job
+            try:
+                with STAGE_SECONDS.time(stage='deliver'):
+                    task(*args)
+            except Exception as e:
+                logger.error(f"Alert delivery failed: {e}")
+            finally:
+                self.delivery_queue.task_done()
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self.is_running,
+            'evaluate_queue': self.evaluate_queue.qsize(),
+            'delivery_queue': self.delivery_queue.qsize()
+        }
@@ -0,0 +1,81 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+FIRING = 'firing'
+RESOLVED = 'resolved'
+
+
+def dedup_key(alert_id: str, scope: pd.DataFrame, column: str, mask: np.ndarray) -> str:
+    """Identity of the rows that met a rule's condition (row label and value of every hit)"""
+    hits = scope[column].iloc[np.flatnonzero(mask)]
+    row_hashes = np.sort(pd.util.hash_pandas_object(hits, index=True).to_numpy())
+    digest = hashlib.md5(alert_id.encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def recovered(rule: Dict, values: np.ndarray) -> bool:
+    """Whether a rule whose condition is no longer met has cleared its hysteresis band.
+
+    A ``greater_than`` rule only resolves once every value is at or below
+    ``value - hysteresis`` (and ``less_than`` mirrors that), so readings
+    hovering around the threshold do not flap between firing and resolved.
+    Other conditions resolve as soon as they stop being met.
+    """
+    band = float(rule.get('hysteresis') or 0)
+    if rule.get('condition_type') != 'threshold' or band <= 0 or len(values) == 0 or np.isnan(values).all():
+        return True
+    if rule.get('operator') == 'greater_than':
+        return bool(np.nanmax(values) <= rule['value'] - band)
+    if rule.get('operator') == 'less_than':
+        return bool(np.nanmin(values) >= rule['value'] + band)
+    return True
+
+
+class AlertStateTracker:
+    """Per-rule firing/resolved state machine with cooldown and deduplication.
+
+    State lives in each alert config (``alert_state``, ``last_dedup_key``,
+    ``resolved_at``, ``suppressed_count``) so it is persisted with the rule.
+    A met condition is delivered unless the same rows already fired
+    (``duplicate``) or the rule fired less than its cooldown ago
+    (``cooldown``).
+    """
+
+    def __init__(self, default_cooldown_minutes: float = 5):
+        self.default_cooldown_minutes = default_cooldown_minutes
+
+    def cooldown(self, rule: Dict) -> timedelta:
+        minutes = rule.get('cooldown_minutes')
+        return timedelta(minutes=float(self.default_cooldown_minutes if minutes is None else minutes))
+
+    def on_condition_met(self, alert_config: Dict, key: str, now: datetime = None) -> Optional[str]:
+        """Move the rule to firing; return None to deliver, or the suppression reason"""
+        now = now or datetime.now()
+        last_triggered = alert_config.get('last_triggered')
+
+        if alert_config.get('alert_state') == FIRING and key == alert_config.get('last_dedup_key'):
+            reason = 'duplicate'
+        elif last_triggered and now - datetime.fromisoformat(last_triggered) < self.cooldown(alert_config['rule']):
+            reason = 'cooldown'
+        else:
+            reason = None
+
+        alert_config['alert_state'] = FIRING
+        if reason is not None:
+            alert_config['suppressed_count'] = alert_config.get('suppressed_count', 0) + 1
+        else:
+            alert_config['last_dedup_key'] = key
+        return reason
+
+    def on_condition_not_met(self, alert_config: Dict, values: np.ndarray, now: datetime = None) -> bool:
+        """Resolve a firing rule once it clears its hysteresis band; True on the transition"""
+        if alert_config.get('alert_state') != FIRING or not recovered(alert_config['rule'], values):
+            return False
+        alert_config['alert_state'] = RESOLVED
+        alert_config['resolved_at'] = (now or datetime.now()).isoformat()
+        return True
@@ -0,0 +1,1095 @@
+"""Micro-benchmarks for the real-time sync and alerting pipeline.
+
+Usage: python benchmarks.py [name ...]   (runs every benchmark when no name is given)
+"""
+import sys
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def _make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a mixed-type frame resembling a typical synced dataset"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'order_id': np.arange(rows),
+        'date': pd.date_range('2020-01-01', periods=rows, freq='min'),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows),
+        'product': rng.choice([f"SKU-{i}" for i in range(500)], rows),
+        'sales': rng.normal(1000, 250, rows).round(2),
+        'quantity': rng.integers(1, 50, rows)
+    })
+
+
+def _timed(func, *args, repeat: int = 3):
+    """Return the best wall time of ``repeat`` calls and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_change_detection():
+    """Legacy to_string() MD5 hashing vs ChangeDetector fingerprint and diff"""
+    from change_detector import ChangeDetector
+
+    def legacy_hash(data):
+        return hashlib.md5(data.to_string().encode()).hexdigest()
+
+    detector = ChangeDetector(storage_dir='realtime_data')
+    for rows in (100_000, 1_000_000):
+        data = _make_frame(rows)
+        changed = pd.concat([data.iloc[1:], _make_frame(1_000, seed=1).assign(order_id=np.arange(rows, rows + 1_000))],
+                            ignore_index=True)
+        changed.loc[rows // 2, 'sales'] += 1
+
+        legacy_time, _ = _timed(legacy_hash, data, repeat=1)
+        fingerprint_time, previous = _timed(detector.fingerprint, data, ['order_id'])
+        current = detector.fingerprint(changed, ['order_id'])
+        diff_time, report = _timed(detector.compare, previous, current)
+
+        print(f"rows={rows:>9,}  to_string+md5={legacy_time:8.3f}s  "
+              f"hash_pandas_object={fingerprint_time:7.3f}s  diff={diff_time:7.4f}s  "
+              f"speedup={legacy_time / fingerprint_time:6.1f}x  "
+              f"added={len(report['added_rows'])} removed={len(report['removed_rows'])} "
+              f"modified={len(report['modified_rows'])}")
+
+
+def bench_config_persistence():
+    """Config writes per simulated minute: indent=2 dump per change vs JsonConfigStore"""
+    import json
+    import os
+    import tempfile
+    from config_store import JsonConfigStore
+
+    sources, rules, cycles = 500, 2_000, 6  # the sync worker ticks every 10s
+    sync_config = {
+        f"user{i % 50}_rest_api_{i}": {
+            'username': f"user{i % 50}", 'source_type': 'rest_api', 'config': {'api_url': f"https://example.com/{i}"},
+            'is_active': True, 'last_sync': None, 'sync_interval': 60, 'last_data_hash': 'x' * 32
+        } for i in range(sources)
+    }
+    alerts_config = {
+        f"user{i % 50}_dash_{i}": {
+            'username': f"user{i % 50}", 'dashboard_id': 'dash', 'is_active': True, 'trigger_count': 0,
+            'rule': {'name': f"Rule {i}", 'condition_type': 'threshold', 'column': 'sales', 'value': i, 'operator': 'greater_than'}
+        } for i in range(rules)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path, alerts_path = os.path.join(tmp, 'sync.json'), os.path.join(tmp, 'alerts.json')
+
+        start = time.perf_counter()
+        legacy_writes = 0
+        for _ in range(cycles):
+            for _ in range(sources):
+                with open(sync_path, 'w') as f:
+                    json.dump(sync_config, f, indent=2)
+                with open(alerts_path, 'w') as f:
+                    json.dump(alerts_config, f, indent=2)
+                legacy_writes += 2
+        legacy_time = time.perf_counter() - start
+
+        fake_now = [0.0]
+        sync_store = JsonConfigStore(sync_path, flush_interval=5.0, clock=lambda: fake_now[0])
+        alerts_store = JsonConfigStore(alerts_path, flush_interval=5.0, clock=lambda: fake_now[0])
+        sync_store.data, alerts_store.data = sync_config, alerts_config
+        sync_store._ensure_flusher = alerts_store._ensure_flusher = lambda: None  # flush on the fake clock instead
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for _ in range(sources):
+                sync_store.mark_dirty()
+                alerts_store.mark_dirty()
+            for _ in range(2):  # flusher wakes every 5s within a 10s tick
+                fake_now[0] += 5.0
+                sync_store.flush()
+                alerts_store.flush()
+        sync_store.close()
+        alerts_store.close()
+        store_time = time.perf_counter() - start
+        store_writes = sync_store.writes + alerts_store.writes
+
+    print(f"{sources} sources, {rules} rules, one minute of sync cycles")
+    print(f"  per-change indent=2 dumps: {legacy_writes:>5} writes/min  {legacy_time:7.2f}s of I/O")
+    print(f"  JsonConfigStore (5s):      {store_writes:>5} writes/min  {store_time:7.2f}s of I/O")
+
+
+def _make_rules(count: int, seed: int = 0) -> dict:
+    """Build a mix of threshold, anomaly and trend rules over the benchmark frame"""
+    rng = np.random.default_rng(seed)
+    alerts = {}
+    for i in range(count):
+        column = rng.choice(['sales', 'quantity'])
+        kind = rng.choice(['threshold', 'threshold', 'threshold', 'anomaly', 'trend'])
+        if kind == 'threshold':
+            operator = str(rng.choice(['greater_than', 'less_than', 'equals', 'not_equals']))
+            value = float(rng.normal(1000, 400)) if column == 'sales' else float(rng.integers(0, 60))
+        elif kind == 'trend':
+            operator, value = str(rng.choice(['increasing', 'decreasing'])), float(rng.integers(5, 50))
+        else:
+            operator, value = None, None
+        alerts[f"rule_{i}"] = {
+            'username': 'bench', 'is_active': True,
+            'rule': {'name': f"Rule {i}", 'condition_type': kind, 'column': column, 'operator': operator, 'value': value}
+        }
+    return alerts
+
+
+def _legacy_evaluate(rule: dict, data: pd.DataFrame) -> bool:
+    """Per-rule evaluation as done by the original _evaluate_alert_rule, without logging"""
+    column, value, operator = rule['column'], rule['value'], rule['operator']
+    if rule['condition_type'] == 'threshold':
+        return bool({'greater_than': data[column] > value, 'less_than': data[column] < value,
+                     'equals': data[column] == value, 'not_equals': data[column] != value}[operator].any())
+    if rule['condition_type'] == 'anomaly':
+        q1, q3 = data[column].quantile(0.25), data[column].quantile(0.75)
+        iqr = q3 - q1
+        return iqr != 0 and bool(((data[column] < q1 - 1.5 * iqr) | (data[column] > q3 + 1.5 * iqr)).any())
+    last_value, avg_value = data[column].iloc[-1], data[column].mean()
+    if operator == 'increasing':
+        return bool(last_value > avg_value * (1 + value / 100))
+    return bool(last_value < avg_value * (1 - value / 100))
+
+
+def bench_alert_engine():
+    """1,000 rules on 1M rows: per-rule scans vs CompiledAlertRules"""
+    from alert_engine import CompiledAlertRules
+
+    data = _make_frame(1_000_000)
+    alerts = _make_rules(1_000)
+
+    legacy_time, legacy = _timed(lambda: {a: _legacy_evaluate(c['rule'], data) for a, c in alerts.items()}, repeat=1)
+    compile_time, compiled = _timed(CompiledAlertRules, alerts)
+    engine_time, results = _timed(compiled.evaluate, data)
+
+    mismatches = sum(legacy[a] != results[a]['triggered'] for a in alerts)
+    print(f"1,000 rules x 1,000,000 rows ({len(compiled.groups)} groups)")
+    print(f"  per-rule evaluation:   {legacy_time:7.3f}s")
+    print(f"  compiled engine:       {engine_time:7.3f}s (+{compile_time * 1000:.1f} ms compile)  "
+          f"speedup={legacy_time / engine_time:5.1f}x  mismatches={mismatches}")
+
+
+def bench_quantile_sketch():
+    """Anomaly bounds from an incrementally updated KLL sketch vs exact quantiles per sync"""
+    from alert_engine import iqr_bounds, sketch_iqr_bounds
+    from quantile_sketch import KLLSketch
+
+    rng = np.random.default_rng(0)
+    batch, syncs = 10_000, 100
+    stream = np.concatenate([rng.normal(1000, 250, batch * syncs // 2), rng.lognormal(6, 0.6, batch * syncs // 2)])
+    rng.shuffle(stream)
+
+    sketch = KLLSketch(seed=0)
+    exact_time = sketch_time = 0.0
+    worst_rank_error = worst_bound_error = 0.0
+    for i in range(1, syncs + 1):
+        seen = stream[:i * batch]
+
+        start = time.perf_counter()
+        exact = iqr_bounds(seen)
+        exact_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        sketch.update(seen[-batch:])
+        approx = sketch_iqr_bounds(sketch)
+        sketch_time += time.perf_counter() - start
+
+        sorted_seen = np.sort(seen)
+        for q, estimate in zip((0.25, 0.75), sketch.quantiles([0.25, 0.75])):
+            rank = np.searchsorted(sorted_seen, estimate) / len(seen)
+            worst_rank_error = max(worst_rank_error, abs(rank - q))
+        spread = exact[1] - exact[0]
+        worst_bound_error = max(worst_bound_error, max(abs(a - e) for a, e in zip(approx, exact)) / spread)
+
+    state_floats = sum(len(level) for level in sketch.levels)
+    print(f"{syncs} syncs of {batch:,} new rows (final column {len(stream):,} rows)")
+    print(f"  exact quantiles over full column: {exact_time:7.3f}s total")
+    print(f"  KLL sketch (k={sketch.k}) delta update: {sketch_time:7.3f}s total  "
+          f"speedup={exact_time / sketch_time:5.1f}x  state={state_floats} values")
+    print(f"  worst quartile rank error: {worst_rank_error:.4f}  "
+          f"worst bound error: {worst_bound_error * 100:.2f}% of the normal range")
+
+
+def bench_alert_firing():
+    """CPU time to handle one firing: shared AlertEvaluation, alert log, notification and email body"""
+    import logging
+    import os
+    import tempfile
+
+    rows = 1_000_000
+    data = pd.DataFrame({'sales': np.random.default_rng(0).normal(1000, 250, rows).round(2),
+                         'quantity': np.random.default_rng(1).integers(1, 50, rows)})
+    delta = {'rows': data.iloc[-10_000:], 'changed_columns': ['sales', 'quantity'], 'rows_removed': 0, 'rows_modified': 0}
+    rules = {
+        'threshold': {'name': 'T', 'condition_type': 'threshold', 'column': 'sales', 'operator': 'greater_than', 'value': 1500},
+        'anomaly': {'name': 'A', 'condition_type': 'anomaly', 'column': 'sales', 'operator': None, 'value': None},
+        'trend': {'name': 'R', 'condition_type': 'trend', 'column': 'quantity', 'operator': 'decreasing', 'value': -1000},
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the manager writes alert logs and notifications relative to the working directory
+        logging.disable(logging.CRITICAL)
+        try:
+            from alert_engine import CompiledAlertRules
+            from realtime_alerts_manager import realtime_manager as manager
+
+            print(f"one firing against {rows:,} rows with a {len(delta['rows']):,}-row delta")
+            for kind, rule in rules.items():
+                alert_config = {'username': 'bench', 'dashboard_id': 'bench', 'rule': rule, 'is_active': True, 'trigger_count': 0}
+                compiled = CompiledAlertRules({'bench_rule': alert_config})
+                bounds = manager._update_anomaly_sketch(alert_config, data, delta) if kind == 'anomaly' else None
+                best = float('inf')
+                for _ in range(5):
+                    start = time.process_time()
+                    evaluation = compiled.explain('bench_rule', data, delta, bounds, {})
+                    manager._log_alert('bench_rule', alert_config, data, evaluation)
+                    manager._create_main_notification(alert_config, evaluation)
+                    manager._format_email_alert_message(rule, evaluation, 'bench')
+                    best = min(best, time.process_time() - start)
+                print(f"  {kind:>9}: {best * 1000:7.1f} ms CPU per firing")
+        finally:
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+
+
+def bench_alert_history():
+    """A day of firings: per-alert JSON array rewritten per firing vs AlertHistoryStore appends"""
+    import json
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+    from alert_history import AlertHistoryStore
+
+    firings, rules = 5_000, 50
+    day_start = datetime(2024, 1, 1)
+    entries = [{
+        'alert_id': f"rule_{i % rules}", 'username': 'bench', 'timestamp': (day_start + timedelta(seconds=i * 10)).isoformat(),
+        'rule': {'name': f"Rule {i % rules}", 'condition_type': 'threshold', 'column': 'sales', 'value': 1500, 'operator': 'greater_than'},
+        'data_snapshot': {'rows': 1_000_000, 'columns': ['order_id', 'date', 'region', 'sales'], 'triggered_value': np.float64(1501.5)}
+    } for i in range(firings)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for entry in entries:
+            log_file = os.path.join(tmp, f"{entry['alert_id']}_20240101.json")
+            log_data = []
+            if os.path.exists(log_file):
+                with open(log_file) as f:
+                    log_data = json.load(f)
+            log_data.append(entry)
+            with open(log_file, 'w') as f:
+                json.dump(log_data, f, indent=2, default=float)
+        legacy_time = time.perf_counter() - start
+
+        store = AlertHistoryStore(os.path.join(tmp, 'history'), retention_days=0)
+        start = time.perf_counter()
+        for entry in entries:
+            store.append(dict(entry))
+        store.flush()
+        append_time = time.perf_counter() - start
+
+        window = (day_start + timedelta(hours=6), day_start + timedelta(hours=7))
+        query_time, window_firings = _timed(store.firings, 'rule_7', *window)
+        store.close()
+
+    print(f"{firings:,} firings across {rules} rules in one day")
+    print(f"  read/rewrite JSON array per firing: {legacy_time:7.3f}s")
+    print(f"  AlertHistoryStore JSONL appends:    {append_time:7.3f}s  speedup={legacy_time / append_time:5.1f}x")
+    print(f"  firings of one rule in a 1h window: {len(window_firings)} in {query_time * 1000:.2f} ms")
+
+
+def bench_alert_suppression():
+    """Deliveries during a noisy hour: every met condition vs AlertStateTracker (5 min cooldown, hysteresis)"""
+    from datetime import datetime, timedelta
+    from alert_state import AlertStateTracker, dedup_key
+
+    rng = np.random.default_rng(0)
+    tracker = AlertStateTracker(default_cooldown_minutes=5)
+    alert_config = {'rule': {'condition_type': 'threshold', 'column': 'cpu', 'operator': 'greater_than',
+                             'value': 90.0, 'hysteresis': 3.0}}
+    now = datetime(2024, 1, 1)
+    met = delivered = 0
+    reasons = {}
+    for cycle in range(360):  # one sync every 10s, readings hovering around the threshold
+        rows = pd.DataFrame({'cpu': rng.normal(89, 2, 5)}, index=range(cycle * 5, cycle * 5 + 5))
+        # Every third sync re-delivers the previous rows unchanged
+        if cycle % 3 == 2:
+            rows = previous
+        previous = rows
+        mask = rows['cpu'].to_numpy() > 90.0
+        if mask.any():
+            met += 1
+            reason = tracker.on_condition_met(alert_config, dedup_key('cpu_rule', rows, 'cpu', mask), now)
+            if reason is None:
+                delivered += 1
+                alert_config['last_triggered'] = now.isoformat()
+            else:
+                reasons[reason] = reasons.get(reason, 0) + 1
+        else:
+            tracker.on_condition_not_met(alert_config, rows['cpu'].to_numpy(), now)
+        now += timedelta(seconds=10)
+
+    print(f"360 syncs, condition met on {met}")
+    print(f"  without state machine: {met} log writes, notifications and emails")
+    print(f"  with AlertStateTracker: {delivered} delivered, suppressed {reasons}")
+
+
+def bench_alert_digest():
+    """Emails per sync cycle for one user with 20 firing rules: one email per rule vs a digest"""
+    import logging
+    import os
+    import tempfile
+
+    session_latency = 0.15  # connect + STARTTLS + login round trips to a typical SMTP relay
+
+    class SimulatedSMTP:
+        """Stands in for smtplib.SMTP so the benchmark does not need a mail server"""
+        sessions = 0
+
+        def __init__(self, *args, **kwargs):
+            SimulatedSMTP.sessions += 1
+            time.sleep(session_latency)
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+
+    rows = 100_000
+    data = pd.DataFrame({'sales': np.random.default_rng(0).normal(1000, 250, rows)})
+    delta = {'rows': data.iloc[-1_000:], 'changed_columns': ['sales'], 'rows_removed': 0, 'rows_modified': 0}
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        logging.disable(logging.CRITICAL)
+        try:
+            import realtime_alerts_manager
+            manager = realtime_alerts_manager.realtime_manager
+            real_smtp = realtime_alerts_manager.smtplib.SMTP
+            realtime_alerts_manager.smtplib.SMTP = SimulatedSMTP
+            manager.smtp_user, manager.smtp_pass = 'alerts@example.com', 'secret'
+
+            print(f"20 rules firing in one sync, {session_latency * 1000:.0f} ms per SMTP session")
+            for label, window in (('one email per rule', 0), ('digest', 300)):
+                manager.alerts_config.clear()
+                for i in range(20):
+                    manager.alerts_config[f"bench_{i}"] = {
+                        'username': 'bench', 'dashboard_id': 'bench', 'is_active': True, 'last_triggered': None,
+                        'trigger_count': 0, 'rule': {'name': f"Rule {i}", 'condition_type': 'threshold', 'column': 'sales',
+                                                     'operator': 'greater_than', 'value': 1000 + i, 'email': 'ops@example.com'}
+                    }
+                manager.alert_digests.window_seconds = window
+                SimulatedSMTP.sessions = 0
+                start = time.perf_counter()
+                manager.check_alert_rules('bench', data, delta)
+                manager.send_due_digests(force=True)
+                elapsed = time.perf_counter() - start
+                print(f"  {label:<20} {SimulatedSMTP.sessions:>3} emails  {elapsed:6.2f}s to check and send")
+        finally:
+            realtime_alerts_manager.smtplib.SMTP = real_smtp
+            manager.alerts_config.clear()
+            manager.alerts_store.flush(force=True)  # pending writes resolve relative to the temp directory
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+
+
+def bench_alert_pipeline():
+    """Sync-thread time for 10 changed sources with a slow mail server: inline delivery vs AlertPipeline"""
+    import logging
+    import os
+    import tempfile
+
+    smtp_latency, sources = 0.5, 10
+    data = pd.DataFrame({'sales': np.random.default_rng(0).normal(1000, 250, 50_000)})
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        logging.disable(logging.CRITICAL)
+        try:
+            from metrics_registry import metrics, parse_metric_totals
+            from realtime_alerts_manager import realtime_manager as manager
+            manager._send_email = lambda *args: time.sleep(smtp_latency) or True
+
+            def reset_rules():
+                manager.alerts_config.clear()
+                for i in range(sources):
+                    manager.alerts_config[f"bench_{i}"] = {
+                        'username': f"user{i}", 'dashboard_id': 'bench', 'is_active': True, 'last_triggered': None,
+                        'trigger_count': 0, 'rule': {'name': f"Rule {i}", 'condition_type': 'threshold', 'column': 'sales',
+                                                     'operator': 'greater_than', 'value': 1500, 'priority': 'critical',
+                                                     'email': 'ops@example.com', 'cooldown_minutes': 0}
+                    }
+
+            def delta_for(i):
+                rows = data.iloc[i * 1_000:(i + 1) * 1_000]
+                return {'rows': rows, 'changed_columns': ['sales'], 'rows_removed': 0, 'rows_modified': 0}
+
+            reset_rules()
+            start = time.perf_counter()
+            for i in range(sources):
+                manager.check_alert_rules(f"user{i}", data, delta_for(i))
+            inline_time = time.perf_counter() - start
+
+            reset_rules()
+            manager.alert_pipeline.start()
+            start = time.perf_counter()
+            for i in range(sources):
+                manager.alert_pipeline.submit(f"user{i}", f"v{i}", data, delta_for(i))
+            submit_time = time.perf_counter() - start
+            manager.alert_pipeline.stop()
+            drain_time = time.perf_counter() - start
+
+            totals = parse_metric_totals(metrics.render(), by_label='stage')
+            print(f"{sources} changed sources, one critical email each, {smtp_latency * 1000:.0f} ms per SMTP send")
+            print(f"  inline check_alert_rules: sync thread busy {inline_time:6.2f}s")
+            print(f"  AlertPipeline ({manager.alert_pipeline.delivery_workers} workers): sync thread busy {submit_time:6.3f}s, "
+                  f"all delivered after {drain_time:5.2f}s")
+            for stage in ('evaluate', 'deliver'):
+                count = totals.get(f"inferaboard_alert_pipeline_stage_seconds_count:{stage}", 0) or 1
+                wait = totals.get(f"inferaboard_alert_pipeline_queue_wait_seconds_sum:{stage}", 0) / count * 1000
+                run = totals.get(f"inferaboard_alert_pipeline_stage_seconds_sum:{stage}", 0) / count * 1000
+                print(f"    {stage:<8} avg queue wait {wait:7.1f} ms  avg run {run:7.1f} ms")
+        finally:
+            manager.alerts_config.clear()
+            manager.alerts_store.flush(force=True)  # pending writes resolve relative to the temp directory
+            manager.alert_history.close()
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+
+
+def bench_backtest():
+    """Replaying 1M date-ordered rows through candidate rules: per-sync loop vs one vectorized pass"""
+    from alert_backtest import backtest_rule
+
+    data = _make_frame(1_000_000).sample(frac=1, random_state=0)
+    rules = {
+        'threshold': {'column': 'sales', 'condition_type': 'threshold', 'operator': 'greater_than', 'value': 1900},
+        'anomaly': {'column': 'sales', 'condition_type': 'anomaly', 'operator': None, 'value': None},
+        'trend': {'column': 'sales', 'condition_type': 'trend', 'operator': 'increasing', 'value': 60},
+    }
+    interval, cooldown, sample_syncs = 600, 30, 2_000
+
+    ordered = data.sort_values('date', kind='stable')
+    buckets = ordered['date'].to_numpy(dtype='datetime64[ns]').astype(np.int64) // int(interval * 1e9)
+    batches = [group for _, group in ordered.groupby(buckets, sort=True)]
+    syncs = len(batches)
+    start = time.perf_counter()
+    loop_met = sum(_legacy_evaluate(rules['threshold'], batch) for batch in batches[:sample_syncs])
+    loop_time = (time.perf_counter() - start) * syncs / sample_syncs
+
+    print(f"{len(data):,} rows replayed as {syncs:,} syncs of {interval // 60} min, {cooldown} min cooldown")
+    print(f"  per-sync loop (threshold, extrapolated from {sample_syncs:,} syncs): {loop_time:7.3f}s")
+    for name, rule in rules.items():
+        elapsed, result = _timed(backtest_rule, rule, data, 'date', interval, cooldown)
+        print(f"  vectorized {name:<9}: {elapsed:7.3f}s  condition_met={result['condition_met']:,}  "
+              f"firings={result['firings']:,} ({result['firings_per_day']}/day)")
+    sample = backtest_rule(rules['threshold'], ordered.iloc[:len(pd.concat(batches[:sample_syncs]))], 'date', interval)
+    print(f"  threshold syncs met in sample: loop={loop_met} vectorized={sample['condition_met']}")
+
+
+def bench_rolling_window():
+    """Per-sync cost of a windowed rule: recompute over the whole column vs incremental RollingWindow"""
+    from rolling_window import RollingWindow, rolling_condition_met
+
+    rng = np.random.default_rng(0)
+    history, batch, syncs, size = 1_000_000, 100, 200, 500
+    column = rng.normal(1000, 250, history + batch * syncs)
+    rule = {'condition_type': 'rolling_zscore', 'operator': 'either', 'value': 3.0}
+
+    window = RollingWindow(size=size)
+    window.update(column[:history])
+    full_time = window_time = 0.0
+    mismatches = 0
+    for i in range(syncs):
+        end = history + (i + 1) * batch
+        seen = pd.Series(column[:end])
+
+        start = time.perf_counter()
+        baseline = seen.iloc[-size:-1]
+        full_z = (seen.iloc[-1] - baseline.mean()) / baseline.std()
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        window.update(column[end - batch:end])
+        z = window.statistic('rolling_zscore')
+        window_time += time.perf_counter() - start
+
+        mismatches += bool(rolling_condition_met(rule, np.array([z]))[0]) != (abs(full_z) >= 3.0)
+
+    # The old trend condition: last value against the mean of the whole column
+    start = time.perf_counter()
+    for i in range(syncs):
+        np.nanmean(column[:history + (i + 1) * batch])
+    trend_time = time.perf_counter() - start
+
+    print(f"{syncs} syncs of {batch} rows on a {history:,}-row column, window of {size} rows")
+    print(f"  whole-column trend mean:        {trend_time:7.3f}s")
+    print(f"  pandas tail of the full column: {full_time:7.3f}s")
+    print(f"  incremental RollingWindow:      {window_time:7.3f}s  mismatches={mismatches}")
+
+
+def bench_logging():
+    """Caller-side logging cost of an alert cycle: synchronous FileHandler vs queued, rate-limited JSON"""
+    import os
+    import queue
+    import logging
+    import tempfile
+    from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+    from structured_logging import JsonFormatter, RateLimitFilter, truncate_values
+
+    rules, cycles = 200, 50
+    triggered_values = np.random.default_rng(0).normal(1000, 250, 500).round(2).tolist()
+
+    def run_cycles(logger, structured):
+        start = time.perf_counter()
+        for cycle in range(cycles):
+            for rule in range(rules):
+                if structured:
+                    logger.debug(f"Evaluating alert: rule {rule}", extra={'fields': {'alert_id': f"rule_{rule}"}})
+                    logger.info(f"THRESHOLD ALERT: sales > 1500 - Triggered values: {truncate_values(triggered_values)}",
+                                extra={'fields': {'hit_count': len(triggered_values)}})
+                else:
+                    for line in ("Evaluating alert: rule", "   Alert ID", "   Email configured", "   SMTP Status", "   Active"):
+                        logger.info(f"{line} {rule}")
+                    logger.info(f"THRESHOLD ALERT: sales > 1500 - Triggered values: {triggered_values}")
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = logging.getLogger('bench.plain')
+        plain.propagate = False
+        plain.setLevel(logging.INFO)
+        file_handler = logging.FileHandler(os.path.join(tmp, 'plain.log'))
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        plain.addHandler(file_handler)
+        plain_time = run_cycles(plain, structured=False)
+        file_handler.close()
+
+        structured = logging.getLogger('bench.structured')
+        structured.propagate = False
+        structured.setLevel(logging.INFO)
+        rotating = RotatingFileHandler(os.path.join(tmp, 'structured.log'), maxBytes=10 * 1024 * 1024, backupCount=5)
+        rotating.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(burst=20, interval=60))
+        structured.addHandler(queue_handler)
+        listener = QueueListener(log_queue, rotating)
+        listener.start()
+        structured_time = run_cycles(structured, structured=True)
+        listener.stop()
+        rotating.close()
+
+        sizes = {name: os.path.getsize(os.path.join(tmp, name)) for name in ('plain.log', 'structured.log')}
+
+    print(f"{cycles} alert cycles x {rules} rules, {len(triggered_values)} triggered values per hit")
+    print(f"  synchronous FileHandler:    {plain_time / cycles * 1000:8.2f} ms/cycle  {sizes['plain.log'] / 1e6:7.1f} MB written")
+    print(f"  queued JSON, rate limited:  {structured_time / cycles * 1000:8.2f} ms/cycle  "
+          f"{sizes['structured.log'] / 1e6:7.3f} MB written  speedup={plain_time / structured_time:5.1f}x")
+
+
+def bench_notifications():
+    """Notification insert, mark-read and unread listing: per-user JSON rewrite vs NotificationStore"""
+    import os
+    import json
+    import tempfile
+    from datetime import datetime
+    from notification_store import NotificationStore
+
+    operations, users = 1_000, 50
+
+    def json_insert(path, title):
+        notifications = []
+        if os.path.exists(path):
+            with open(path) as f:
+                notifications = json.load(f)
+        notifications.insert(0, {'id': f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}", 'title': title,
+                                 'message': 'x' * 400, 'timestamp': datetime.now().isoformat(), 'read': False,
+                                 'type': 'alert'})
+        with open(path, 'w') as f:
+            json.dump(notifications[:100], f, indent=2)
+
+    def json_mark_read(path, notification_id):
+        with open(path) as f:
+            notifications = json.load(f)
+        for notification in notifications:
+            if notification['id'] == notification_id:
+                notification['read'] = True
+        with open(path, 'w') as f:
+            json.dump(notifications, f, indent=2)
+
+    def json_unread(path):
+        with open(path) as f:
+            notifications = [n for n in json.load(f) if not n['read']]
+        return sorted(notifications, key=lambda n: n['timestamp'], reverse=True)[:3]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"user{u}.json") for u in range(users)]
+        for path in paths:
+            for i in range(100):
+                json_insert(path, f"warmup {i}")
+        store = NotificationStore(os.path.join(tmp, "notifications.sqlite"), legacy_dir=None)
+        for u in range(users):
+            for i in range(100):
+                store.add(f"user{u}", f"warmup {i}", 'x' * 400)
+
+        timings = {}
+        start = time.perf_counter()
+        for i in range(operations):
+            json_insert(paths[i % users], f"alert {i}")
+        timings['json insert'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(operations):
+            path = paths[i % users]
+            json_mark_read(path, json_unread(path)[0]['id'])
+        timings['json read+mark'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(operations):
+            store.add(f"user{i % users}", f"alert {i}", 'x' * 400)
+        timings['sqlite insert'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(operations):
+            username = f"user{i % users}"
+            store.mark_read(username, store.notifications(username, limit=3)[0]['id'])
+        timings['sqlite read+mark'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(operations):
+            store.unread_count(f"user{i % users}")
+        timings['sqlite unread count'] = time.perf_counter() - start
+        store.close()
+
+    print(f"{operations:,} operations across {users} users with 100+ notifications each")
+    for name, elapsed in timings.items():
+        print(f"  {name:<20} {elapsed / operations * 1e6:8.1f} us/op")
+
+
+def bench_notification_hub():
+    """Per-rerun cost of the sidebar for an idle user: re-reading status and notifications vs polling the hub"""
+    import logging
+    import os
+    import tempfile
+
+    reruns = 1_000
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        logging.disable(logging.CRITICAL)
+        try:
+            from realtime_alerts_manager import realtime_manager as manager
+            for i in range(20):
+                manager.sync_config[f"bench_{i}"] = {
+                    'username': 'idle_user', 'source_type': 'rest_api', 'is_active': True, 'sync_interval': 60,
+                    'last_sync': '2024-01-01T00:00:00'
+                }
+            manager.save_sync_config(force=True)
+            for i in range(50):
+                manager._create_user_notification('idle_user', f"Alert {i}", 'x' * 400)
+
+            start = time.perf_counter()
+            for _ in range(reruns):
+                manager.get_sync_status('idle_user')
+                manager.get_user_notifications('idle_user', unread_only=True, limit=3)
+                manager.get_unread_count('idle_user')
+            reread_time = time.perf_counter() - start
+
+            subscription = manager.subscribe_notifications('idle_user')
+            subscription.acknowledge()
+            start = time.perf_counter()
+            refreshes = 0
+            for _ in range(reruns):
+                if subscription.changed():
+                    refreshes += 1
+                    subscription.acknowledge()
+            poll_time = time.perf_counter() - start
+
+            manager._create_user_notification('idle_user', 'New alert', 'x')
+            noticed = subscription.changed()
+        finally:
+            manager.sync_config.clear()
+            manager.sync_store.flush(force=True)
+            manager.alerts_store.flush(force=True)  # pending writes resolve relative to the temp directory
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+
+    print(f"{reruns:,} sidebar reruns for an idle user with 20 sources and 50 unread notifications")
+    print(f"  re-read status and notifications: {reread_time / reruns * 1e6:8.1f} us/rerun")
+    print(f"  poll subscription version:        {poll_time / reruns * 1e6:8.1f} us/rerun  "
+          f"refreshes={refreshes}  new notification noticed={noticed}")
+
+
+def bench_notification_center():
+    """Notification center actions: per-item mark-read/delete loops vs one bulk statement, and a deep page"""
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+    from notification_store import NotificationStore
+
+    users, per_user, rounds = 20, 1_000, 5
+    with tempfile.TemporaryDirectory() as tmp:
+        store = NotificationStore(os.path.join(tmp, "notifications.sqlite"), legacy_dir=None, max_per_user=0)
+
+        def fill():
+            for u in range(users):
+                for i in range(per_user):
+                    store.add(f"user{u}", f"alert {i}", 'x' * 200, alert_id=f"rule_{i % 10}")
+
+        fill()
+        timings = {}
+        start = time.perf_counter()
+        for r in range(rounds):
+            username = f"user{r}"
+            for notification in store.notifications(username, alert_id='rule_1'):
+                store.mark_read(username, notification['id'])
+        timings['per-item mark read'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for r in range(rounds):
+            store.mark_all_read(f"user{r + rounds}", alert_id='rule_1')
+        timings['bulk mark read'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for r in range(rounds):
+            username = f"user{r}"
+            for notification in store.notifications(username, unread_only=False, alert_id='rule_2'):
+                store.delete(username, ids=[notification['id']])
+        timings['per-item delete'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for r in range(rounds):
+            store.delete(f"user{r + rounds}", alert_id='rule_2')
+        timings['bulk delete'] = time.perf_counter() - start
+
+        since = datetime.now() - timedelta(hours=24)
+        start = time.perf_counter()
+        for r in range(rounds * 20):
+            username = f"user{r % users}"
+            store.count(username, read=False, start=since)
+            store.notifications(username, limit=20, offset=400, start=since)
+        timings['page 21 (count + rows)'] = (time.perf_counter() - start) / 20
+        store.close()
+
+    print(f"{users} users x {per_user:,} notifications; {per_user // 10} matching per bulk action")
+    for name, elapsed in timings.items():
+        print(f"  {name:<24} {elapsed / rounds * 1e3:8.2f} ms/action")
+
+
+def bench_dataset_profile():
+    """Per-rerun column profiling on 1M rows: every stage scanning the data vs the cached DatasetProfile"""
+    import logging
+    import warnings
+
+    data = _make_frame(1_000_000)
+
+    def per_stage(df):
+        # auto_generate_dashboard: roles, filter options and slider ranges
+        numerical = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        categorical = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        df.select_dtypes(include=['datetime64']).columns.tolist()
+        for col in categorical[:3]:
+            df[col].unique().tolist()
+        for col in numerical[:2]:
+            float(df[col].min()), float(df[col].max())
+        # query_based_dashboard_generator: roles for chart_info
+        for group in (['int64', 'float64'], ['object', 'category'], ['datetime64']):
+            df.select_dtypes(include=group).columns.tolist()
+        # generate_smart_insights: roles, key metrics and category insights
+        for col in numerical[:3]:
+            df[col].sum(), df[col].mean(), df[col].median(), df[col].max(), df[col].min(), df[col].std()
+        for col in categorical[:3]:
+            counts = df[col].value_counts()
+            counts.idxmax(), counts.max(), counts.head()
+        # generate_csv_report and _show_edit_interface: roles, statistics, filter options
+        for col in numerical[:3]:
+            df[col].mean(), df[col].median(), df[col].std(), df[col].min(), df[col].max()
+        for col in categorical[:3]:
+            df[col].unique().tolist()
+        for col in numerical[:2]:
+            float(df[col].min()), float(df[col].max())
+
+    logging.disable(logging.CRITICAL)  # "no runtime found" warnings outside a Streamlit app
+    try:
+        from dataset_profile import DatasetProfile, dataset_hash, get_dataset_profile
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # select_dtypes string deprecation, ignored by the app as well
+            per_stage_time, _ = _timed(per_stage, data)
+            hash_time, _ = _timed(dataset_hash, data)
+            build_time, _ = _timed(DatasetProfile, data)
+            get_dataset_profile.clear()
+            start = time.perf_counter()
+            get_dataset_profile(data)
+            miss_time = time.perf_counter() - start
+            # Every rerun rebuilds the preprocessed frame, so hits are measured on an equal copy
+            hit_time, profile = _timed(get_dataset_profile, data.copy())
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"{len(data):,} rows, {len(data.columns)} columns ({len(profile.categorical)} categorical)")
+    print(f"  per-stage select_dtypes/unique/value_counts/stats: {per_stage_time * 1e3:8.1f} ms/rerun")
+    print(f"  DatasetProfile build:                             {build_time * 1e3:8.1f} ms")
+    print(f"  content hash:                                     {hash_time * 1e3:8.1f} ms")
+    print(f"  get_dataset_profile, first rerun (miss):          {miss_time * 1e3:8.1f} ms")
+    print(f"  get_dataset_profile, later reruns (hit):          {hit_time * 1e3:8.1f} ms/rerun")
+
+
+def bench_filter_index():
+    """Sidebar filter latency at 5M rows: copy + isin/comparisons per rerun vs the cached FilterIndex"""
+    import logging
+
+    data = _make_frame(5_000_000)
+    categorical, numerical = ('region', 'product'), ('sales', 'quantity')
+    products = data['product'].unique().tolist()
+    # Slider drags on sales with other filters at their defaults, then a narrow product selection
+    interactions = [
+        {'region': ['North', 'South', 'East', 'West'], 'product': products, 'sales': (low, 2000.0), 'quantity': (1, 49)}
+        for low in np.linspace(0, 1500, 8)
+    ] + [{'region': ['North', 'South'], 'product': products[:5], 'sales': (500.0, 1500.0), 'quantity': (10, 40)}]
+
+    def legacy(df, filters):
+        filtered_df = df.copy()
+        for col, value in filters.items():
+            if col in categorical:
+                if value:
+                    filtered_df = filtered_df[filtered_df[col].isin(value)]
+            else:
+                filtered_df = filtered_df[(filtered_df[col] >= value[0]) & (filtered_df[col] <= value[1])]
+        return filtered_df
+
+    logging.disable(logging.CRITICAL)  # "no runtime found" warnings outside a Streamlit app
+    try:
+        from filter_index import FilterIndex, get_filter_index
+        build_time, _ = _timed(FilterIndex, data, categorical, numerical, repeat=1)
+        get_filter_index(data, categorical, numerical)
+        legacy_times, index_times, mask_times = [], [], []
+        for filters in interactions:
+            elapsed, expected = _timed(legacy, data, filters)
+            legacy_times.append(elapsed)
+            elapsed, result = _timed(lambda: get_filter_index(data, categorical, numerical).apply(data, filters))
+            index_times.append(elapsed)
+            assert result.index.equals(expected.index)
+            elapsed, _ = _timed(lambda: get_filter_index(data, categorical, numerical).mask(filters))
+            mask_times.append(elapsed)
+        defaults = {'region': ['North', 'South', 'East', 'West'], 'product': products,
+                    'sales': (float(data['sales'].min()), float(data['sales'].max())), 'quantity': (1, 49)}
+        default_times = [
+            _timed(legacy, data, defaults)[0],
+            _timed(lambda: get_filter_index(data, categorical, numerical).apply(data, defaults))[0]
+        ]
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"{len(data):,} rows, filters on {', '.join(categorical + numerical)}; index build {build_time:.2f}s (once)")
+    print(f"  copy + isin/compare per rerun:   {np.median(legacy_times) * 1e3:8.1f} ms median, "
+          f"{max(legacy_times) * 1e3:8.1f} ms worst")
+    print(f"  FilterIndex mask + row take:     {np.median(index_times) * 1e3:8.1f} ms median, "
+          f"{max(index_times) * 1e3:8.1f} ms worst")
+    print(f"  FilterIndex mask only:           {np.median(mask_times) * 1e3:8.1f} ms median")
+    print(f"  rerun with default filters:      {default_times[0] * 1e3:8.1f} ms legacy, "
+          f"{default_times[1] * 1e3:8.1f} ms FilterIndex (frame returned as is)")
+
+
+def bench_aggregation_cache():
+    """Dashboard group-bys per rerun on 1M rows: recomputed every rerun vs the aggregation cache"""
+    import logging
+    from aggregation_cache import AggregationCache
+
+    data = _make_frame(1_000_000)
+    data['discount'] = np.random.default_rng(1).random(len(data))
+    categorical, numerical = ('region', 'product'), ('sales', 'quantity')
+    products = data['product'].unique().tolist()
+    # Ten reruns: widget clicks and tab switches with unchanged filters, then two filter changes
+    reruns = [{'region': ['North', 'South', 'East', 'West'], 'product': products}] * 4 + \
+             [{'region': ['North', 'South'], 'product': products}] * 3 + \
+             [{'region': ['North', 'South'], 'product': products[:100]}] * 3
+
+    def charts(filtered_df, aggregate):
+        aggregate(('groupby', 'date', 'sales', 'sum'), lambda: filtered_df.groupby('date')['sales'].sum().reset_index())
+        top10 = aggregate(('top_values', 'product', 10), lambda: filtered_df['product'].value_counts().nlargest(10).index)
+        aggregate(('top_groupby', 'product', 'sales', 'sum', 10),
+                  lambda: filtered_df[filtered_df['product'].isin(top10)].groupby('product')['sales'].sum().reset_index())
+        for _ in range(2):  # box plot and scatter plot
+            top5 = aggregate(('top_values', 'product', 5), lambda: filtered_df['product'].value_counts().nlargest(5).index)
+            aggregate(('top_rows', 'product', 5), lambda: filtered_df[filtered_df['product'].isin(top5)])
+        aggregate(('corr', ('sales', 'quantity', 'discount')),
+                  lambda: filtered_df[['sales', 'quantity', 'discount']].corr())
+
+    logging.disable(logging.CRITICAL)  # "no runtime found" warnings outside a Streamlit app
+    try:
+        from dataset_profile import dataset_hash
+        from filter_index import get_filter_index
+        index = get_filter_index(data, categorical, numerical)
+        version = dataset_hash(data)
+        frames = [index.apply(data, filters) for filters in reruns]
+
+        start = time.perf_counter()
+        for filtered_df in frames:
+            charts(filtered_df, lambda spec, compute: compute())
+        uncached = (time.perf_counter() - start) / len(frames)
+
+        cache = AggregationCache()
+        timings = []
+        for filters, filtered_df in zip(reruns, frames):
+            start = time.perf_counter()
+            charts(filtered_df, cache.scoped(version, index.normalize(filters)))
+            timings.append(time.perf_counter() - start)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    stats = cache.stats()
+    print(f"{len(data):,} rows, {len(reruns)} reruns with 3 distinct filter states, 8 aggregations per rerun")
+    print(f"  recomputed every rerun: {uncached * 1e3:8.1f} ms/rerun")
+    repeated = [t for i, t in enumerate(timings) if i and reruns[i] == reruns[i - 1]]
+    print(f"  aggregation cache:      {np.mean(timings) * 1e3:8.1f} ms/rerun  "
+          f"({np.median(repeated) * 1e3:.2f} ms when the filters did not change)")
+    print(f"  hit rate {stats['hit_rate']:.0%}  entries={stats['entries']}  held={stats['bytes'] / 1024 ** 2:.1f} MB")
+
+
+def bench_figure_cache():
+    """Auto-dashboard figures on 1M rows: rebuilt and held per session vs shared figure cache + session keys"""
+    import pickle
+    import logging
+    import plotly.express as px
+    from aggregation_cache import AggregationCache
+    from figure_cache import FigureCache, figure_nbytes
+
+    data = _make_frame(1_000_000)
+    sessions, reruns = 20, 5
+
+    def build(aggregate, figure):
+        df_date = aggregate(('groupby', 'date', 'sales', 'sum'), lambda: data.groupby('date')['sales'].sum().reset_index())
+        top10 = aggregate(('top_values', 'region', 10), lambda: data['region'].value_counts().nlargest(10).index)
+        df_agg = aggregate(('top_groupby', 'region', 'sales', 'sum', 10),
+                           lambda: data[data['region'].isin(top10)].groupby('region')['sales'].sum().reset_index())
+        top5 = aggregate(('top_values', 'product', 5), lambda: data['product'].value_counts().nlargest(5).index)
+        df_top = aggregate(('top_rows', 'product', 5), lambda: data[data['product'].isin(top5)])
+        corr = aggregate(('corr', ('sales', 'quantity', 'order_id')), lambda: data[['sales', 'quantity', 'order_id']].corr())
+        charts = [
+            (('line', ('groupby', 'date', 'sales', 'sum')), lambda: px.line(df_date, x='date', y='sales')),
+            (('bar', ('top_groupby', 'region', 'sales', 'sum', 10)), lambda: px.bar(df_agg, x='region', y='sales')),
+            (('pie', ('top_groupby', 'region', 'sales', 'sum', 10)),
+             lambda: px.pie(df_agg, values='sales', names='region')),
+            (('histogram', ('rows',), 'sales'), lambda: px.histogram(data, x='sales')),
+            (('box', ('top_rows', 'product', 5), 'sales'), lambda: px.box(df_top, x='product', y='sales')),
+            (('scatter', ('top_rows', 'product', 5), 'sales', 'quantity'),
+             lambda: px.scatter(df_top, x='sales', y='quantity', color='product')),
+            (('heatmap', ('corr', ('sales', 'quantity', 'order_id'))), lambda: px.imshow(corr, text_auto=True)),
+        ]
+        return [figure(spec, make) for spec, make in charts]
+
+    logging.disable(logging.CRITICAL)
+    try:
+        aggregations = AggregationCache()
+        aggregate = aggregations.scoped('bench')
+        build(aggregate, lambda spec, make: make())  # warm the aggregations so only figure building is timed
+
+        start = time.perf_counter()
+        for _ in range(reruns):
+            figures = build(aggregate, lambda spec, make: make())
+        rebuild_time = (time.perf_counter() - start) / reruns
+        session_figures = sum(figure_nbytes(fig) for fig in figures[1:])  # the trend line is not saved
+
+        cache = FigureCache()
+        start = time.perf_counter()
+        for _ in range(sessions * reruns):
+            keyed = build(aggregate, lambda spec, make: cache.figure('bench', (), spec, make))
+        cached_time = (time.perf_counter() - start) / (sessions * reruns)
+        session_keys = len(pickle.dumps([key for key, _ in keyed[1:]]))
+        shared = cache.stats()['bytes']
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"{len(data):,} rows, 7 figures per rerun, {sessions} sessions x {reruns} reruns")
+    print(f"  rebuild every rerun:  {rebuild_time * 1e3:8.1f} ms/rerun  "
+          f"session state {session_figures / 1024 ** 2:6.2f} MB/session ({sessions * session_figures / 1024 ** 2:.1f} MB total)")
+    print(f"  figure cache:         {cached_time * 1e3:8.1f} ms/rerun  "
+          f"session state {session_keys:,} bytes/session, shared figures {shared / 1024 ** 2:.2f} MB once")
+
+
+def bench_large_series():
+    """1M-point trend line and anomaly scatter: every point as SVG traces vs LTTB sample + WebGL"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from large_series import point_budget, downsample_indices, window_bounds
+
+    rng = np.random.default_rng(7)
+    n = 1_000_000
+    x = pd.date_range('2020-01-01', periods=n, freq='min').to_numpy()
+    y = rng.normal(0, 1, n) + 2 * np.sin(np.arange(n) / 5_000)
+    y[rng.choice(n, 200, replace=False)] += rng.choice([-15, 15], 200)
+    q1, q3 = np.percentile(y, [25, 75])
+    flagged = (y < q1 - 1.5 * (q3 - q1)) | (y > q3 + 1.5 * (q3 - q1))
+    series = pd.DataFrame({'date': x, 'value': y})
+    budget = point_budget()
+
+    def full():
+        line = px.line(series, x='date', y='value')
+        scatter = go.Figure([go.Scatter(x=x[~flagged], y=y[~flagged], mode='markers'),
+                             go.Scatter(x=x[flagged], y=y[flagged], mode='markers')])
+        return line, scatter
+
+    def sampled(start=0, end=n):
+        picks = start + downsample_indices(x[start:end], y[start:end], budget)
+        line = px.line(series.iloc[picks], x='date', y='value', render_mode='webgl')
+        shown = start + downsample_indices(x[start:end], y[start:end], budget, keep=flagged[start:end])
+        normal, anomalous = shown[~flagged[shown]], shown[flagged[shown]]
+        scatter = go.Figure([go.Scattergl(x=x[normal], y=y[normal], mode='markers'),
+                             go.Scattergl(x=x[anomalous], y=y[anomalous], mode='markers')])
+        return line, scatter, len(anomalous)
+
+    def measure(make):
+        start = time.perf_counter()
+        figures = make()
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        payload = sum(len(fig.to_json()) for fig in figures[:2])
+        return build, time.perf_counter() - start, payload, figures
+
+    full_build, full_json, full_payload, _ = measure(full)
+    lttb_build, lttb_json, lttb_payload, figures = measure(sampled)
+    # Zoomed to one day: the window fits the budget, so every point in it is sent
+    low, high = x[500_000], x[500_000] + np.timedelta64(1, 'D')
+    zoom_start, zoom_end = window_bounds(x, low, high)
+    zoom_build, zoom_json, zoom_payload, _ = measure(lambda: sampled(zoom_start, zoom_end))
+
+    print(f"{n:,} points, {int(flagged.sum())} anomalies, point budget {budget}")
+    print(f"  full resolution (SVG): build {full_build * 1e3:8.1f} ms  serialize {full_json * 1e3:8.1f} ms  "
+          f"payload {full_payload / 1024 ** 2:7.2f} MB")
+    print(f"  LTTB + WebGL:          build {lttb_build * 1e3:8.1f} ms  serialize {lttb_json * 1e3:8.1f} ms  "
+          f"payload {lttb_payload / 1024 ** 2:7.2f} MB  ({figures[2]} anomalies kept)")
+    print(f"  zoomed to 1 day:       build {zoom_build * 1e3:8.1f} ms  serialize {zoom_json * 1e3:8.1f} ms  "
+          f"payload {zoom_payload / 1024 ** 2:7.2f} MB  ({zoom_end - zoom_start:,} points in range)")
+
+
+BENCHMARKS = {
+    'change_detection': bench_change_detection,
+    'config_persistence': bench_config_persistence,
+    'alert_engine': bench_alert_engine,
+    'quantile_sketch': bench_quantile_sketch,
+    'alert_firing': bench_alert_firing,
+    'alert_history': bench_alert_history,
+    'alert_suppression': bench_alert_suppression,
+    'alert_digest': bench_alert_digest,
+    'alert_pipeline': bench_alert_pipeline,
+    'backtest': bench_backtest,
+    'rolling_window': bench_rolling_window,
+    'logging': bench_logging,
+    'notifications': bench_notifications,
+    'notification_hub': bench_notification_hub,
+    'notification_center': bench_notification_center,
+    'dataset_profile': bench_dataset_profile,
+    'filter_index': bench_filter_index,
+    'aggregation_cache': bench_aggregation_cache,
+    'figure_cache': bench_figure_cache,
+    'large_series': bench_large_series,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,216 @@
+import os
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeDetector:
+    """Vectorized change detection for synced DataFrames.
+
+    Every column is hashed with ``pd.util.hash_pandas_object`` and folded into
+    per-row hashes, which are kept (in memory and on disk) per sync source
+    together with one digest per column. The next sync can then report which
+    rows were added, removed or modified and which columns changed, without
+    rendering the frame to text.
+    """
+
+    def __init__(self, storage_dir: str = "realtime_data"):
+        self.storage_dir = storage_dir
+        self._state_cache = {}
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+    def hash_columns(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return one uint64 hash array per column, independent of the index"""
+        return {
+            col: pd.util.hash_pandas_object(data[col], index=False).to_numpy(dtype=np.uint64)
+            for col in data.columns
+        }
+
+    def combine_hashes(self, column_hashes: Dict[str, np.ndarray], rows: int) -> np.ndarray:
+        """Fold per-column hashes into one uint64 hash per row"""
+        row_hashes = np.zeros(rows, dtype=np.uint64)
+        for col_hashes in column_hashes.values():
+            row_hashes = (row_hashes * np.uint64(0x100000001B3)) ^ col_hashes
+        return row_hashes
+
+    def hash_rows(self, data: pd.DataFrame) -> np.ndarray:
+        """Return one uint64 hash per row, independent of the index"""
+        return self.combine_hashes(self.hash_columns(data), len(data))
+
+    def hash_keys(self, data: pd.DataFrame, key_columns: Optional[List[str]]) -> Optional[np.ndarray]:
+        """Return one uint64 hash per row built from the key columns only"""
+        if not key_columns or not all(col in data.columns for col in key_columns):
+            return None
+        return self.hash_rows(data[key_columns])
+
+    def combined_digest(self, data: pd.DataFrame, row_hashes: np.ndarray) -> str:
+        """Combine the row hashes and the schema into one digest"""
+        digest = hashlib.md5()
+        schema = "|".join(f"{col}:{dtype}" for col, dtype in data.dtypes.items())
+        digest.update(schema.encode())
+        digest.update(np.ascontiguousarray(row_hashes).tobytes())
+        return digest.hexdigest()
+
+    def fingerprint(self, data: pd.DataFrame, key_columns: Optional[List[str]] = None) -> Dict:
+        """Compute row hashes, per-column digests, optional key hashes and the combined digest"""
+        column_hashes = self.hash_columns(data)
+        row_hashes = self.combine_hashes(column_hashes, len(data))
+        return {
+            'digest': self.combined_digest(data, row_hashes),
+            'row_hashes': row_hashes,
+            'key_hashes': self.hash_keys(data, key_columns),
+            'column_digests': {
+                str(col): f"{data[col].dtype}:{hashlib.md5(hashes.tobytes()).hexdigest()}"
+                for col, hashes in column_hashes.items()
+            }
+        }
+
+    def _state_path(self, state_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{state_id}_rowhashes.npz")
+
+    def load_state(self, state_id: str) -> Optional[Dict]:
+        """Load the stored fingerprint for a source"""
+        if state_id in self._state_cache:
+            return self._state_cache[state_id]
+
+        path = self._state_path(state_id)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with np.load(path) as stored:
+                state = {
+                    'digest': str(stored['digest']),
+                    'row_hashes': stored['row_hashes'],
+                    'key_hashes': stored['key_hashes'] if 'key_hashes' in stored.files else None,
+                    'column_digests': dict(zip(stored['column_names'].tolist(), stored['column_digests'].tolist()))
+                    if 'column_names' in stored.files else {}
+                }
+        except Exception as e:
+            logger.warning(f"Could not load row hashes for {state_id}: {e}")
+            return None
+
+        self._state_cache[state_id] = state
+        return state
+
+    def save_state(self, state_id: str, state: Dict):
+        """Persist the fingerprint for a source"""
+        self._state_cache[state_id] = state
+        arrays = {
+            'digest': np.array(state['digest']),
+            'row_hashes': state['row_hashes'],
+            'column_names': np.array(list(state['column_digests'].keys()), dtype=str),
+            'column_digests': np.array(list(state['column_digests'].values()), dtype=str)
+        }
+        if state.get('key_hashes') is not None:
+            arrays['key_hashes'] = state['key_hashes']
+
+        path = self._state_path(state_id)
+        tmp_path = f"{path}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not save row hashes for {state_id}: {e}")
+
+    @staticmethod
+    def _match_sorted(sorted_keys: np.ndarray, keys: np.ndarray):
+        """Look up ``keys`` in ``sorted_keys``; return a found mask and the matched positions"""
+        if len(sorted_keys) == 0:
+            return np.zeros(len(keys), dtype=bool), np.zeros(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        found = sorted_keys[pos] == keys
+        return found, pos[found]
+
+    def compare(self, previous: Optional[Dict], current: Dict) -> Dict:
+        """Report added, removed and modified row positions and changed columns between two fingerprints.
+
+        With key hashes, rows are matched by key; otherwise they are matched by
+        position. Added and modified positions refer to the current frame,
+        removed positions to the previous one.
+        """
+        new_rows = current['row_hashes']
+        empty = np.zeros(0, dtype=np.int64)
+
+        if previous is None:
+            return {
+                'has_changes': True,
+                'added_rows': np.arange(len(new_rows)),
+                'removed_rows': empty,
+                'modified_rows': empty,
+                'changed_columns': set(current['column_digests'])
+            }
+
+        if previous['digest'] == current['digest']:
+            return {
+                'has_changes': False,
+                'added_rows': empty,
+                'removed_rows': empty,
+                'modified_rows': empty,
+                'changed_columns': set()
+            }
+
+        old_columns = previous.get('column_digests', {})
+        new_columns = current['column_digests']
+        changed_columns = {
+            col for col in set(old_columns) | set(new_columns)
+            if old_columns.get(col) != new_columns.get(col)
+        }
+
+        old_rows = previous['row_hashes']
+        old_keys = previous.get('key_hashes')
+        new_keys = current.get('key_hashes')
+
+        if old_keys is not None and new_keys is not None and not np.array_equal(old_keys, new_keys):
+            # Keys are assumed unique; the first occurrence wins on duplicates
+            old_sorter = np.argsort(old_keys, kind='stable')
+            matched, matched_old = self._match_sorted(old_keys[old_sorter], new_keys)
+            matched_old = old_sorter[matched_old]
+
+            added = np.flatnonzero(~matched)
+            matched_new = np.flatnonzero(matched)
+            modified = matched_new[new_rows[matched_new] != old_rows[matched_old]]
+
+            still_present, _ = self._match_sorted(np.sort(new_keys), old_keys)
+            removed = np.flatnonzero(~still_present)
+        else:
+            overlap = min(len(old_rows), len(new_rows))
+            modified = np.flatnonzero(old_rows[:overlap] != new_rows[:overlap])
+            added = np.arange(overlap, len(new_rows))
+            removed = np.arange(overlap, len(old_rows))
+
+        return {
+            'has_changes': True,
+            'added_rows': added,
+            'removed_rows': removed,
+            'modified_rows': modified,
+            'changed_columns': changed_columns
+        }
+
+    def detect_changes(self, state_id: str, data: pd.DataFrame, key_columns: Optional[List[str]] = None) -> Dict:
+        """Fingerprint new data, compare it with the stored state and return the change report.
+
+        The stored state is only replaced by ``commit``, so a failed write of
+        the new snapshot leaves the old hashes in place for the next attempt.
+        """
+        current = self.fingerprint(data, key_columns)
+        previous = self.load_state(state_id)
+        report = self.compare(previous, current)
+        report['baseline_missing'] = previous is None
+        report['digest'] = current['digest']
+        report['fingerprint'] = current
+        return report
+
+    def delta_rows(self, data: pd.DataFrame, report: Dict) -> pd.DataFrame:
+        """Return the added and modified rows of ``data`` described by a change report"""
+        positions = np.union1d(report['added_rows'], report['modified_rows'])
+        return data.iloc[positions]
+
+    def commit(self, state_id: str, report: Dict):
+        """Store the fingerprint from a change report as the new baseline"""
+        self.save_state(state_id, report['fingerprint'])
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _plain(value):
+    """``value`` as it round-trips through the JSON file, for comparing in-memory and on-disk fields"""
+    return json.loads(json.dumps(value, default=str))
+
+
+class JsonConfigStore:
+    """Dirty-tracked JSON persistence for a config dict.
+
+    Callers mutate the dict in place and call ``mark_dirty``. Changes are
+    coalesced and written at most once every ``flush_interval`` seconds by a
+    background flusher (and once more at shutdown), using compact JSON written
+    to a temp file and atomically renamed over the original.
+
+    Several processes share the file, so a flush first folds in anything
+    another process wrote since this store last read or wrote it: entries
+    and fields changed in memory since then win, everything else is taken
+    from disk (a three-way merge against the last synced contents).
+    Pass ``lock`` to share the lock with code that mutates the entries.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0, clock: Callable[[], float] = time.monotonic,
+                 lock=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.data = {}
+        self.writes = 0
+        self.skipped_writes = 0
+
+        self._dirty = False
+        self._last_write = None
+        self._disk_mtime = None
+        self._base_payload = None  # file contents this store last read or wrote
+        self._lock = lock or threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher = None
+        atexit.register(self.close)
+
+    def load(self) -> Dict:
+        """Load the config from disk, keeping an empty dict if it is missing or unreadable"""
+        disk_data = self.read_disk()
+        if disk_data is not None:
+            self.data = disk_data
+        return self.data
+
+    def read_disk(self):
+        """Read the current file contents without touching the in-memory dict"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r') as f:
+                payload = f.read()
+            disk_data = json.loads(payload)
+            self._disk_mtime = mtime
+            self._base_payload = payload
+            return disk_data
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Could not load {self.path}: {e}")
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """True if another process replaced the file since this store last read or wrote it"""
+        try:
+            return os.stat(self.path).st_mtime_ns != self._disk_mtime
+        except OSError:
+            return False
+
+    def refresh(self) -> bool:
+        """Replace the in-memory dict contents (in place) with the file if it changed on disk"""
+        if self._dirty or not self.changed_on_disk():
+            return False
+        disk_data = self.read_disk()
+        if disk_data is None:
+            return False
+        with self._lock:
+            self.data.clear()
+            self.data.update(disk_data)
+        return True
+
+    def merge_from_disk(self) -> bool:
+        """Fold changes another process wrote to the file into the in-memory dict, keeping local changes"""
+        with self._lock:
+            if not self.changed_on_disk():
+                return False
+            return self._merge_disk_changes()
+
+    def _merge_disk_changes(self) -> bool:
+        """Three-way merge of the file into ``self.data``; call with the lock held"""
+        base = json.loads(self._base_payload) if self._base_payload else {}
+        disk = self.read_disk()
+        if disk is None:
+            return False
+
+        current = self.data
+        for key in list(current):
+            if key in base and key not in disk:
+                del current[key]  # deleted by another process
+        for key, disk_entry in disk.items():
+            if key not in current:
+                if key not in base:
+                    current[key] = disk_entry  # added by another process
+                continue
+            entry, base_entry = current[key], base.get(key)
+            if not isinstance(entry, dict) or not isinstance(base_entry, dict) or not isinstance(disk_entry, dict):
+                if base_entry is not None and _plain(entry) == base_entry:
+                    current[key] = disk_entry
+                continue
+            # Update fields in place so references held by other threads stay valid
+            for field in set(base_entry) | set(disk_entry):
+                local = _plain(entry[field]) if field in entry else _MISSING
+                if local != base_entry.get(field, _MISSING):
+                    continue  # changed here since the last read or write
+                if field in disk_entry:
+                    entry[field] = disk_entry[field]
+                else:
+                    entry.pop(field, None)
+        return True
+
+    def mark_dirty(self):
+        """Record that the config changed; the write happens on the next flush"""
+        if self._dirty:
+            self.skipped_writes += 1
+        self._dirty = True
+        self._ensure_flusher()
+
+    def flush(self, force: bool = False) -> bool:
+        """Write the config if it is dirty and the flush interval has passed (or ``force`` is set)"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            now = self.clock()
+            if not force and self._last_write is not None and now - self._last_write < self.flush_interval:
+                return False
+
+            try:
+                if self.changed_on_disk():
+                    self._merge_disk_changes()
+                payload = json.dumps(self.data, separators=(',', ':'), default=str)
+            except RuntimeError as e:
+                # The sync thread mutated the dict mid-serialization; retry on the next flush
+                logger.debug(f"Deferred write of {self.path}: {e}")
+                return False
+
+            self._dirty = False
+            self._last_write = now
+            try:
+                self._atomic_write(payload)
+                self.writes += 1
+                return True
+            except OSError as e:
+                self._dirty = True
+                logger.error(f"Could not save {self.path}: {e}")
+                return False
+
+    def _atomic_write(self, payload: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._disk_mtime = os.stat(self.path).st_mtime_ns
+            self._base_payload = payload
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+
+        def flush_worker():
+            while not self._stop_event.wait(self.flush_interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=flush_worker, daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """Stop the background flusher and write any pending changes"""
+        self._stop_event.set()
+        self.flush(force=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            'path': self.path,
+            'dirty': self._dirty,
+            'writes': self.writes,
+            'coalesced_changes': self.skipped_writes
+        }
@@ -10,6 +10,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 import plotly.io as pio
+import plotly.graph_objects as go
 from dotenv import load_dotenv
 import shutil
 
@@ -29,6 +30,10 @@ def ensure_figure_colors(fig):
 
 # Import export manager
 from export_sharing_manager import export_manager
+from snapshot_store import load_user_dataset
+from dataset_profile import get_dataset_profile
+from filter_index import get_filter_index
+from figure_cache import figure_cache
 
 # Load environment variables
 load_dotenv()
@@ -173,8 +178,8 @@ class ReportGenerator:
             
             thumbnail_path = os.path.join(user_dash_dir, f"{dashboard_id}_thumbnail.png")
             
-            # Create thumbnail with specified dimensions
-            fig_copy = ensure_figure_colors(chart_fig)
+            # Create thumbnail with specified dimensions on a copy; cached figures are shared between sessions
+            fig_copy = ensure_figure_colors(go.Figure(chart_fig))
             fig_copy.update_layout(
                 width=width,
                 height=height,
@@ -242,6 +247,8 @@ class ReportGenerator:
         # Convert image to base64 for CSV storage
         image_base64 = self.image_to_base64(thumbnail_path) if thumbnail_path else ""
         
+        profile = get_dataset_profile(df)
+        
         # Prepare comprehensive report data with AI summary
         report_data = {
             "Report ID": [dashboard_data['dashboard_id']],
@@ -258,21 +265,20 @@ class ReportGenerator:
             "Forecast Results": [json.dumps(dashboard_data.get('forecast_results', {}), indent=2)],
             "Anomaly Points": [json.dumps(dashboard_data.get('anomalies', {}), indent=2)],
             "Chart Info": [json.dumps(dashboard_data.get('chart_info', {}), indent=2)],
-            "Total Records": [len(df)],
-            "Total Columns": [len(df.columns)],
-            "Numerical Columns": [str(df.select_dtypes(include=['int64', 'float64']).columns.tolist())],
-            "Categorical Columns": [str(df.select_dtypes(include=['object', 'category']).columns.tolist())],
-            "Date Columns": [str(df.select_dtypes(include=['datetime64']).columns.tolist())]
+            "Total Records": [profile.rows],
+            "Total Columns": [len(profile.columns)],
+            "Numerical Columns": [str(profile.numerical)],
+            "Categorical Columns": [str(profile.categorical)],
+            "Date Columns": [str(profile.date)]
         }
         
         # Add basic statistics for numerical columns
-        numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        for col in numerical_cols[:3]:  # Limit to first 3 numerical columns
-            report_data[f"{col}_mean"] = [f"{df[col].mean():.2f}"]
-            report_data[f"{col}_median"] = [f"{df[col].median():.2f}"]
-            report_data[f"{col}_std"] = [f"{df[col].std():.2f}"]
-            report_data[f"{col}_min"] = [f"{df[col].min():.2f}"]
-            report_data[f"{col}_max"] = [f"{df[col].max():.2f}"]
+        for col in profile.numerical[:3]:  # Limit to first 3 numerical columns
+            report_data[f"{col}_mean"] = [f"{profile.stats[col]['mean']:.2f}"]
+            report_data[f"{col}_median"] = [f"{profile.stats[col]['median']:.2f}"]
+            report_data[f"{col}_std"] = [f"{profile.stats[col]['std']:.2f}"]
+            report_data[f"{col}_min"] = [f"{profile.min[col]:.2f}"]
+            report_data[f"{col}_max"] = [f"{profile.max[col]:.2f}"]
         
         # Create CSV report
         report_df = pd.DataFrame(report_data)
@@ -752,7 +758,10 @@ class DashboardSavingUI:
                     # PDF Download Button
                     if st.button("📄 PDF", key=f"pdf_{dashboard['dashboard_id']}", use_container_width=True):
                         # Use current session chart figures if available
-                        current_chart_figures = st.session_state.get('chart_figures', [])
+                        current_chart_figures, missing_charts = figure_cache.resolve(st.session_state.get('chart_figure_keys', []))
+                        if missing_charts:
+                            st.warning(f"⚠️ Left out of the PDF because they expired from the chart cache: "
+                                       f"{', '.join(missing_charts)}. Regenerate the dashboard to include them.")
                         if current_chart_figures:
                             with st.spinner("Generating PDF..."):
                                 pdf_dashboard_data = {
@@ -836,25 +845,23 @@ class DashboardSavingUI:
         
         # Load the original data
         owner_username = dashboard['username']
-        original_data_path = os.path.join("user_data", f"{owner_username}.csv")
+        original_df = load_user_dataset(owner_username)
         
-        if os.path.exists(original_data_path):
-            original_df = pd.read_csv(original_data_path)
+        if original_df is not None:
             
             st.write("### Modify Filters")
             st.info("You have edit access to this dashboard. You can modify the filters and save a new version.")
             
-            # Create filters similar to auto_generate_dashboard
-            numerical_cols = original_df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-            categorical_cols = original_df.select_dtypes(include=['object', 'category']).columns.tolist()
-            
-            filtered_df = original_df.copy()
+            # Create filters similar to auto_generate_dashboard, from the cached dataset profile
+            profile = get_dataset_profile(original_df)
+            numerical_cols = profile.numerical
+            categorical_cols = profile.categorical
             
             # Create filters for categorical columns
             filter_options = {}
             if categorical_cols:
                 for j, col in enumerate(categorical_cols[:3]):
-                    unique_values = original_df[col].unique().tolist()
+                    unique_values = profile.unique_values[col]
                     selected_values = st.multiselect(
                         f"Filter by {col}", 
                         options=unique_values,
@@ -866,7 +873,7 @@ class DashboardSavingUI:
             # Create filters for numerical columns
             if numerical_cols:
                 for j, col in enumerate(numerical_cols[:2]):
-                    min_val, max_val = float(original_df[col].min()), float(original_df[col].max())
+                    min_val, max_val = profile.min[col], profile.max[col]
                     selected_range = st.slider(
                         f"Range for {col}", 
                         min_val, max_val, (min_val, max_val),
@@ -874,18 +881,11 @@ class DashboardSavingUI:
                     )
                     filter_options[col] = selected_range
             
-            # Apply filters to the dataframe
-            for col, value in filter_options.items():
-                if col in categorical_cols:
-                    if value:
-                        filtered_df = filtered_df[filtered_df[col].isin(value)]
-                elif col in numerical_cols:
-                    filtered_df = filtered_df[
-                        (filtered_df[col] >= value[0]) & 
-                        (filtered_df[col] <= value[1])
-                    ]
+            # Apply filters through the per-dataset filter index
+            filter_index = get_filter_index(original_df, tuple(categorical_cols[:3]), tuple(numerical_cols[:2]))
+            filtered_df = filter_index.apply(original_df, filter_options)
             
-            st.write(f"**Filtered Data:** {len(filtered_df)} of {len(original_df)} records")
+            st.write(f"**Filtered Data:** {len(filtered_df)} of {profile.rows} records")
             
             # Show filtered data preview
             st.dataframe(filtered_df.head())
@@ -904,7 +904,7 @@ class DashboardSavingUI:
                 
                 # Store the original session state to restore later
                 original_chart_info = st.session_state.get('chart_info', {})
-                original_chart_figures = st.session_state.get('chart_figures', [])
+                original_chart_figure_keys = st.session_state.get('chart_figure_keys', [])
                 
                 # Generate new dashboard with filtered data
                 st.subheader("Updated Dashboard Preview")
@@ -912,11 +912,11 @@ class DashboardSavingUI:
                 
                 # Store updated chart info for saving
                 st.session_state[f'updated_chart_info_{dashboard_id}'] = st.session_state.get('chart_info', {})
-                st.session_state[f'updated_chart_figures_{dashboard_id}'] = st.session_state.get('chart_figures', [])
+                st.session_state[f'updated_chart_figure_keys_{dashboard_id}'] = st.session_state.get('chart_figure_keys', [])
                 
                 # Restore original session state
                 st.session_state['chart_info'] = original_chart_info
-                st.session_state['chart_figures'] = original_chart_figures
+                st.session_state['chart_figure_keys'] = original_chart_figure_keys
             
             # Save as new version
             new_dashboard_name = st.text_input("New Dashboard Name", 
@@ -927,7 +927,12 @@ class DashboardSavingUI:
                 if new_dashboard_name:
                     # Get updated chart info and figures if available
                     updated_chart_info = st.session_state.get(f'updated_chart_info_{dashboard_id}', dashboard.get('chart_info', {}))
-                    updated_chart_figures = st.session_state.get(f'updated_chart_figures_{dashboard_id}', [])
+                    updated_chart_figures, missing_charts = figure_cache.resolve(
+                        st.session_state.get(f'updated_chart_figure_keys_{dashboard_id}', [])
+                    )
+                    if missing_charts:
+                        st.warning(f"⚠️ Saved without these charts, which expired from the chart cache: "
+                                   f"{', '.join(missing_charts)}. Show the updated dashboard again to include them.")
                     
                     # Create new dashboard with filtered data
                     new_dashboard_id = self.report_gen.save_dashboard(
@@ -948,7 +953,7 @@ class DashboardSavingUI:
                         st.session_state[f'editing_dashboard_{dashboard_id}'] = False
                         # Clear temporary session state
                         for key in [f'filtered_df_{dashboard_id}', f'show_updated_dashboard_{dashboard_id}', 
-                                  f'updated_chart_info_{dashboard_id}', f'updated_chart_figures_{dashboard_id}']:
+                                  f'updated_chart_info_{dashboard_id}', f'updated_chart_figure_keys_{dashboard_id}']:
                             if key in st.session_state:
                                 del st.session_state[key]
                 else:
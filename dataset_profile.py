@@ -0,0 +1,133 @@
+import hashlib
+import weakref
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+NUMERICAL_DTYPES = ['int64', 'float64']
+CATEGORICAL_DTYPES = ['object', 'category']
+DATE_DTYPES = ['datetime64']
+TOP_K = 10
+
+# id(df) -> (weak reference to df, digest); lets every stage of a rerun share one hash of the same frame
+_hash_memo: Dict[int, tuple] = {}
+
+
+def dataset_hash(df: pd.DataFrame) -> str:
+    """Digest of a DataFrame's columns, dtypes and every value.
+
+    Numeric and datetime columns are hashed straight from their buffers.
+    Other columns are factorized and hashed as codes plus the hashed
+    uniques, which is several times faster than hashing every string.
+    The digest is remembered for as long as the frame object lives, so
+    frames must not be modified in place once they have been hashed.
+    """
+    key = id(df)
+    memo = _hash_memo.get(key)
+    if memo is not None and memo[0]() is df:
+        return memo[1]
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(repr((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8).data)
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        digest.update(np.ascontiguousarray(codes).view(np.uint8).data)
+        digest.update(pd.util.hash_pandas_object(pd.Index(uniques), index=False).to_numpy().data)
+    digest = digest.hexdigest()
+    _hash_memo[key] = (weakref.ref(df, lambda _, key=key: _hash_memo.pop(key, None)), digest)
+    return digest
+
+
+class DatasetProfile:
+    """Column roles and summary statistics of one dataset, computed in a single pass per column.
+
+    Dashboard generation, insights, reports and the shared-dashboard editor
+    all read roles, filter options and ranges from here instead of calling
+    ``select_dtypes``/``unique``/``value_counts`` on the data every rerun.
+    Roles follow the ``select_dtypes`` groups the dashboard has always used.
+    Profiles are shared between sessions (see ``get_dataset_profile``) and
+    must be treated as read-only.
+    """
+
+    def __init__(self, df: pd.DataFrame, top_k: int = TOP_K):
+        self.rows = len(df)
+        self.columns = list(df.columns)
+        self.numerical: List[str] = df.select_dtypes(include=NUMERICAL_DTYPES).columns.tolist()
+        self.categorical: List[str] = df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+        self.date: List[str] = df.select_dtypes(include=DATE_DTYPES).columns.tolist()
+
+        self.null_counts: Dict[str, int] = {col: int(n) for col, n in df.isna().sum().items()}
+        self.cardinality: Dict[str, int] = {}
+        self.min: Dict[str, object] = {}
+        self.max: Dict[str, object] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.top_values: Dict[str, List[tuple]] = {}
+        self.unique_values: Dict[str, list] = {}
+
+        for col in self.categorical:
+            # One factorize gives the uniques (in order of appearance, like ``unique()``) and their counts
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            counts = np.bincount(codes, minlength=len(uniques))
+            uniques = np.asarray(uniques, dtype=object)
+            valid = ~pd.isna(uniques)
+            valid_uniques, valid_counts = uniques[valid], counts[valid]
+            order = np.argsort(-valid_counts, kind='stable')[:top_k]
+            self.unique_values[col] = uniques.tolist()
+            self.cardinality[col] = int(valid.sum())
+            self.top_values[col] = [(valid_uniques[i], int(valid_counts[i])) for i in order]
+
+        for col in self.numerical:
+            values = df[col].to_numpy(dtype=np.float64)
+            present = values[~np.isnan(values)]
+            self.cardinality[col] = int(len(np.unique(present)))
+            if len(present):
+                self.min[col], self.max[col] = float(present.min()), float(present.max())
+                self.stats[col] = {
+                    'mean': float(present.mean()),
+                    'median': float(np.median(present)),
+                    'std': float(present.std(ddof=1)) if len(present) > 1 else float('nan'),
+                    'sum': float(present.sum())
+                }
+            else:
+                self.min[col] = self.max[col] = float('nan')
+                self.stats[col] = {'mean': float('nan'), 'median': float('nan'), 'std': float('nan'), 'sum': 0.0}
+
+        for col in self.date:
+            self.cardinality[col] = int(df[col].nunique())
+            self.min[col], self.max[col] = df[col].min(), df[col].max()
+
+        for col in self.columns:
+            if col not in self.cardinality:
+                self.cardinality[col] = int(df[col].nunique())
+
+    def role(self, col: str) -> str:
+        if col in self.numerical:
+            return 'numerical'
+        if col in self.categorical:
+            return 'categorical'
+        if col in self.date:
+            return 'date'
+        return 'other'
+
+    def roles(self) -> Dict[str, List[str]]:
+        """Column lists in the shape stored in ``chart_info['columns']``"""
+        return {'numerical': list(self.numerical), 'categorical': list(self.categorical), 'date': list(self.date)}
+
+
+@st.cache_resource(max_entries=16, show_spinner=False, hash_funcs={pd.DataFrame: dataset_hash})
+def get_dataset_profile(df: pd.DataFrame) -> DatasetProfile:
+    """The shared, read-only profile of ``df``, computed once per distinct dataset content.
+
+    ``cache_resource`` hands out the same object instead of unpickling a copy
+    (``unique_values`` included) on every hit.
+    """
+    return DatasetProfile(df)
@@ -0,0 +1,87 @@
+import os
+import logging
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from aggregation_cache import AggregationCache
+
+logger = logging.getLogger(__name__)
+
+# Trace properties that carry per-point data; object arrays and lists are counted at 64 bytes per item
+DATA_PROPERTIES = ('x', 'y', 'z', 'values', 'labels', 'parents', 'ids', 'text', 'customdata', 'hovertext')
+
+
+def figure_nbytes(fig) -> int:
+    """Approximate memory of the per-point data embedded in a figure's traces"""
+    total = 0
+    for trace in getattr(fig, 'data', ()):
+        for prop in DATA_PROPERTIES:
+            value = getattr(trace, prop, None)
+            if isinstance(value, np.ndarray):
+                total += value.nbytes if value.dtype != object else value.size * 64
+            elif isinstance(value, (list, tuple)):
+                total += len(value) * 64
+        marker = getattr(trace, 'marker', None)
+        color = getattr(marker, 'color', None) if marker is not None else None
+        if isinstance(color, np.ndarray):
+            total += color.nbytes
+    return total + 16 * 1024  # layout, template and trace metadata
+
+
+def chart_label(key: tuple) -> str:
+    """Readable name of the chart a figure key refers to, e.g. ``bar chart of region, sales``"""
+    spec = key[2]
+    if spec[0] == 'query':
+        chart_type, columns = spec[1], spec[2]
+    else:
+        chart_type = spec[0]
+        # Column names follow the aggregation kind in the nested spec, then come the plotted columns
+        args = [arg for item in spec[1][1:] for arg in (item if isinstance(item, tuple) else (item,))]
+        columns = [arg for arg in args if isinstance(arg, str) and arg not in ('sum', 'mean', 'count')]
+        columns += [item for item in spec[2:] if isinstance(item, str)]
+    columns = list(dict.fromkeys(str(col) for col in columns))
+    return f"{chart_type} chart of {', '.join(columns)}" if columns else f"{chart_type} chart"
+
+
+class FigureCache(AggregationCache):
+    """Process-wide LRU of built Plotly figures, bounded by the data they embed.
+
+    Keys extend the aggregation cache keys with a chart spec, i.e.
+    ``(dataset version, filter state, chart spec)`` where the chart spec names
+    the aggregation it plots. Sessions keep only these keys (in
+    ``st.session_state['chart_figure_keys']``) and resolve them when saving or
+    exporting, telling the user about any chart evicted meanwhile. Figures are
+    shared between sessions: code that needs to change one (thumbnails,
+    exports) must work on a copy.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        super().__init__(max_bytes, sizeof=figure_nbytes)
+
+    def figure(self, version: str, filter_state: tuple, chart_spec: tuple, build: Callable):
+        """``(key, figure)`` for a chart, building the figure only on a miss"""
+        key = (version, filter_state, chart_spec)
+        return key, self.get(version, filter_state, chart_spec, build)
+
+    def add(self, version: str, filter_state: tuple, chart_spec: tuple, fig) -> tuple:
+        """Register an already built figure and return its key"""
+        key = (version, filter_state, chart_spec)
+        self.put(key, fig)
+        return key
+
+    def resolve(self, keys: List[tuple]) -> Tuple[list, List[str]]:
+        """Figures for stored keys, plus the labels of charts evicted since they were built"""
+        figures, missing = [], []
+        for key in keys:
+            fig = self.lookup(key)
+            if fig is None:
+                logger.warning(f"Chart {key[2]} is no longer cached; rebuild the dashboard to include it")
+                missing.append(chart_label(key))
+                continue
+            figures.append(fig)
+        return figures, missing
+
+
+# Create global instance
+figure_cache = FigureCache(max_bytes=int(os.getenv("FIGURE_CACHE_MB", "256")) * 1024 * 1024)
@@ -0,0 +1,138 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dataset_profile import dataset_hash
+
+# A selection covering at most this share of rows is written from row lists instead of a full-column gather
+SPARSE_FRACTION = 1 / 16
+
+
+class CategoricalIndex:
+    """Factorized codes of one column plus the row positions of every value, grouped by code"""
+
+    def __init__(self, series: pd.Series):
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        self.codes = codes.astype(np.int32)
+        self.uniques = pd.Index(uniques)
+        counts = np.bincount(self.codes, minlength=len(self.uniques))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.rows = np.argsort(self.codes, kind='stable').astype(np.int32)
+
+    def selected_codes(self, selected: Sequence) -> Optional[np.ndarray]:
+        """Sorted codes of the ``selected`` values; None when the selection keeps every row"""
+        codes = self.uniques.get_indexer(pd.Index(list(selected)))
+        codes = np.unique(codes[codes >= 0])
+        return None if len(codes) == len(self.uniques) else codes
+
+    def mask(self, selected: Sequence) -> Optional[np.ndarray]:
+        """Rows whose value is in ``selected``; None when the selection keeps every row"""
+        codes = self.selected_codes(selected)
+        if codes is None:
+            return None
+        n = len(self.codes)
+        counts = self.offsets[codes + 1] - self.offsets[codes]
+        if counts.sum() <= n * SPARSE_FRACTION:
+            mask = np.zeros(n, dtype=bool)
+            for code in codes:
+                mask[self.rows[self.offsets[code]:self.offsets[code + 1]]] = True
+            return mask
+        lookup = np.zeros(len(self.uniques), dtype=bool)
+        lookup[codes] = True
+        return lookup[self.codes]
+
+
+class RangeIndex:
+    """Argsort of one numeric column; a range resolves to a slice of it with two ``searchsorted`` calls"""
+
+    def __init__(self, series: pd.Series):
+        values = series.to_numpy(dtype=np.float64)
+        self.order = np.argsort(values, kind='stable')  # NaN sorts last
+        self.sorted = values[self.order]
+        self.valid = int(len(values) - np.isnan(values).sum())
+
+    def bounds(self, low: float, high: float) -> Optional[tuple]:
+        """Slice of the argsort holding ``low <= value <= high`` (never NaN); None when that is every row"""
+        start = int(np.searchsorted(self.sorted[:self.valid], low, side='left'))
+        end = int(np.searchsorted(self.sorted[:self.valid], high, side='right'))
+        return None if start == 0 and end == len(self.order) else (start, end)
+
+    def mask(self, low: float, high: float) -> Optional[np.ndarray]:
+        """Rows with ``low <= value <= high`` (never NaN); None when that is every row"""
+        bounds = self.bounds(low, high)
+        if bounds is None:
+            return None
+        n = len(self.order)
+        start, end = bounds
+        # Write whichever side of the slice is smaller
+        if end - start <= n // 2:
+            mask = np.zeros(n, dtype=bool)
+            mask[self.order[start:end]] = True
+        else:
+            mask = np.ones(n, dtype=bool)
+            mask[self.order[:start]] = False
+            mask[self.order[end:]] = False
+        return mask
+
+
+class FilterIndex:
+    """Indexes for the sidebar filter columns of one dataset version.
+
+    Built once per dataset (see ``get_filter_index``), then every filter
+    change only combines boolean masks and takes the matching rows; the
+    frame is returned as is when no filter excludes anything.
+    """
+
+    def __init__(self, df: pd.DataFrame, categorical_cols: Sequence[str] = (), numerical_cols: Sequence[str] = ()):
+        self.rows = len(df)
+        self.categorical = {col: CategoricalIndex(df[col]) for col in categorical_cols}
+        self.numerical = {col: RangeIndex(df[col]) for col in numerical_cols}
+
+    def mask(self, filters: Dict) -> Optional[np.ndarray]:
+        """Combined mask of ``{column: selected values}`` and ``{column: (low, high)}`` filters.
+
+        An empty value selection does not filter, matching the sidebar.
+        Returns None when every row passes.
+        """
+        combined = None
+        for col, value in filters.items():
+            if col in self.categorical:
+                mask = self.categorical[col].mask(value) if value else None
+            elif col in self.numerical:
+                mask = self.numerical[col].mask(value[0], value[1])
+            else:
+                continue
+            if mask is not None:
+                combined = mask if combined is None else np.logical_and(combined, mask, out=combined)
+        return combined
+
+    def normalize(self, filters: Dict) -> tuple:
+        """Hashable form of the filters that exclude rows, equal for filter states selecting the same rows.
+
+        Selections become sorted value codes and ranges become slices of the
+        argsort, so reordering a selection or nudging a slider within a gap
+        between values yields the same state.
+        """
+        state = []
+        for col, value in sorted(filters.items()):
+            if col in self.categorical:
+                codes = self.categorical[col].selected_codes(value) if value else None
+                if codes is not None:
+                    state.append((col, tuple(codes.tolist())))
+            elif col in self.numerical:
+                bounds = self.numerical[col].bounds(value[0], value[1])
+                if bounds is not None:
+                    state.append((col, bounds))
+        return tuple(state)
+
+    def apply(self, df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
+        mask = self.mask(filters)
+        return df if mask is None else df[mask]
+
+
+@st.cache_resource(max_entries=4, show_spinner=False, hash_funcs={pd.DataFrame: dataset_hash})
+def get_filter_index(df: pd.DataFrame, categorical_cols: tuple, numerical_cols: tuple) -> FilterIndex:
+    """The shared, read-only FilterIndex of ``df`` for the given filter columns"""
+    return FilterIndex(df, categorical_cols, numerical_cols)
@@ -0,0 +1,85 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+# Series longer than this switch to large-series mode (WebGL traces, LTTB downsampling, view range control)
+LARGE_SERIES_POINTS = int(os.getenv("LARGE_SERIES_POINTS", "50000"))
+# Plot width the point budget is sized for; two points per pixel keep peaks and troughs visible
+CHART_WIDTH_PX = int(os.getenv("CHART_WIDTH_PX", "1200"))
+POINTS_PER_PIXEL = 2
+
+
+def is_large(points: int) -> bool:
+    return points > LARGE_SERIES_POINTS
+
+
+def point_budget(width_px: int = CHART_WIDTH_PX) -> int:
+    """Points worth sending for a plot ``width_px`` pixels wide"""
+    return max(3, int(width_px * POINTS_PER_PIXEL))
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    """x positions as float64, datetimes as nanoseconds from the first point (keeps precision)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        ns = x.astype('datetime64[ns]').astype(np.int64)
+        return (ns - ns[0]).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions picked by Largest-Triangle-Three-Buckets for ``n_out`` points of a series sorted by x.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previous
+    pick and the mean of the next bucket. Bucket means come from prefix sums,
+    so only the per-bucket argmax runs in Python.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    every = (n - 2) / (n_out - 2)
+    # Bucket i (0 <= i < n_out - 2) covers positions [edges[i], edges[i + 1])
+    edges = (np.floor(np.arange(n_out - 1) * every) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    # Mean of the bucket after each bucket; the last bucket looks ahead to the final point
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    mean_x = (x_sums[next_end] - x_sums[next_start]) / counts
+    mean_y = (y_sums[next_end] - y_sums[next_start]) / counts
+
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (mean_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, keep: Optional[np.ndarray] = None) -> np.ndarray:
+    """Sorted positions of an LTTB sample of a series sorted by x, plus every position flagged in ``keep``.
+
+    Points with a non-finite y are left out of the sample (they draw
+    nothing) unless flagged in ``keep``.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(y))
+    picks = valid[lttb_indices(np.asarray(x)[valid], y[valid], n_out)]
+    if keep is not None:
+        picks = np.union1d(picks, np.flatnonzero(keep))
+    return picks
+
+
+def window_bounds(x_sorted: np.ndarray, low, high) -> tuple:
+    """Positions ``[start, end)`` of a sorted x array that fall within ``low <= x <= high``"""
+    return int(np.searchsorted(x_sorted, low, side='left')), int(np.searchsorted(x_sorted, high, side='right'))
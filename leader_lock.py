@@ -0,0 +1,83 @@
+import os
+import json
+import socket
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Non-blocking, process-wide exclusive file lock used for leader election.
+
+    The OS releases the lock when the holding process exits or crashes, so a
+    standby process can take over by simply retrying ``try_acquire``.
+    """
+
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self._fd = None
+        os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+
+    @property
+    def is_held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Try to become leader without blocking; return True if this process holds the lock"""
+        if self._fd is not None:
+            return True
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        owner = {
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'acquired_at': datetime.now().isoformat()
+        }
+        # Owner info goes after the first byte, which is the byte msvcrt locks
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, (" " + json.dumps(owner)).encode())
+        logger.info(f"Acquired sync leader lock {self.lock_path} (pid {owner['pid']})")
+        return True
+
+    def release(self):
+        """Give up leadership"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        logger.info(f"Released sync leader lock {self.lock_path}")
+
+    def read_owner(self) -> Optional[Dict]:
+        """Return the pid/host of the last process that acquired the lock, if recorded"""
+        try:
+            with open(self.lock_path, 'r') as f:
+                content = f.read().strip()
+            return json.loads(content) if content else None
+        except (OSError, ValueError):
+            return None
@@ -30,6 +30,13 @@ from export_sharing_manager import export_manager
 
 # Import real-time alerts manager
 from realtime_alerts_manager import realtime_manager
+from snapshot_store import load_user_dataset, clear_snapshot_manifest
+from rolling_window import MAX_WINDOW_ROWS, ROLLING_CONDITIONS
+from dataset_profile import dataset_hash, get_dataset_profile
+from filter_index import get_filter_index
+from aggregation_cache import aggregation_cache
+from figure_cache import figure_cache
+from large_series import is_large, point_budget, downsample_indices, window_bounds
 
 warnings.filterwarnings('ignore')
 
@@ -58,6 +65,8 @@ if not os.path.exists(USER_DATA_DIR):
 
 # Email regex pattern for validation
 EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+NOTIFICATION_POLL_SECONDS = int(os.getenv("NOTIFICATION_POLL_SECONDS", "10"))
+SHOW_DEBUG_PANEL = os.getenv("SHOW_DEBUG_PANEL", "false").lower() == "true"
 
 
 # ---------- Module 1: Authentication ----------
@@ -521,13 +530,12 @@ def save_user_data(username, df):
     """Saves a dataframe for a specific user."""
     file_path = os.path.join(USER_DATA_DIR, f"{username}.csv")
     df.to_csv(file_path, index=False)
+    # A fresh upload replaces whatever the sync service last published
+    clear_snapshot_manifest(username, USER_DATA_DIR)
 
 def load_user_data(username):
     """Loads a dataframe for a specific user."""
-    file_path = os.path.join(USER_DATA_DIR, f"{username}.csv")
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
-    return None
+    return load_user_dataset(username, USER_DATA_DIR)
 
 def upload_data(username):
     """Handles data upload for a specific user, supporting multiple file types including images."""
@@ -881,6 +889,32 @@ def query_understanding(df):
             st.session_state['generate_from_query'] = False
 
 # ---------- Module 5: Auto Dashboard Generation (Improved Version) ----------
+def group_aggregate(aggregate, df, by, value_col, method):
+    """Cached ``df.groupby(by)[value_col].<method>().reset_index()`` through a scoped aggregation cache"""
+    spec = ('groupby', tuple(by) if isinstance(by, list) else by, value_col, method)
+    return aggregate(spec, lambda: getattr(df.groupby(by)[value_col], method)().reset_index())
+
+def select_view_range(x_min, x_max, key):
+    """View range slider for a large series; the chart is re-sampled from the full data within the range.
+
+    Returns ``(low, high)`` as values comparable with the series' x array,
+    or None when the x values are neither numeric nor datetimes.
+    """
+    if isinstance(x_min, (pd.Timestamp, np.datetime64)):
+        low, high = pd.Timestamp(x_min).to_pydatetime(), pd.Timestamp(x_max).to_pydatetime()
+        if low >= high:
+            return None
+        selected = st.slider("View range", low, high, (low, high), key=key,
+                             help="Narrow the range to see the full-resolution data")
+        return np.datetime64(selected[0]), np.datetime64(selected[1])
+    if isinstance(x_min, (int, float, np.number)):
+        low, high = float(x_min), float(x_max)
+        if low >= high:
+            return None
+        return st.slider("View range", low, high, (low, high), key=key,
+                         help="Narrow the range to see the full-resolution data")
+    return None
+
 def auto_generate_dashboard(df, username=None):
     """Generates a dashboard, either from a query or manual selection, with AI enhancements."""
     st.subheader("📊 Auto-Generated Dashboard")
@@ -893,10 +927,11 @@ def auto_generate_dashboard(df, username=None):
     if username is None:
         username = st.session_state.get('username', 'default_user')
 
-    # Automatically identify column types
-    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    # Column roles, filter options and ranges come from the cached dataset profile
+    profile = get_dataset_profile(df)
+    numerical_cols = profile.numerical
+    categorical_cols = profile.categorical
+    date_cols = profile.date
 
     # --- AI-Driven Dashboard Generation ---
     st.subheader("AI-Driven Insights")
@@ -904,14 +939,11 @@ def auto_generate_dashboard(df, username=None):
     # 1. Dynamic Filters - Moved to the top to apply to all visualizations
     st.sidebar.subheader("📊 Dashboard Filters")
     
-    # Initialize filtered_df with original data
-    filtered_df = df.copy()
-    
     # Create filters for categorical columns
     filter_options = {}
     if categorical_cols:
         for i, col in enumerate(categorical_cols[:3]):  # Limit to 3 categorical filters
-            unique_values = df[col].unique().tolist()
+            unique_values = profile.unique_values[col]
             selected_values = st.sidebar.multiselect(
                 f"Filter by {col}", 
                 options=unique_values,
@@ -923,7 +955,7 @@ def auto_generate_dashboard(df, username=None):
     # Create filters for numerical columns
     if numerical_cols:
         for i, col in enumerate(numerical_cols[:2]):  # Limit to 2 numerical filters
-            min_val, max_val = float(df[col].min()), float(df[col].max())
+            min_val, max_val = profile.min[col], profile.max[col]
             selected_range = st.sidebar.slider(
                 f"Range for {col}", 
                 min_val, max_val, (min_val, max_val),
@@ -931,19 +963,15 @@ def auto_generate_dashboard(df, username=None):
             )
             filter_options[col] = selected_range
     
-    # Apply filters to the dataframe
-    for col, value in filter_options.items():
-        if col in categorical_cols:
-            if value:  # Only apply if values are selected
-                filtered_df = filtered_df[filtered_df[col].isin(value)]
-        elif col in numerical_cols:
-            filtered_df = filtered_df[
-                (filtered_df[col] >= value[0]) & 
-                (filtered_df[col] <= value[1])
-            ]
+    # Apply filters through the per-dataset filter index (no copy when nothing is filtered out)
+    filter_index = get_filter_index(df, tuple(categorical_cols[:3]), tuple(numerical_cols[:2]))
+    filtered_df = filter_index.apply(df, filter_options)
+    # Group-bys and figures below are reused until the data or the effective filters change
+    version, filter_state = dataset_hash(df), filter_index.normalize(filter_options)
+    aggregate = aggregation_cache.scoped(version, filter_state)
     
     # Display filter status
-    st.sidebar.info(f"Showing {len(filtered_df)} of {len(df)} records")
+    st.sidebar.info(f"Showing {len(filtered_df)} of {profile.rows} records")
     
     # 2. Automatic KPI Generation - Improved with better metrics
     st.write("---")
@@ -989,8 +1017,8 @@ def auto_generate_dashboard(df, username=None):
         "dashboard_type": "Auto-Generated"
     }
     
-    # Store chart figures for saving
-    chart_figures = []
+    # Store chart figures for saving; the session keeps only their figure cache keys
+    chart_figure_keys = []
     
     with tab1:
         st.subheader("Trend Analysis")
@@ -1000,11 +1028,32 @@ def auto_generate_dashboard(df, username=None):
             value_col = numerical_cols[0]
             
             # Aggregate data by date
-            df_date = filtered_df.groupby(date_col)[value_col].sum().reset_index()
+            df_date = group_aggregate(aggregate, filtered_df, date_col, value_col, 'sum')
+            
+            # Large series: LTTB sample sized to the plot width within the chosen view range, drawn with WebGL
+            chart_spec = ('line', ('groupby', date_col, value_col, 'sum'))
+            df_plot = df_date
+            large = is_large(len(df_date))
+            view_range = None
+            if large:
+                view_range = select_view_range(df_date[date_col].iloc[0], df_date[date_col].iloc[-1],
+                                               key=f"trend_range_{username}")
+            if view_range is not None:
+                x = df_date[date_col].to_numpy()
+                start, end = window_bounds(x, *view_range)
+                budget = point_budget()
+                df_plot = aggregate(
+                    ('lttb', chart_spec[1], start, end, budget),
+                    lambda: df_date.iloc[start + downsample_indices(x[start:end], df_date[value_col].to_numpy()[start:end], budget)]
+                )
+                chart_spec += (('lttb', start, end, budget),)
             
             # Create line chart with proper title
-            fig = px.line(df_date, x=date_col, y=value_col, 
-                         title=f"Line Chart: Trend of {value_col} over time")
+            _, fig = figure_cache.figure(
+                version, filter_state, chart_spec,
+                lambda: px.line(df_plot, x=date_col, y=value_col, title=f"Line Chart: Trend of {value_col} over time",
+                                render_mode='webgl' if large else 'auto')
+            )
             st.plotly_chart(fig, use_container_width=True, key=f"trend_line_{username}")
             
             # Store chart info for analysis
@@ -1025,15 +1074,20 @@ def auto_generate_dashboard(df, username=None):
             num_col = numerical_cols[0]
             
             # Limit to top 10 categories to avoid clutter
-            top_categories = filtered_df[cat_col].value_counts().nlargest(10).index
-            df_filtered = filtered_df[filtered_df[cat_col].isin(top_categories)]
+            top_categories = aggregate(('top_values', cat_col, 10),
+                                       lambda: filtered_df[cat_col].value_counts().nlargest(10).index)
             
             # Create bar chart with proper title
-            df_agg = df_filtered.groupby(cat_col)[num_col].sum().reset_index()
-            fig = px.bar(df_agg, x=cat_col, y=num_col, 
-                        title=f"Bar Chart: Total {num_col} by {cat_col}")
+            df_agg = aggregate(
+                ('top_groupby', cat_col, num_col, 'sum', 10),
+                lambda: filtered_df[filtered_df[cat_col].isin(top_categories)].groupby(cat_col)[num_col].sum().reset_index()
+            )
+            key, fig = figure_cache.figure(
+                version, filter_state, ('bar', ('top_groupby', cat_col, num_col, 'sum', 10)),
+                lambda: px.bar(df_agg, x=cat_col, y=num_col, title=f"Bar Chart: Total {num_col} by {cat_col}")
+            )
             st.plotly_chart(fig, use_container_width=True, key=f"comparison_bar_{username}")
-            chart_figures.append(fig)
+            chart_figure_keys.append(key)
             
             # Store chart info for analysis
             chart_info["charts"].append({
@@ -1047,10 +1101,13 @@ def auto_generate_dashboard(df, username=None):
             
             # Also show a pie chart for distribution with proper title
             if len(top_categories) <= 8:  # Only show pie chart for reasonable number of categories
-                fig_pie = px.pie(df_agg, values=num_col, names=cat_col, 
-                                title=f"Pie Chart: Distribution of {num_col} by {cat_col}")
+                key, fig_pie = figure_cache.figure(
+                    version, filter_state, ('pie', ('top_groupby', cat_col, num_col, 'sum', 10)),
+                    lambda: px.pie(df_agg, values=num_col, names=cat_col,
+                                   title=f"Pie Chart: Distribution of {num_col} by {cat_col}")
+                )
                 st.plotly_chart(fig_pie, use_container_width=True, key=f"comparison_pie_{username}")
-                chart_figures.append(fig_pie)
+                chart_figure_keys.append(key)
                 
                 # Store chart info for analysis
                 chart_info["charts"].append({
@@ -1069,9 +1126,12 @@ def auto_generate_dashboard(df, username=None):
             num_col = numerical_cols[0]
             
             # Create histogram with proper title
-            fig = px.histogram(filtered_df, x=num_col, title=f"Histogram: Distribution of {num_col}")
+            key, fig = figure_cache.figure(
+                version, filter_state, ('histogram', ('rows',), num_col),
+                lambda: px.histogram(filtered_df, x=num_col, title=f"Histogram: Distribution of {num_col}")
+            )
             st.plotly_chart(fig, use_container_width=True, key=f"dist_histogram_{username}")
-            chart_figures.append(fig)
+            chart_figure_keys.append(key)
             
             # Store chart info for analysis
             chart_info["charts"].append({
@@ -1085,13 +1145,18 @@ def auto_generate_dashboard(df, username=None):
             # Also show box plot if we have categorical data with proper title
             if categorical_cols:
                 cat_col = categorical_cols[0]
-                top_categories = filtered_df[cat_col].value_counts().nlargest(5).index
-                df_filtered = filtered_df[filtered_df[cat_col].isin(top_categories)]
+                top_categories = aggregate(('top_values', cat_col, 5),
+                                           lambda: filtered_df[cat_col].value_counts().nlargest(5).index)
+                df_filtered = aggregate(('top_rows', cat_col, 5),
+                                        lambda: filtered_df[filtered_df[cat_col].isin(top_categories)])
                 
-                fig_box = px.box(df_filtered, x=cat_col, y=num_col, 
-                                title=f"Box Plot: Distribution of {num_col} by {cat_col}")
+                key, fig_box = figure_cache.figure(
+                    version, filter_state, ('box', ('top_rows', cat_col, 5), num_col),
+                    lambda: px.box(df_filtered, x=cat_col, y=num_col,
+                                   title=f"Box Plot: Distribution of {num_col} by {cat_col}")
+                )
                 st.plotly_chart(fig_box, use_container_width=True, key=f"dist_box_{username}")
-                chart_figures.append(fig_box)
+                chart_figure_keys.append(key)
                 
                 # Store chart info for analysis
                 chart_info["charts"].append({
@@ -1112,17 +1177,25 @@ def auto_generate_dashboard(df, username=None):
             # Create scatter plot with proper title
             if categorical_cols:
                 color_col = categorical_cols[0]
-                top_categories = filtered_df[color_col].value_counts().nlargest(5).index
-                df_filtered = filtered_df[filtered_df[color_col].isin(top_categories)]
+                top_categories = aggregate(('top_values', color_col, 5),
+                                           lambda: filtered_df[color_col].value_counts().nlargest(5).index)
+                df_filtered = aggregate(('top_rows', color_col, 5),
+                                        lambda: filtered_df[filtered_df[color_col].isin(top_categories)])
                 
-                fig = px.scatter(df_filtered, x=x_col, y=y_col, color=color_col,
-                               title=f"Scatter Plot: Relationship between {x_col} and {y_col} by {color_col}")
+                key, fig = figure_cache.figure(
+                    version, filter_state, ('scatter', ('top_rows', color_col, 5), x_col, y_col),
+                    lambda: px.scatter(df_filtered, x=x_col, y=y_col, color=color_col,
+                                       title=f"Scatter Plot: Relationship between {x_col} and {y_col} by {color_col}")
+                )
             else:
-                fig = px.scatter(filtered_df, x=x_col, y=y_col, 
-                               title=f"Scatter Plot: Relationship between {x_col} and {y_col}")
+                key, fig = figure_cache.figure(
+                    version, filter_state, ('scatter', ('rows',), x_col, y_col),
+                    lambda: px.scatter(filtered_df, x=x_col, y=y_col,
+                                       title=f"Scatter Plot: Relationship between {x_col} and {y_col}")
+                )
             
             st.plotly_chart(fig, use_container_width=True, key=f"rel_scatter_{username}")
-            chart_figures.append(fig)
+            chart_figure_keys.append(key)
             
             # Store chart info for analysis
             chart_info["charts"].append({
@@ -1136,11 +1209,15 @@ def auto_generate_dashboard(df, username=None):
             # Add correlation heatmap if we have multiple numerical columns with proper title
             if len(numerical_cols) >= 3:
                 st.subheader("Correlation Heatmap")
-                corr_matrix = filtered_df[numerical_cols[:5]].corr()
-                fig_heatmap = px.imshow(corr_matrix, text_auto=True, aspect="auto",
+                corr_matrix = aggregate(('corr', tuple(numerical_cols[:5])),
+                                        lambda: filtered_df[numerical_cols[:5]].corr())
+                key, fig_heatmap = figure_cache.figure(
+                    version, filter_state, ('heatmap', ('corr', tuple(numerical_cols[:5]))),
+                    lambda: px.imshow(corr_matrix, text_auto=True, aspect="auto",
                                       title="Heatmap: Correlation between numerical variables")
+                )
                 st.plotly_chart(fig_heatmap, use_container_width=True, key=f"rel_heatmap_{username}")
-                chart_figures.append(fig_heatmap)
+                chart_figure_keys.append(key)
                 
                 # Store chart info for analysis
                 chart_info["charts"].append({
@@ -1187,13 +1264,21 @@ def auto_generate_dashboard(df, username=None):
         st.error(f"Error generating AI summary: {e}")
         chart_info['ai_summary'] = "AI summary not available."
     
-    # Store the chart info and figures in session state for use in saving
+    # Store the chart info and figure cache keys in session state for use in saving
     st.session_state['chart_info'] = chart_info
-    st.session_state['chart_figures'] = chart_figures
+    st.session_state['chart_figure_keys'] = chart_figure_keys
     
     # Store dashboard type in session state
     st.session_state['current_dashboard_type'] = "Auto-Generated"
     
+    # Resolve the figures for the auto-save through the shared figure cache
+    chart_figures, missing_charts = figure_cache.resolve(chart_figure_keys)
+    if missing_charts:
+        st.warning(
+            f"⚠️ {len(missing_charts)} chart(s) expired from the chart cache and would be left out of "
+            f"saves and exports: {', '.join(missing_charts)}. Regenerate the dashboard to include them."
+        )
+    
     # NEW: Auto-save the dashboard when generated
     if st.session_state.get('username') and chart_figures:
         try:
@@ -1264,22 +1349,22 @@ def query_based_dashboard_generator(df):
         return
     
     fig = None
-    chart_figures = []
+    chart_figure_keys = []
+    
+    profile = get_dataset_profile(df)
+    version = dataset_hash(df)
+    aggregate = aggregation_cache.scoped(version)
     
     # Store chart information for later analysis
     chart_info = {
         "charts": [],
-        "data_summary": f"Dataset with {len(df)} rows and {len(df.columns)} columns",
+        "data_summary": f"Dataset with {profile.rows} rows and {len(profile.columns)} columns",
         "query_based": True,
         "query_type": chart_type,
         "query_columns": valid_columns,
         "query_operation": operation,
         "dashboard_type": "Query-Based",
-        "columns": {
-            "numerical": df.select_dtypes(include=['int64', 'float64']).columns.tolist(),
-            "categorical": df.select_dtypes(include=['object', 'category']).columns.tolist(),
-            "date": df.select_dtypes(include=['datetime64']).columns.tolist()
-        }
+        "columns": profile.roles()
     }
     
     try:
@@ -1287,14 +1372,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 x_col, y_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(x_col)[y_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(x_col)[y_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'count')
                     y_col = 'count'
                 else:
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 fig = px.bar(df_agg, x=x_col, y=y_col, title=f"Bar Chart: {operation.title()} of {y_col} by {x_col}")
                 
                 # Store chart info for analysis
@@ -1311,14 +1396,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 x_col, y_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(x_col)[y_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(x_col)[y_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'count')
                     y_col = 'count'
                 else:
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 fig = px.line(df_agg, x=x_col, y=y_col, title=f"Line Chart: {operation.title()} of {y_col} by {x_col}")
                 
                 # Store chart info for analysis
@@ -1336,8 +1421,8 @@ def query_based_dashboard_generator(df):
                 names_col = valid_columns[0]
                 if operation == 'count':
                     # For pie charts with count operation, count occurrences of each category
-                    df_counts = df[names_col].value_counts().reset_index()
-                    df_counts.columns = ['category', 'count']
+                    df_counts = aggregate(('value_counts', names_col), lambda: df[names_col].value_counts().reset_index())
+                    df_counts = df_counts.set_axis(['category', 'count'], axis=1)  # cached frames are shared
                     fig = px.pie(df_counts, values='count', names='category', title=f"Pie Chart: Distribution of {names_col}")
                     
                     # Store chart info for analysis
@@ -1353,11 +1438,11 @@ def query_based_dashboard_generator(df):
                     if len(valid_columns) >= 2:
                         values_col = valid_columns[1]
                         if operation == 'sum':
-                            df_agg = df.groupby(names_col)[values_col].sum().reset_index()
+                            df_agg = group_aggregate(aggregate, df, names_col, values_col, 'sum')
                         elif operation == 'average':
-                            df_agg = df.groupby(names_col)[values_col].mean().reset_index()
+                            df_agg = group_aggregate(aggregate, df, names_col, values_col, 'mean')
                         else:
-                            df_agg = df.groupby(names_col)[values_col].sum().reset_index()
+                            df_agg = group_aggregate(aggregate, df, names_col, values_col, 'sum')
                         fig = px.pie(df_agg, values=values_col, names=names_col, title=f"Pie Chart: {operation.title()} of {values_col} by {names_col}")
                         
                         # Store chart info for analysis
@@ -1425,7 +1510,7 @@ def query_based_dashboard_generator(df):
                     "title": f"Distribution of {y_col} by {x_col}",
                     "category": x_col,
                     "value": y_col,
-                    "categories": df[x_col].nunique()
+                    "categories": profile.cardinality[x_col]
                 })
             elif len(valid_columns) >= 1:
                 y_col = valid_columns[0]
@@ -1442,14 +1527,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 x_col, y_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(x_col)[y_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(x_col)[y_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'count')
                     y_col = 'count'
                 else:
-                    df_agg = df.groupby(x_col)[y_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, x_col, y_col, 'sum')
                 fig = px.area(df_agg, x=x_col, y=y_col, title=f"Area Chart: {operation.title()} of {y_col} by {x_col}")
                 
                 # Store chart info for analysis
@@ -1466,14 +1551,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 3:
                 x_col, y_col, z_col = valid_columns[0], valid_columns[1], valid_columns[2]
                 if operation == 'sum':
-                    df_agg = df.groupby([x_col, y_col])[z_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, [x_col, y_col], z_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby([x_col, y_col])[z_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, [x_col, y_col], z_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby([x_col, y_col])[z_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, [x_col, y_col], z_col, 'count')
                     z_col = 'count'
                 else:
-                    df_agg = df.groupby([x_col, y_col])[z_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, [x_col, y_col], z_col, 'sum')
                 
                 # Pivot the data for heatmap
                 df_pivot = df_agg.pivot(index=y_col, columns=x_col, values=z_col).fillna(0)
@@ -1502,7 +1587,7 @@ def query_based_dashboard_generator(df):
                     "title": f"Distribution of {y_col} by {x_col}",
                     "category": x_col,
                     "value": y_col,
-                    "categories": df[x_col].nunique()
+                    "categories": profile.cardinality[x_col]
                 })
             elif len(valid_columns) >= 1:
                 y_col = valid_columns[0]
@@ -1519,14 +1604,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 path_col, value_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(path_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(path_col)[value_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(path_col)[value_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'count')
                     value_col = 'count'
                 else:
-                    df_agg = df.groupby(path_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'sum')
                 fig = px.treemap(df_agg, path=[path_col], values=value_col, title=f"Treemap: {operation.title()} of {value_col} by {path_col}")
                 
                 # Store chart info for analysis
@@ -1543,14 +1628,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 path_col, value_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(path_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(path_col)[value_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(path_col)[value_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'count')
                     value_col = 'count'
                 else:
-                    df_agg = df.groupby(path_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, path_col, value_col, 'sum')
                 fig = px.sunburst(df_agg, path=[path_col], values=value_col, title=f"Sunburst: {operation.title()} of {value_col} by {path_col}")
                 
                 # Store chart info for analysis
@@ -1567,14 +1652,14 @@ def query_based_dashboard_generator(df):
             if len(valid_columns) >= 2:
                 stage_col, value_col = valid_columns[0], valid_columns[1]
                 if operation == 'sum':
-                    df_agg = df.groupby(stage_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, stage_col, value_col, 'sum')
                 elif operation == 'average':
-                    df_agg = df.groupby(stage_col)[value_col].mean().reset_index()
+                    df_agg = group_aggregate(aggregate, df, stage_col, value_col, 'mean')
                 elif operation == 'count':
-                    df_agg = df.groupby(stage_col)[value_col].count().reset_index()
+                    df_agg = group_aggregate(aggregate, df, stage_col, value_col, 'count')
                     value_col = 'count'
                 else:
-                    df_agg = df.groupby(stage_col)[value_col].sum().reset_index()
+                    df_agg = group_aggregate(aggregate, df, stage_col, value_col, 'sum')
                 fig = px.funnel(df_agg, x=value_col, y=stage_col, title=f"Funnel Chart: {operation.title()} of {value_col} by {stage_col}")
                 
                 # Store chart info for analysis
@@ -1589,7 +1674,9 @@ def query_based_dashboard_generator(df):
         
         if fig:
             st.plotly_chart(fig, use_container_width=True, key=f"query_chart_{st.session_state.get('username', 'default')}")
-            chart_figures.append(fig)
+            chart_figure_keys.append(
+                figure_cache.add(version, (), ('query', chart_type, tuple(valid_columns), operation), fig)
+            )
 
             # NEW: Simple plain-language summary using Gemini
             try:
@@ -1629,13 +1716,21 @@ def query_based_dashboard_generator(df):
         st.error(f"An error occurred while generating the chart: {e}")
         st.error(f"Error details: {str(e)}")
     
-    # Store the chart info and figures in session state for use in saving
+    # Store the chart info and figure cache keys in session state for use in saving
     st.session_state['chart_info'] = chart_info
-    st.session_state['chart_figures'] = chart_figures
+    st.session_state['chart_figure_keys'] = chart_figure_keys
     
     # Store dashboard type in session state
     st.session_state['current_dashboard_type'] = "Query-Based"
     
+    # Resolve the figures for the auto-save through the shared figure cache
+    chart_figures, missing_charts = figure_cache.resolve(chart_figure_keys)
+    if missing_charts:
+        st.warning(
+            f"⚠️ {len(missing_charts)} chart(s) expired from the chart cache and would be left out of "
+            f"saves and exports: {', '.join(missing_charts)}. Regenerate the dashboard to include them."
+        )
+    
     # NEW: Auto-save query-based dashboard
     if st.session_state.get('username') and chart_figures:
         try:
@@ -1732,10 +1827,11 @@ def generate_smart_insights(df, chart_info):
         st.warning("No data available for generating insights.")
         return
     
-    # Get numerical columns for analysis
-    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    # Get column roles for analysis from the cached dataset profile
+    profile = get_dataset_profile(df)
+    numerical_cols = profile.numerical
+    categorical_cols = profile.categorical
+    date_cols = profile.date
     
     if not numerical_cols:
         st.warning("No numerical columns found for analysis.")
@@ -1749,6 +1845,12 @@ def generate_smart_insights(df, chart_info):
         if len(numerical_cols) >= 1:
             selected_col = st.selectbox("Select column for anomaly detection", numerical_cols, key="anomaly_col")
             
+            # Large series are plotted from an LTTB sample of the chosen view range, so pick the range up front
+            anomaly_x = df[date_cols[0]] if date_cols else df.index.to_series()
+            anomaly_view = None
+            if is_large(len(df)):
+                anomaly_view = select_view_range(anomaly_x.min(), anomaly_x.max(), key="anomaly_view_range")
+            
             # Use a button to trigger the analysis
             if st.button("Run Anomaly Detection", key="run_anomaly_detection_btn"):
                 # Improved anomaly detection using IQR method
@@ -1766,48 +1868,46 @@ def generate_smart_insights(df, chart_info):
                     # Create a visualization showing anomalies
                     fig = go.Figure()
                     
-                    # Add normal data
-                    normal_data = df[(df[selected_col] >= lower_bound) & (df[selected_col] <= upper_bound)]
-                    if date_cols:
-                        fig.add_trace(go.Scatter(
-                            x=normal_data[date_cols[0]],
-                            y=normal_data[selected_col],
-                            mode='markers',
-                            name='Normal',
-                            marker=dict(color='blue', size=6)
-                        ))
+                    # Plot in x order; a large series keeps an LTTB sample of its normal points (every
+                    # anomaly is kept) and is drawn with WebGL
+                    order = np.argsort(anomaly_x.to_numpy(), kind='stable')
+                    x_sorted = anomaly_x.to_numpy()[order]
+                    y_sorted = df[selected_col].to_numpy(dtype=float, na_value=np.nan)[order]
+                    flagged = (y_sorted < lower_bound) | (y_sorted > upper_bound)
+                    start, end = 0, len(x_sorted)
+                    if anomaly_view is not None:
+                        start, end = window_bounds(x_sorted, *anomaly_view)
+                        shown = start + downsample_indices(x_sorted[start:end], y_sorted[start:end], point_budget(),
+                                                           keep=flagged[start:end])
                     else:
-                        fig.add_trace(go.Scatter(
-                            x=normal_data.index,
-                            y=normal_data[selected_col],
-                            mode='markers',
-                            name='Normal',
-                            marker=dict(color='blue', size=6)
-                        ))
+                        shown = np.flatnonzero(~np.isnan(y_sorted))
+                    scatter = go.Scattergl if is_large(len(df)) else go.Scatter
+                    normal_points = shown[~flagged[shown]]
+                    anomaly_points = shown[flagged[shown]]
+                    
+                    # Add normal data
+                    fig.add_trace(scatter(
+                        x=x_sorted[normal_points],
+                        y=y_sorted[normal_points],
+                        mode='markers',
+                        name='Normal',
+                        marker=dict(color='blue', size=6)
+                    ))
                     
                     # Add anomalies
-                    if date_cols:
-                        fig.add_trace(go.Scatter(
-                            x=anomalies[date_cols[0]],
-                            y=anomalies[selected_col],
-                            mode='markers',
-                            marker=dict(color='red', size=8, symbol='x'),
-                            name='Anomaly'
-                        ))
-                    else:
-                        fig.add_trace(go.Scatter(
-                            x=anomalies.index,
-                            y=anomalies[selected_col],
-                            mode='markers',
-                            marker=dict(color='red', size=8, symbol='x'),
-                            name='Anomaly'
-                        ))
+                    fig.add_trace(scatter(
+                        x=x_sorted[anomaly_points],
+                        y=y_sorted[anomaly_points],
+                        mode='markers',
+                        marker=dict(color='red', size=8, symbol='x'),
+                        name='Anomaly'
+                    ))
                     
                     # Add upper and lower bounds
-                    if date_cols:
-                        x_range = [df[date_cols[0]].min(), df[date_cols[0]].max()]
+                    if start < end:
+                        x_range = [x_sorted[start], x_sorted[end - 1]]
                     else:
-                        x_range = [df.index.min(), df.index.max()]
+                        x_range = [anomaly_x.min(), anomaly_x.max()]
                     
                     fig.add_trace(go.Scatter(
                         x=x_range,
@@ -1902,6 +2002,12 @@ def generate_smart_insights(df, chart_info):
                                         ["Weighted Average", "Linear Trend", "Seasonal Pattern"], 
                                         key="forecast_model")
             
+            # Large histories are plotted from an LTTB sample of the chosen view range
+            forecast_view = None
+            if is_large(len(df)):
+                forecast_view = select_view_range(df[selected_date_col].min(), df[selected_date_col].max(),
+                                                  key="forecast_view_range")
+            
             # Use a button to trigger the forecast
             if st.button("Run Forecast", key="run_forecast_btn"):
                 if len(df) < 4:
@@ -1918,10 +2024,18 @@ def generate_smart_insights(df, chart_info):
                         # Create a forecast visualization
                         fig = go.Figure()
                         
-                        # Add historical data
-                        fig.add_trace(go.Scatter(
-                            x=df[selected_date_col],
-                            y=df[selected_num_col],
+                        # Add historical data, in date order; large histories as a WebGL trace of an LTTB sample
+                        history = df[[selected_date_col, selected_num_col]].dropna().sort_values(selected_date_col, kind='stable')
+                        if forecast_view is not None:
+                            x = history[selected_date_col].to_numpy()
+                            start, end = window_bounds(x, *forecast_view)
+                            history = history.iloc[start + downsample_indices(
+                                x[start:end], history[selected_num_col].to_numpy(dtype=float)[start:end], point_budget()
+                            )]
+                        trace = go.Scattergl if is_large(len(df)) else go.Scatter
+                        fig.add_trace(trace(
+                            x=history[selected_date_col],
+                            y=history[selected_num_col],
                             mode='lines+markers',
                             name='Historical Data'
                         ))
@@ -2062,14 +2176,15 @@ def generate_smart_insights(df, chart_info):
             # Calculate basic statistics for each selected numerical column
             metrics = []
             for col in selected_metrics:
+                stats = profile.stats[col]
                 metrics.append({
                     "Metric": col,
-                    "Total": f"{df[col].sum():,.2f}",
-                    "Average": f"{df[col].mean():,.2f}",
-                    "Median": f"{df[col].median():,.2f}",
-                    "Max": f"{df[col].max():,.2f}",
-                    "Min": f"{df[col].min():,.2f}",
-                    "Std Dev": f"{df[col].std():,.2f}",
+                    "Total": f"{stats['sum']:,.2f}",
+                    "Average": f"{stats['mean']:,.2f}",
+                    "Median": f"{stats['median']:,.2f}",
+                    "Max": f"{profile.max[col]:,.2f}",
+                    "Min": f"{profile.min[col]:,.2f}",
+                    "Std Dev": f"{stats['std']:,.2f}",
                     "Growth Rate": f"{((df[col].iloc[-1] if len(df) > 0 else 0) - (df[col].iloc[0] if len(df) > 0 else 0)) / (df[col].iloc[0] if df[col].iloc[0] != 0 else 1) * 100:.2f}%"
                 })
             
@@ -2110,32 +2225,32 @@ def generate_smart_insights(df, chart_info):
             
             # Highlight the metric with the highest sum
             if len(selected_metrics) > 0:
-                max_sum_col = max(selected_metrics, key=lambda x: df[x].sum())
+                max_sum_col = max(selected_metrics, key=lambda x: profile.stats[x]['sum'])
                 with col1:
                     st.metric(
                         label="📈 Highest Total Value",
                         value=max_sum_col,
-                        delta=f"{df[max_sum_col].sum():,.2f}"
+                        delta=f"{profile.stats[max_sum_col]['sum']:,.2f}"
                     )
                 
             # Highlight the metric with the highest average
             if len(selected_metrics) > 0:
-                max_avg_col = max(selected_metrics, key=lambda x: df[x].mean())
+                max_avg_col = max(selected_metrics, key=lambda x: profile.stats[x]['mean'])
                 with col2:
                     st.metric(
                         label="⭐ Highest Average",
                         value=max_avg_col,
-                        delta=f"{df[max_avg_col].mean():,.2f}"
+                        delta=f"{profile.stats[max_avg_col]['mean']:,.2f}"
                     )
                 
             # Highlight the metric with the most variability
             if len(selected_metrics) > 0:
-                max_std_col = max(selected_metrics, key=lambda x: df[x].std())
+                max_std_col = max(selected_metrics, key=lambda x: profile.stats[x]['std'])
                 with col3:
                     st.metric(
                         label="📊 Most Variable",
                         value=max_std_col,
-                        delta=f"{df[max_std_col].std():,.2f}"
+                        delta=f"{profile.stats[max_std_col]['std']:,.2f}"
                     )
             
             # Highlight the metric with the highest growth rate
@@ -2155,10 +2270,11 @@ def generate_smart_insights(df, chart_info):
         if categorical_cols:
             st.write("📋 Category Insights:")
             for col in categorical_cols[:3]:  # Limit to 3 categorical columns
-                value_counts = df[col].value_counts()
-                top_category = value_counts.idxmax()
-                top_count = value_counts.max()
-                top_percentage = (top_count / len(df)) * 100
+                top_values = profile.top_values[col]
+                if not top_values:
+                    continue
+                top_category, top_count = top_values[0]
+                top_percentage = (top_count / profile.rows) * 100
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -2171,16 +2287,49 @@ def generate_smart_insights(df, chart_info):
                     st.metric(
                         label="Percentage of Total",
                         value=f"{top_percentage:.1f}%",
-                        delta=f"of {len(df)} total records"
+                        delta=f"of {profile.rows} total records"
                     )
                 
                 # Show top 5 categories
                 st.write(f"**Top 5 {col} categories:**")
-                for i, (category, count) in enumerate(value_counts.head().items()):
-                    percentage = (count / len(df)) * 100
+                for i, (category, count) in enumerate(top_values[:5]):
+                    percentage = (count / profile.rows) * 100
                     st.write(f"{i+1}. {category}: {count} ({percentage:.1f}%)")
 
 # ---------- Real-Time Alerts Interface ----------
+def get_alerts_sidebar_state(username):
+    """Sync status and unread notifications for the sidebar, re-read only when the user's channel changed"""
+    subscription = st.session_state.get('notification_subscription')
+    if subscription is None or subscription.username != username:
+        subscription = realtime_manager.subscribe_notifications(username)
+        st.session_state['notification_subscription'] = subscription
+        st.session_state.pop('alerts_sidebar_state', None)
+    
+    state = st.session_state.get('alerts_sidebar_state')
+    if state is None or subscription.changed():
+        previous = subscription.seen
+        # Acknowledge before reading so anything published meanwhile triggers another refresh
+        subscription.acknowledge()
+        state = {
+            'sync_status': realtime_manager.get_sync_status(username),
+            'notifications': realtime_manager.get_user_notifications(username, unread_only=True, limit=3),
+            'unread_count': realtime_manager.get_unread_count(username),
+            'new_events': realtime_manager.hub.events_since(username, previous[0]) if previous else [],
+            # Filled lazily per rule; every firing publishes a notification, so this resets with the channel
+            'firing_counts': {}
+        }
+        st.session_state['alerts_sidebar_state'] = state
+    return state
+
+
+@st.fragment(run_every=NOTIFICATION_POLL_SECONDS)
+def poll_notification_channel():
+    """Rerun the app when the user's notification channel moves; otherwise just compare counters"""
+    subscription = st.session_state.get('notification_subscription')
+    if subscription is not None and subscription.changed():
+        st.rerun()
+
+
 def setup_realtime_alerts_interface(username, df):
     """Show real-time sync and alerts setup interface in sidebar"""
     st.sidebar.write("---")
@@ -2262,18 +2411,22 @@ def setup_realtime_alerts_interface(username, df):
         st.write("Set up automatic alerts for your data")
         
         if df is not None and not df.empty:
-            numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+            numerical_cols = get_dataset_profile(df).numerical
             
             if numerical_cols:
                 alert_name = st.text_input("Alert Name", "Sales Threshold Alert", key=f"alert_name_{username}")
                 alert_column = st.selectbox("Monitor Column", numerical_cols, key=f"alert_column_{username}")
                 condition_type = st.selectbox(
                     "Condition Type", 
-                    ["threshold", "anomaly", "trend"], 
+                    ["threshold", "anomaly", "trend", "rate_of_change", "rolling_zscore", "rolling_sum", "rolling_mean"], 
                     format_func=lambda x: {
                         "threshold": "Value Threshold",
                         "anomaly": "Statistical Anomaly", 
-                        "trend": "Trend Detection"
+                        "trend": "Trend Detection",
+                        "rate_of_change": "Rate of Change (window)",
+                        "rolling_zscore": "Rolling Z-Score (window)",
+                        "rolling_sum": "Rolling Sum (window)",
+                        "rolling_mean": "Rolling Mean (window)"
                     }[x],
                     key=f"alert_condition_{username}"
                 )
@@ -2301,9 +2454,54 @@ def setup_realtime_alerts_interface(username, df):
                     )
                     threshold_value = st.number_input("Percentage Change Threshold", value=10.0, key=f"alert_trend_threshold_{username}")
                 
+                elif condition_type == "rate_of_change":
+                    operator = st.selectbox(
+                        "Change Direction",
+                        ["increasing", "decreasing"],
+                        format_func=lambda x: "Increasing" if x == "increasing" else "Decreasing",
+                        key=f"alert_roc_direction_{username}"
+                    )
+                    threshold_value = st.number_input("Percentage Change Across Window", min_value=0.0, value=10.0, key=f"alert_roc_threshold_{username}")
+                
+                elif condition_type == "rolling_zscore":
+                    operator = st.selectbox(
+                        "Deviation",
+                        ["either", "above", "below"],
+                        format_func=lambda x: {"either": "Above or Below", "above": "Above", "below": "Below"}[x],
+                        key=f"alert_zscore_direction_{username}"
+                    )
+                    threshold_value = st.number_input("Z-Score Threshold", min_value=0.1, value=3.0, key=f"alert_zscore_threshold_{username}")
+                
+                elif condition_type in ("rolling_sum", "rolling_mean"):
+                    operator = st.selectbox(
+                        "Operator",
+                        ["greater_than", "less_than"],
+                        format_func=lambda x: "Greater Than" if x == "greater_than" else "Less Than",
+                        key=f"alert_rolling_operator_{username}"
+                    )
+                    threshold_value = st.number_input("Threshold Value", key=f"alert_rolling_threshold_{username}")
+                
                 else:  # anomaly
                     threshold_value = None
                 
+                # Rolling conditions look at the last N rows or the last N minutes of a date column
+                window_rows, window_minutes, window_time_column = None, None, None
+                if condition_type in ROLLING_CONDITIONS:
+                    date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+                    window_kind = st.radio(
+                        "Window", ["rows", "time"] if date_columns else ["rows"],
+                        format_func=lambda x: "Last N Rows" if x == "rows" else "Last N Minutes",
+                        horizontal=True, key=f"alert_window_kind_{username}"
+                    )
+                    if window_kind == "rows":
+                        window_rows = st.number_input("Window Size (rows)", min_value=2, max_value=MAX_WINDOW_ROWS, value=20,
+                                                      key=f"alert_window_rows_{username}")
+                    else:
+                        window_time_column = st.selectbox("Date Column", date_columns, key=f"alert_window_time_{username}")
+                        window_minutes = st.number_input("Window Length (minutes)", min_value=1, max_value=525600, value=60,
+                                                         key=f"alert_window_minutes_{username}",
+                                                         help=f"Only the latest {MAX_WINDOW_ROWS:,} rows in the window are used")
+                
                 # NEW: Email input field for alerts
                 st.write("---")
                 st.subheader("📧 Alert Notifications")
@@ -2319,25 +2517,93 @@ def setup_realtime_alerts_interface(username, df):
                     st.error("Please enter a valid email address")
                     alert_email = None
                 
-                # REMOVED COOLDOWN TIMER - Alerts trigger immediately
-                st.info("⏰ Alerts will trigger immediately when conditions are met")
+                cooldown_minutes = st.number_input(
+                    "Cooldown (minutes)", min_value=0, max_value=1440, value=5,
+                    help="Minimum time between two notifications for this rule",
+                    key=f"alert_cooldown_{username}"
+                )
+                hysteresis = 0.0
+                if condition_type == "threshold" and operator in ("greater_than", "less_than"):
+                    hysteresis = st.number_input(
+                        "Hysteresis Band", min_value=0.0, value=0.0,
+                        help="How far values must move back past the threshold before the alert resolves",
+                        key=f"alert_hysteresis_{username}"
+                    )
+                alert_priority = st.selectbox(
+                    "Priority", ["low", "medium", "high", "critical"], index=1,
+                    format_func=str.title,
+                    help="Critical alerts are emailed immediately; others are batched into one digest email per window",
+                    key=f"alert_priority_{username}"
+                )
+                st.info(
+                    f"⏰ Alerts fire when conditions are met, then stay quiet for {cooldown_minutes} min; "
+                    "the same triggering rows never fire twice"
+                )
                 
                 if alert_email:
                     st.success(f"📧 Alerts will be sent to: {alert_email}")
                 else:
                     st.warning("⚠️ No email provided - alerts will only show in terminal")
                 
+                alert_rule = {
+                    'name': alert_name,
+                    'condition_type': condition_type,
+                    'column': alert_column,
+                    'value': threshold_value,
+                    'operator': operator if condition_type != 'anomaly' else None,
+                    'email': alert_email,  # NEW: Include email in alert rule
+                    'priority': alert_priority,
+                    'cooldown_minutes': cooldown_minutes,
+                    'hysteresis': hysteresis
+                }
+                if condition_type in ROLLING_CONDITIONS:
+                    alert_rule.update({'window': window_rows, 'window_minutes': window_minutes, 'time_column': window_time_column})
+                
+                # Backtest the candidate rule against the loaded data before saving it
+                st.write("---")
+                st.subheader("🧪 Backtest")
+                time_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+                if window_time_column:
+                    # Time windows replay in the order of their own date column
+                    backtest_time_column = window_time_column
+                    st.caption(f"Replaying in {window_time_column} order")
+                else:
+                    backtest_time_column = st.selectbox(
+                        "Replay Order", ["(row order)"] + time_columns,
+                        help="Rows are replayed oldest first as if they had arrived through syncs",
+                        key=f"alert_backtest_time_{username}"
+                    )
+                    backtest_time_column = None if backtest_time_column == "(row order)" else backtest_time_column
+                backtest_interval = 0
+                if backtest_time_column:
+                    backtest_interval = st.number_input(
+                        "Simulated Sync Interval (minutes)", min_value=0, max_value=1440, value=5,
+                        help="Rows are grouped into one sync per interval; 0 replays one row per sync",
+                        key=f"alert_backtest_interval_{username}"
+                    )
+                
+                if st.button("Run Backtest", key=f"backtest_alert_{username}"):
+                    result = realtime_manager.backtest_alert_rule(
+                        alert_rule, df, backtest_time_column, backtest_interval * 60
+                    )
+                    if not result['success']:
+                        st.error(f"Backtest failed: {result['error']}")
+                    else:
+                        st.metric("Would Have Fired", f"{result['firings']:,}")
+                        caption = (f"{result['condition_met']:,} of {result['syncs']:,} replayed syncs met the condition "
+                                   f"({result['rows']:,} rows, {result['elapsed_ms']} ms)")
+                        if result['firings_per_day'] is not None:
+                            caption += f" | {result['firings_per_day']} firings/day"
+                        if result['dropped_rows']:
+                            caption += f" | {result['dropped_rows']:,} rows without a valid time skipped"
+                        st.caption(caption)
+                        if result['firing_times']:
+                            label = "Firing times" if backtest_time_column else "Firing rows"
+                            shown = ", ".join(str(t) for t in result['firing_times'][:10])
+                            more = result['firings'] - min(result['firings'], 10)
+                            st.caption(f"{label}: {shown}" + (f" … and {more:,} more" if more else ""))
+                
                 if st.button("Create Alert Rule", key=f"create_alert_{username}"):
-                    alert_rule = {
-                        'name': alert_name,
-                        'condition_type': condition_type,
-                        'column': alert_column,
-                        'value': threshold_value,
-                        'operator': operator if condition_type in ['threshold', 'trend'] else None,
-                        'email': alert_email,  # NEW: Include email in alert rule
-                        'priority': 'medium'
-                    }
-                    
                     # Use current dashboard if available
                     dashboard_id = st.session_state.get('last_auto_saved_dashboard') or st.session_state.get('last_query_saved_dashboard')
                     if not dashboard_id:
@@ -2356,6 +2622,9 @@ def setup_realtime_alerts_interface(username, df):
         else:
             st.info("Load data first to set up alert rules.")
 
+    sidebar_state = get_alerts_sidebar_state(username)
+    firing_counts = sidebar_state['firing_counts']
+    
     # Alert Management Section
     with st.sidebar.expander("⚙️ Manage Alert Rules", expanded=False):
         st.write("Manage your existing alert rules")
@@ -2372,8 +2641,18 @@ def setup_realtime_alerts_interface(username, df):
                         rule = alert_config['rule']
                         status = "🟢 ACTIVE" if alert_config['is_active'] else "🔴 INACTIVE"
                         st.write(f"**{rule.get('name', 'Unnamed Rule')}** - {status}")
-                        st.caption(f"Condition: {rule.get('column')} {realtime_manager._get_operator_text(rule.get('operator'))} {rule.get('value')}")
+                        if rule.get('condition_type') in ROLLING_CONDITIONS:
+                            st.caption(f"Condition: {realtime_manager._describe_rolling_condition(rule)}")
+                        else:
+                            st.caption(f"Condition: {rule.get('column')} {realtime_manager._get_operator_text(rule.get('operator'))} {rule.get('value')}")
                         st.caption(f"Triggers: {alert_config.get('trigger_count', 0)} | Last: {alert_config.get('last_triggered', 'Never')}")
+                        if alert_id not in firing_counts:
+                            firing_counts[alert_id] = realtime_manager.count_alert_firings(alert_id, hours=24)
+                        st.caption(
+                            f"Fired in last 24h: {firing_counts[alert_id]} | "
+                            f"State: {alert_config.get('alert_state', 'resolved')} | "
+                            f"Suppressed: {alert_config.get('suppressed_count', 0)}"
+                        )
                         # Show email if configured
                         if rule.get('email'):
                             st.caption(f"📧 Email: {rule.get('email')}")
@@ -2404,10 +2683,18 @@ def setup_realtime_alerts_interface(username, df):
             st.info("No alert rules created yet.")
     
     # Sync status and notifications
+    for event in sidebar_state.pop('new_events', []):
+        if event['type'] == 'notification':
+            st.toast(f"🚨 {event['title']}")
+    
     with st.sidebar.expander("📊 Sync Status & Notifications", expanded=False):
+        poll_notification_channel()
+        
         # Show sync status
-        sync_status = realtime_manager.get_sync_status(username)
+        sync_status = sidebar_state['sync_status']
         st.write(f"**Active Syncs:** {sync_status['active_syncs']}")
+        if sync_status['leader']:
+            st.caption(f"Sync runs in process {sync_status['leader']['pid']} on {sync_status['leader']['host']} ({sync_status['sync_role']} here)")
         
         if sync_status['last_sync']:
             last_sync = datetime.fromisoformat(sync_status['last_sync'])
@@ -2416,13 +2703,36 @@ def setup_realtime_alerts_interface(username, df):
         if sync_status['next_sync']:
             next_sync = datetime.fromisoformat(sync_status['next_sync'])
             st.write(f"**Next Sync:** {next_sync.strftime('%H:%M')}")
-        
+
+        sync_metrics = sync_status.get('metrics') or {}
+        if sync_metrics:
+            st.caption(
+                f"Fetch avg {sync_metrics['avg_fetch_ms'] or 0} ms | Sync failures {sync_metrics['sync_failures']} | "
+                f"Alerts fired {sync_metrics['alert_firings']} | Suppressed {sync_metrics['alerts_suppressed']} | "
+                f"Email failures {sync_metrics['email_failures']}"
+            )
+            pipeline = sync_metrics.get('pipeline', {})
+            if pipeline:
+                st.caption(" | ".join(
+                    f"{stage.title()}: wait {stats['avg_wait_ms'] or 0} ms, run {stats['avg_run_ms'] or 0} ms, "
+                    f"{stats['queued']} queued"
+                    for stage, stats in pipeline.items()
+                ))
+
+        # Show sources that are backing off or have an open circuit
+        for source in sync_status.get('sources', []):
+            if source['consecutive_failures']:
+                st.warning(
+                    f"{source['source_type']}: {source['consecutive_failures']} failures "
+                    f"(circuit {source['circuit_state']}) - {source['last_error']}"
+                )
+
         # Show recent notifications - FIXED with unique keys
-        notifications = realtime_manager.get_user_notifications(username, unread_only=True)
+        notifications = sidebar_state['notifications']
         if notifications:
             st.write("---")
-            st.write("**Recent Alerts:**")
-            for i, notification in enumerate(notifications[:3]):
+            st.write(f"**Recent Alerts:** ({sidebar_state['unread_count']} unread)")
+            for i, notification in enumerate(notifications):
                 with st.container():
                     col1, col2 = st.columns([3, 1])
                     with col1:
@@ -2439,10 +2749,87 @@ def setup_realtime_alerts_interface(username, df):
         else:
             st.info("No unread notifications")
     
+    # Notification center: filtered pages straight from the store, bulk actions as single updates
+    with st.sidebar.expander("🔔 Notification Center", expanded=False):
+        user_alerts = realtime_manager.get_user_alerts(username)
+        filter_rule = st.selectbox(
+            "Rule", [None] + list(user_alerts),
+            format_func=lambda a: "All rules" if a is None else user_alerts[a]['rule'].get('name', a),
+            key=f"notif_rule_{username}"
+        )
+        filter_hours = st.selectbox(
+            "Time Range", [24, 168, 720, None], index=1,
+            format_func=lambda h: {24: "Last 24 hours", 168: "Last 7 days", 720: "Last 30 days", None: "All time"}[h],
+            key=f"notif_range_{username}"
+        )
+        filter_state = st.radio("Show", ["unread", "read", "all"], format_func=str.title, horizontal=True,
+                                key=f"notif_state_{username}")
+        filter_read = {'unread': False, 'read': True, 'all': None}[filter_state]
+        page = st.number_input("Page", min_value=1, value=1, step=1, key=f"notif_page_{username}")
+        
+        # Re-query only when the filters, the page or the user's notification channel changed
+        center_key = (filter_rule, filter_hours, filter_read, page, st.session_state['notification_subscription'].seen)
+        cached = st.session_state.get('notification_center')
+        if cached is None or cached[0] != center_key:
+            cached = (center_key, realtime_manager.get_notifications_page(
+                username, page, 10, filter_read, filter_rule, filter_hours
+            ))
+            st.session_state['notification_center'] = cached
+        result = cached[1]
+        st.caption(f"{result['total']} notifications | page {result['page']} of {result['pages']}")
+        
+        selected = []
+        for notification in result['items']:
+            icon = "✅" if notification['read'] else "⚠️"
+            if st.checkbox(f"{icon} {notification['title']}", key=f"notif_select_{notification['id']}"):
+                selected.append(notification['id'])
+            st.caption(
+                f"🕒 {datetime.fromisoformat(notification['timestamp']).strftime('%Y-%m-%d %H:%M')} - "
+                f"{notification['message'].strip()[:80]}"
+            )
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Mark all read", key=f"notif_mark_all_{username}", disabled=result['total'] == 0):
+                updated = realtime_manager.mark_notifications_read(username, alert_id=filter_rule, hours=filter_hours)
+                st.session_state['notification_center_message'] = f"Marked {updated} notifications read"
+                st.rerun()
+        with col2:
+            if st.button("Delete selected", key=f"notif_delete_selected_{username}", disabled=not selected):
+                deleted = realtime_manager.delete_notifications(username, ids=selected)
+                st.session_state['notification_center_message'] = f"Deleted {deleted} notifications"
+                st.rerun()
+        with col3:
+            if st.button("Delete all", key=f"notif_delete_all_{username}", disabled=result['total'] == 0):
+                deleted = realtime_manager.delete_notifications(
+                    username, read=filter_read, alert_id=filter_rule, hours=filter_hours
+                )
+                st.session_state['notification_center_message'] = f"Deleted {deleted} notifications"
+                st.rerun()
+        if 'notification_center_message' in st.session_state:
+            st.success(st.session_state.pop('notification_center_message'))
+    
     # Start sync service if not already running
     if not realtime_manager.is_running:
         realtime_manager.start_sync_service()
 
+# ---------- Debug Panel ----------
+def show_debug_panel():
+    """Cache statistics for diagnosing slow reruns (enabled with SHOW_DEBUG_PANEL=true)"""
+    with st.sidebar.expander("🛠️ Debug", expanded=False):
+        stats = aggregation_cache.stats()
+        st.write("**Aggregation cache**")
+        col1, col2 = st.columns(2)
+        col1.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        col2.metric("Entries", stats['entries'])
+        st.caption(
+            f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions | "
+            f"{stats['bytes'] / 1024 ** 2:.1f} of {stats['max_bytes'] / 1024 ** 2:.0f} MB"
+        )
+        if st.button("Clear aggregation cache", key="debug_clear_aggregations"):
+            aggregation_cache.clear()
+            st.rerun()
+
 # ---------- Module 1: Role-Based UI ----------
 def show_role_info():
     """Displays role-specific information in the sidebar."""
@@ -2692,8 +3079,13 @@ def main():
 
                 # --- Dashboard Saving Interface ---
                 if df is not None and processed_df is not None:
-                    # Get the current chart figures for saving
-                    current_chart_figures = st.session_state.get('chart_figures', [])
+                    # Resolve the current chart figures for saving from the shared figure cache
+                    current_chart_figures, missing_charts = figure_cache.resolve(st.session_state.get('chart_figure_keys', []))
+                    if missing_charts:
+                        st.sidebar.warning(
+                            f"⚠️ {len(missing_charts)} chart(s) expired from the chart cache and would be left out of "
+                            f"saves and exports: {', '.join(missing_charts)}. Regenerate the dashboard to include them."
+                        )
                     
                     # Get current dashboard type
                     current_dashboard_type = st.session_state.get('current_dashboard_type', 'Auto-Generated')
@@ -2729,6 +3121,9 @@ def main():
         else:
             st.info("No data available. Please upload a file or connect to a live data source.")
 
+        if SHOW_DEBUG_PANEL:
+            show_debug_panel()
+
         # Admin functionality to view other users' data
         if role == "Admin":
             st.sidebar.write("---")
@@ -0,0 +1,79 @@
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Dict, List
+
+BROADCAST = '*'
+
+
+class Subscription:
+    """One UI session's view of a user's channel.
+
+    ``seen`` is the version the session last rendered; ``changed()`` is a
+    couple of integer comparisons, so it can be polled every few seconds
+    without touching the disk.
+    """
+
+    def __init__(self, hub: 'NotificationHub', username: str):
+        self.hub = hub
+        self.username = username
+        self.seen = None
+
+    def changed(self) -> bool:
+        return self.hub.version(self.username) != self.seen
+
+    def acknowledge(self):
+        """Mark the current version as seen and return it; call before re-reading state"""
+        self.seen = self.hub.version(self.username)
+        return self.seen
+
+
+class NotificationHub:
+    """In-process pub/sub of per-user UI events (new notifications, sync results, rule changes).
+
+    Every publish bumps the user's version counter and keeps the event in a
+    short per-user history. Events for ``BROADCAST`` concern every user.
+    Changes made by other processes cannot be published here, so
+    ``add_source`` registers cheap callables (e.g. a file mtime) whose value
+    is folded into every version.
+    """
+
+    def __init__(self, history: int = 50):
+        self._lock = threading.Lock()
+        self._versions = defaultdict(int)
+        self._events = defaultdict(lambda: deque(maxlen=history))
+        self._sources: List[Callable] = []
+
+    def publish(self, username: str, event: Dict) -> int:
+        with self._lock:
+            self._versions[username] += 1
+            version = self._versions[username]
+            event = dict(event, username=username, version=version)
+            self._events[username].append(event)
+        return version
+
+    def version(self, username: str) -> tuple:
+        with self._lock:
+            local = (self._versions[username], self._versions[BROADCAST])
+        external = []
+        for source in self._sources:
+            try:
+                external.append(source())
+            except Exception:
+                external.append(None)
+        return local + tuple(external)
+
+    def events_since(self, username: str, version: int) -> List[Dict]:
+        """Events kept for a user with a version above ``version``"""
+        with self._lock:
+            return [event for event in self._events[username] if event['version'] > version]
+
+    def subscribe(self, username: str) -> Subscription:
+        return Subscription(self, username)
+
+    def add_source(self, source: Callable):
+        with self._lock:
+            self._sources.append(source)
+
+
+# Create global instance
+notification_hub = NotificationHub()
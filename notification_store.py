@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('id', 'username', 'title', 'message', 'timestamp', 'read', 'type', 'alert_id')
+
+
+def _iso(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _row_to_dict(row: tuple) -> Dict:
+    notification = dict(zip(COLUMNS, row))
+    notification['read'] = bool(notification['read'])
+    return notification
+
+
+class NotificationStore:
+    """In-app notifications for every user in one SQLite database (WAL mode).
+
+    An index on (username, read, timestamp) serves the unread list and
+    count; inserting or marking a notification read touches one row, and
+    SQLite's locking makes concurrent sessions and delivery workers safe.
+    Notifications older than ``retention_days`` and anything beyond each
+    user's newest ``max_per_user`` are pruned at most once per
+    ``prune_interval`` seconds. Per-user JSON files left in ``legacy_dir``
+    are imported once and renamed to ``*.json.migrated``.
+    """
+
+    def __init__(self, db_path: str = "user_notifications/notifications.sqlite", legacy_dir: str = "user_notifications",
+                 retention_days: int = 30, max_per_user: int = 1000, prune_interval: float = 3600):
+        self.retention_days = retention_days
+        self.max_per_user = max_per_user
+        self.prune_interval = prune_interval
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._db = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS notifications ("
+            "id TEXT PRIMARY KEY, username TEXT NOT NULL, title TEXT, message TEXT, "
+            "timestamp TEXT NOT NULL, read INTEGER NOT NULL DEFAULT 0, type TEXT, alert_id TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notifications_user_read_time ON notifications (username, read, timestamp)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notifications_user_alert_time ON notifications (username, alert_id, timestamp)"
+        )
+        self._db.commit()
+        if legacy_dir:
+            self._migrate_json(legacy_dir)
+        self.prune()
+
+    def _migrate_json(self, legacy_dir: str):
+        if not os.path.isdir(legacy_dir):
+            return
+        for name in sorted(os.listdir(legacy_dir)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(legacy_dir, name)
+            username = name[:-len('.json')]
+            try:
+                with open(path, 'r') as f:
+                    notifications = json.load(f)
+                rows = [
+                    (n.get('id') or f"notif_{username}_{i}", username, n.get('title'), n.get('message'),
+                     n.get('timestamp') or datetime.now().isoformat(), int(bool(n.get('read'))),
+                     n.get('type', 'alert'), n.get('alert_id'))
+                    for i, n in enumerate(notifications)
+                ]
+                with self._lock:
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO notifications (id, username, title, message, timestamp, read, type, alert_id) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+                    self._db.commit()
+                os.replace(path, path + '.migrated')
+                logger.info(f"Migrated {len(rows)} notifications for {username} from {path}")
+            except (OSError, ValueError, sqlite3.Error) as e:
+                logger.error(f"Could not migrate notifications from {path}: {e}")
+
+    def add(self, username: str, title: str, message: str, notification_type: str = 'alert',
+            alert_id: str = None) -> Dict:
+        now = datetime.now()
+        notification = {
+            'id': f"notif_{now.strftime('%Y%m%d_%H%M%S_%f')}_{os.urandom(3).hex()}",
+            'username': username,
+            'title': title,
+            'message': message,
+            'timestamp': now.isoformat(),
+            'read': False,
+            'type': notification_type,
+            'alert_id': alert_id
+        }
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO notifications (id, username, title, message, timestamp, read, type, alert_id) "
+                "VALUES (:id, :username, :title, :message, :timestamp, 0, :type, :alert_id)", notification
+            )
+            self._db.commit()
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self.prune()
+        return notification
+
+    @staticmethod
+    def _where(username: str, read: bool = None, alert_id: str = None, start=None, end=None, ids: List[str] = None):
+        """WHERE clause and parameters for a user's notifications matching every given filter"""
+        clauses, params = ["username = ?"], [username]
+        if read is not None:
+            clauses.append("read = ?")
+            params.append(int(read))
+        if alert_id is not None:
+            clauses.append("alert_id = ?")
+            params.append(alert_id)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(_iso(end))
+        if ids is not None:
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})" if ids else "0")
+            params.extend(ids)
+        return " AND ".join(clauses), params
+
+    def notifications(self, username: str, unread_only: bool = True, limit: int = None, offset: int = 0,
+                      **filters) -> List[Dict]:
+        """A user's notifications matching ``filters`` (read, alert_id, start, end, ids), newest first"""
+        if unread_only:
+            filters['read'] = False
+        where, params = self._where(username, **filters)
+        query = f"SELECT {', '.join(COLUMNS)} FROM notifications WHERE {where} ORDER BY timestamp DESC"
+        if limit:
+            query += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with self._lock:
+            return [_row_to_dict(row) for row in self._db.execute(query, params).fetchall()]
+
+    def count(self, username: str, **filters) -> int:
+        where, params = self._where(username, **filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM notifications WHERE {where}", params).fetchone()[0]
+
+    def unread_count(self, username: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM notifications WHERE username = ? AND read = 0", (username,)
+            ).fetchone()[0]
+
+    def mark_read(self, username: str, notification_id: str) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE notifications SET read = 1 WHERE username = ? AND id = ?", (username, notification_id)
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def mark_all_read(self, username: str, **filters) -> int:
+        """Mark every matching unread notification read in one statement"""
+        where, params = self._where(username, **dict(filters, read=False))
+        with self._lock:
+            cursor = self._db.execute(f"UPDATE notifications SET read = 1 WHERE {where}", params)
+            self._db.commit()
+        return cursor.rowcount
+
+    def delete(self, username: str, **filters) -> int:
+        """Delete every matching notification in one statement"""
+        where, params = self._where(username, **filters)
+        with self._lock:
+            cursor = self._db.execute(f"DELETE FROM notifications WHERE {where}", params)
+            self._db.commit()
+        return cursor.rowcount
+
+    def data_version(self) -> int:
+        """Changes whenever another connection (e.g. another process) commits to the database"""
+        with self._lock:
+            return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def prune(self) -> int:
+        """Apply the retention policy; returns the number of notifications removed"""
+        self._last_prune = time.monotonic()
+        removed = 0
+        try:
+            with self._lock:
+                if self.retention_days:
+                    cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+                    removed += self._db.execute("DELETE FROM notifications WHERE timestamp < ?", (cutoff,)).rowcount
+                if self.max_per_user:
+                    removed += self._db.execute(
+                        "DELETE FROM notifications WHERE rowid IN ("
+                        "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER "
+                        "(PARTITION BY username ORDER BY timestamp DESC) AS rank FROM notifications) "
+                        "WHERE rank > ?)", (self.max_per_user,)
+                    ).rowcount
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not prune notifications: {e}")
+        if removed:
+            logger.info(f"Pruned {removed} expired notifications")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._db.close()
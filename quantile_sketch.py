@@ -0,0 +1,86 @@
+import math
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin-Lang-Liberty).
+
+    Items are kept in a stack of compactors; level ``h`` holds items of weight
+    ``2**h``. When a level overflows it is sorted and every other item is
+    promoted to the next level, so memory stays O(k log(n/k)) while the rank
+    error stays around 1.7/k. Updates take whole NumPy batches, which is how
+    sync deltas arrive.
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.zeros(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: Iterable[float]):
+        """Add a batch of values, ignoring NaN"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.zeros(0))
+                items = np.sort(items)
+                # An odd item stays behind so total weight is preserved exactly
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self._rng.integers(0, 2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        """Approximate (nearest-rank) quantiles for each q in [0, 1]"""
+        qs = np.asarray(list(qs), dtype=np.float64)
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h, dtype=np.float64) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = qs * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        return items[idx]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def merge(self, other: 'KLLSketch'):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'n': self.n, 'levels': [lvl.tolist() for lvl in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'KLLSketch':
+        sketch = cls(k=state.get('k', 200))
+        sketch.n = state.get('n', 0)
+        sketch.levels = [np.asarray(lvl, dtype=np.float64) for lvl in state.get('levels', [[]])] or [np.zeros(0)]
+        return sketch
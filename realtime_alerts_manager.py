@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
 import os
 import threading
 import time
@@ -10,23 +10,55 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import requests
 from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
 import schedule
 from dotenv import load_dotenv
+from change_detector import ChangeDetector
+from snapshot_store import SnapshotWriter
+from config_store import JsonConfigStore
+from leader_lock import LeaderLock
+from metrics_registry import metrics, parse_metric_totals
+from alert_engine import AlertEvaluation, CompiledAlertRules, iqr_bounds, sketch_iqr_bounds
+from quantile_sketch import KLLSketch
+from alert_history import AlertHistoryStore
+from alert_state import FIRING, AlertStateTracker, dedup_key
+from alert_digest import AlertDigestQueue
+from alert_pipeline import AlertPipeline
+from notification_store import NotificationStore
+from notification_hub import BROADCAST, notification_hub
+from alert_backtest import backtest_rule
+from rolling_window import ROLLING_CONDITIONS, RollingWindow, window_spec
+from structured_logging import configure_logging, truncate_values
 import logging
-import hashlib
+import random
+import io
 
-# Configure logging with ASCII-only characters for Windows compatibility
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('realtime_alerts.log')
-    ]
+load_dotenv()
+
+# JSON log records written off-thread with size-based rotation; chatty call sites are rate limited
+configure_logging(
+    'realtime_alerts.log',
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+    burst=int(os.getenv("LOG_RATE_LIMIT_BURST", "20")),
+    interval=float(os.getenv("LOG_RATE_LIMIT_INTERVAL_SECONDS", "60"))
 )
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+# Prometheus metrics for the sync and alert pipeline
+FETCH_SECONDS = metrics.histogram('inferaboard_sync_fetch_seconds', 'Time to fetch and parse a data source')
+FETCH_BYTES = metrics.counter('inferaboard_sync_fetched_bytes_total', 'Response bytes fetched from HTTP sources')
+FETCH_ROWS = metrics.counter('inferaboard_sync_fetched_rows_total', 'Rows fetched from data sources')
+CHANGE_DETECT_SECONDS = metrics.histogram('inferaboard_sync_change_detect_seconds', 'Time spent hashing and diffing fetched data')
+SNAPSHOT_WRITE_SECONDS = metrics.histogram('inferaboard_sync_snapshot_write_seconds', 'Time spent writing synced snapshots')
+SYNC_FAILURES = metrics.counter('inferaboard_sync_failures_total', 'Failed sync attempts')
+ALERT_EVALUATIONS = metrics.counter('inferaboard_alert_evaluations_total', 'Alert rule evaluations')
+ALERT_FIRINGS = metrics.counter('inferaboard_alert_firings_total', 'Alert rules whose condition was met')
+ALERT_SUPPRESSED = metrics.counter('inferaboard_alert_suppressed_total', 'Met alert conditions suppressed before delivery')
+EMAIL_SEND_SECONDS = metrics.histogram('inferaboard_alert_email_send_seconds', 'Time to send an alert email')
+EMAILS_SENT = metrics.counter('inferaboard_alert_emails_sent_total', 'Alert emails sent, by kind (immediate or digest)')
+EMAIL_FAILURES = metrics.counter('inferaboard_alert_email_failures_total', 'Alert emails that could not be sent')
+NOTIFICATION_WRITE_SECONDS = metrics.histogram('inferaboard_notification_write_seconds', 'Time to store an in-app notification')
 
 class RealTimeSyncManager:
     def __init__(self):
@@ -62,14 +94,67 @@ class RealTimeSyncManager:
         # Test SMTP connection on startup
         self.smtp_working = self._test_smtp_connection()
         
-        # Load configurations
+        # Per-source backoff and circuit breaker settings
+        self.backoff_base_seconds = int(os.getenv('SYNC_BACKOFF_BASE', 30))
+        self.backoff_max_seconds = int(os.getenv('SYNC_BACKOFF_MAX', 1800))
+        self.circuit_failure_threshold = int(os.getenv('SYNC_CIRCUIT_THRESHOLD', 5))
+        self.circuit_probe_seconds = int(os.getenv('SYNC_CIRCUIT_PROBE', 900))
+        self.request_timeout = int(os.getenv('SYNC_REQUEST_TIMEOUT', 30))
+        
+        # Due sources are fetched on a small pool so one slow source never delays the others
+        self.sync_workers = int(os.getenv('SYNC_WORKERS', 4))
+        self.sync_executor = None
+        self._syncs_in_flight = set()
+        # Guards config entries shared by the sync loop, sync workers, alert evaluation and the disk merge
+        self.config_lock = threading.RLock()
+        
+        # Load configurations through dirty-tracked, batched stores
+        config_flush_interval = float(os.getenv('CONFIG_FLUSH_INTERVAL', 5))
+        self.sync_store = JsonConfigStore(self.sync_config_file, config_flush_interval, lock=self.config_lock)
+        self.alerts_store = JsonConfigStore(self.alerts_config_file, config_flush_interval, lock=self.config_lock)
         self.sync_config = self._load_sync_config()
         self.alerts_config = self._load_alerts_config()
         
+        # Leader election: one sync loop per data directory across all processes
+        self.sync_mode = os.getenv('SYNC_MODE', 'auto')
+        self.leader_retry_seconds = int(os.getenv('SYNC_LEADER_RETRY', 30))
+        self.leader_lock = LeaderLock(os.path.join("realtime_data", "sync_leader.lock"))
+        self.is_leader = False
+        
+        # Metrics are written by the sync leader and read back for status
+        self.metrics_file = os.path.join("realtime_data", "metrics.prom")
+        self.metrics_port = int(os.getenv('METRICS_PORT', 0))
+        # Touched only on user-visible changes so sessions in other processes know to refresh
+        self.change_marker_file = os.path.join("realtime_data", "ui_changes.marker")
+        
         # Create directories if they don't exist
         os.makedirs("realtime_data", exist_ok=True)
         os.makedirs("alert_logs", exist_ok=True)
         os.makedirs("user_notifications", exist_ok=True)
+        
+        self.change_detector = ChangeDetector("realtime_data")
+        self.snapshot_writer = SnapshotWriter("realtime_data", "user_data")
+        self.alert_pipeline = AlertPipeline(
+            self.evaluate_alert_rules, self.deliver_alert,
+            evaluate_queue_size=int(os.getenv('ALERT_EVALUATE_QUEUE_SIZE', '100')),
+            delivery_queue_size=int(os.getenv('ALERT_DELIVERY_QUEUE_SIZE', '1000')),
+            delivery_workers=int(os.getenv('ALERT_DELIVERY_WORKERS', '4'))
+        )
+        self.notifications = NotificationStore(
+            "user_notifications/notifications.sqlite", legacy_dir="user_notifications",
+            retention_days=int(os.getenv('NOTIFICATION_RETENTION_DAYS', '30')),
+            max_per_user=int(os.getenv('NOTIFICATION_MAX_PER_USER', '1000'))
+        )
+        # Open sessions poll these version counters instead of re-reading notifications and sync status
+        self.hub = notification_hub
+        self.hub.add_source(self._disk_version)
+        self.alert_digests = AlertDigestQueue(float(os.getenv('ALERT_DIGEST_WINDOW_SECONDS', '300')))
+        # Rolling rule windows by alert id, as (spec, RollingWindow); rebuilt from the data after a restart
+        self.rolling_windows = {}
+        self.alert_state = AlertStateTracker(float(os.getenv('ALERT_DEFAULT_COOLDOWN_MINUTES', '5')))
+        self.alert_history = AlertHistoryStore(
+            "alert_logs", retention_days=int(os.getenv('ALERT_HISTORY_RETENTION_DAYS', '30'))
+        )
     
     def _test_smtp_connection(self):
         """Test SMTP connection on startup with comprehensive debugging"""
@@ -86,26 +171,23 @@ class RealTimeSyncManager:
             server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15)
             logger.info("SUCCESS: SMTP connection object created")
             
-            logger.info("Step 2: Setting debug level to 1 for detailed output")
-            server.set_debuglevel(1)
-            
-            logger.info("Step 3: Sending EHLO command")
+            logger.info("Step 2: Sending EHLO command")
             server.ehlo()
             logger.info("SUCCESS: EHLO command successful")
             
-            logger.info("Step 4: Starting TLS encryption")
+            logger.info("Step 3: Starting TLS encryption")
             server.starttls()
             logger.info("SUCCESS: TLS started successfully")
             
-            logger.info("Step 5: Sending EHLO again after TLS")
+            logger.info("Step 4: Sending EHLO again after TLS")
             server.ehlo()
             logger.info("SUCCESS: EHLO after TLS successful")
             
-            logger.info(f"Step 6: Attempting login with user: {self.smtp_user}")
+            logger.info(f"Step 5: Attempting login with user: {self.smtp_user}")
             server.login(self.smtp_user, self.smtp_pass)
             logger.info("SUCCESS: SMTP login successful")
             
-            logger.info("Step 7: Closing connection")
+            logger.info("Step 6: Closing connection")
             server.quit()
             logger.info("SUCCESS: SMTP connection closed properly")
             
@@ -130,33 +212,40 @@ class RealTimeSyncManager:
     
     def _load_sync_config(self):
         """Load synchronization configuration"""
-        if os.path.exists(self.sync_config_file):
-            with open(self.sync_config_file, 'r') as f:
-                return json.load(f)
-        return {}
+        return self.sync_store.load()
     
     def _load_alerts_config(self):
         """Load alerts configuration"""
-        if os.path.exists(self.alerts_config_file):
-            with open(self.alerts_config_file, 'r') as f:
-                return json.load(f)
-        return {}
+        return self.alerts_store.load()
+    
+    def save_sync_config(self, force: bool = False):
+        """Save synchronization configuration (coalesced unless forced)"""
+        self.sync_store.mark_dirty()
+        if force:
+            self.sync_store.flush(force=True)
     
-    def save_sync_config(self):
-        """Save synchronization configuration"""
-        with open(self.sync_config_file, 'w') as f:
-            json.dump(self.sync_config, f, indent=2)
+    def save_alerts_config(self, force: bool = False):
+        """Save alerts configuration (coalesced unless forced)"""
+        self.alerts_store.mark_dirty()
+        if force:
+            self.alerts_store.flush(force=True)
     
-    def save_alerts_config(self):
-        """Save alerts configuration"""
-        with open(self.alerts_config_file, 'w') as f:
-            json.dump(self.alerts_config, f, indent=2)
+    def _publish_change(self, username: str, event: Dict):
+        """Tell open sessions about a user-visible change, here through the hub and elsewhere through the marker file"""
+        self.hub.publish(username, event)
+        try:
+            with open(self.change_marker_file, 'a'):
+                os.utime(self.change_marker_file, None)
+        except OSError as e:
+            logger.debug(f"Could not touch {self.change_marker_file}: {e}")
     
     def setup_data_source_sync(self, username: str, source_type: str, config: Dict):
         """Set up real-time synchronization for a data source"""
+        self._refresh_if_follower()
         sync_id = f"{username}_{source_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         self.sync_config[sync_id] = {
+            "sync_id": sync_id,
             "username": username,
             "source_type": source_type,
             "config": config,
@@ -164,28 +253,35 @@ class RealTimeSyncManager:
             "is_active": True,
             "last_sync": None,
             "sync_interval": config.get('sync_interval', 60),
-            "last_data_hash": None
+            "last_data_hash": None,
+            "consecutive_failures": 0,
+            "circuit_state": "closed",
+            "next_attempt": None
         }
         
-        self.save_sync_config()
+        self.save_sync_config(force=True)
+        self._publish_change(BROADCAST, {'type': 'sync_status', 'sync_id': sync_id})
         logger.info(f"Sync setup for {username} - {source_type}")
         return sync_id
     
     def setup_alert_rule(self, username: str, dashboard_id: str, rule: Dict):
         """Set up an alert rule for a dashboard"""
+        self._refresh_if_follower()
         alert_id = f"{username}_{dashboard_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        self.alerts_config[alert_id] = {
-            "username": username,
-            "dashboard_id": dashboard_id,
-            "rule": rule,
-            "created_at": datetime.now().isoformat(),
-            "is_active": True,
-            "last_triggered": None,
-            "trigger_count": 0
-        }
+        with self.config_lock:
+            self.alerts_config[alert_id] = {
+                "username": username,
+                "dashboard_id": dashboard_id,
+                "rule": rule,
+                "created_at": datetime.now().isoformat(),
+                "is_active": True,
+                "last_triggered": None,
+                "trigger_count": 0
+            }
         
-        self.save_alerts_config()
+        self.save_alerts_config(force=True)
+        self._publish_change(username, {'type': 'rule', 'alert_id': alert_id})
         
         # Enhanced logging for alert setup (ASCII only)
         alert_email = rule.get('email')
@@ -204,18 +300,25 @@ class RealTimeSyncManager:
     
     def toggle_alert_rule(self, alert_id: str, is_active: bool):
         """Enable or disable an alert rule"""
+        self._refresh_if_follower()
         if alert_id in self.alerts_config:
-            self.alerts_config[alert_id]['is_active'] = is_active
-            self.save_alerts_config()
+            with self.config_lock:
+                self.alerts_config[alert_id]['is_active'] = is_active
+            self.save_alerts_config(force=True)
+            self._publish_change(self.alerts_config[alert_id]['username'], {'type': 'rule', 'alert_id': alert_id})
             logger.info(f"Alert {alert_id} {'enabled' if is_active else 'disabled'}")
             return True
         return False
     
     def delete_alert_rule(self, alert_id: str):
         """Delete an alert rule"""
+        self._refresh_if_follower()
         if alert_id in self.alerts_config:
-            del self.alerts_config[alert_id]
-            self.save_alerts_config()
+            with self.config_lock:
+                alert_config = self.alerts_config.pop(alert_id, None)
+            self.save_alerts_config(force=True)
+            if alert_config is not None:
+                self._publish_change(alert_config['username'], {'type': 'rule', 'alert_id': alert_id})
             logger.info(f"Alert {alert_id} deleted")
             return True
         return False
@@ -223,12 +326,75 @@ class RealTimeSyncManager:
     def _calculate_data_hash(self, data: pd.DataFrame) -> str:
         """Calculate hash of data to detect changes"""
         try:
-            data_string = data.to_string()
-            return hashlib.md5(data_string.encode()).hexdigest()
+            return self.change_detector.fingerprint(data)['digest']
         except Exception as e:
             logger.error(f"Error calculating data hash: {e}")
             return str(datetime.now().timestamp())
     
+    def _process_synced_data(self, sync_config: Dict, new_data: pd.DataFrame, file_suffix: str, source_label: str) -> Dict:
+        """Detect row-level changes in freshly fetched data and store it if anything changed"""
+        username = sync_config['username']
+        state_id = sync_config.get('sync_id') or f"{username}_{file_suffix}"
+        
+        with CHANGE_DETECT_SECONDS.time(source_type=sync_config['source_type']):
+            changes = self.change_detector.detect_changes(
+                state_id, new_data, sync_config['config'].get('key_columns')
+            )
+        new_data_hash = changes['digest']
+        
+        # A source synced before row hashes existed only has its digest to compare against
+        if sync_config.get('last_data_hash') == new_data_hash:
+            changes['has_changes'] = False
+        
+        if not changes['has_changes']:
+            logger.info(f"No data changes detected for {username}")
+            if changes['baseline_missing']:
+                self.change_detector.commit(state_id, changes)
+            return {
+                "success": True,
+                "has_changes": False,
+                "timestamp": datetime.now().isoformat(),
+                "data_hash": new_data_hash
+            }
+        
+        logger.info(
+            f"DATA CHANGES DETECTED in {source_label} for {username}: "
+            f"{len(changes['added_rows'])} added, {len(changes['removed_rows'])} removed, "
+            f"{len(changes['modified_rows'])} modified rows"
+        )
+        
+        io_stats = self.snapshot_writer.publish(new_data, username, f"{username}_{file_suffix}")
+        SNAPSHOT_WRITE_SECONDS.observe(io_stats['io_seconds'], source_type=sync_config['source_type'])
+        logger.info(
+            f"Updated user data snapshot: {io_stats['path']} "
+            f"({io_stats['bytes_written']:,} bytes in {io_stats['io_seconds'] * 1000:.1f} ms)"
+        )
+        
+        self.change_detector.commit(state_id, changes)
+        with self.config_lock:
+            sync_config['last_data_hash'] = new_data_hash
+            sync_config['last_io_ms'] = round(io_stats['io_seconds'] * 1000, 1)
+        
+        return {
+            "success": True,
+            "has_changes": True,
+            "data_shape": f"{len(new_data)} rows, {len(new_data.columns)} columns",
+            "timestamp": datetime.now().isoformat(),
+            "data_hash": new_data_hash,
+            "rows_added": len(changes['added_rows']),
+            "rows_removed": len(changes['removed_rows']),
+            "rows_modified": len(changes['modified_rows']),
+            "io_seconds": io_stats['io_seconds'],
+            "bytes_written": io_stats['bytes_written'],
+            "data": new_data,
+            "delta": {
+                "rows": self.change_detector.delta_rows(new_data, changes),
+                "changed_columns": changes['changed_columns'],
+                "rows_removed": len(changes['removed_rows']),
+                "rows_modified": len(changes['modified_rows'])
+            }
+        }
+    
     def sync_google_sheets(self, sync_config: Dict) -> Dict:
         """Sync data from Google Sheets with improved change detection"""
         try:
@@ -245,43 +411,14 @@ class RealTimeSyncManager:
             
             logger.info(f"Fetching data from Google Sheets: {sheet_url}")
             
-            response = requests.get(csv_url)
+            fetch_start = time.perf_counter()
+            response = requests.get(csv_url, timeout=self.request_timeout)
             if response.status_code == 200:
-                new_data = pd.read_csv(csv_url)
+                new_data = pd.read_csv(io.StringIO(response.text))
+                self._observe_fetch(sync_config, fetch_start, new_data, len(response.content))
                 logger.info(f"Successfully fetched {len(new_data)} rows from Google Sheets")
                 
-                new_data_hash = self._calculate_data_hash(new_data)
-                previous_data_hash = sync_config.get('last_data_hash')
-                
-                has_changes = new_data_hash != previous_data_hash
-                
-                if has_changes:
-                    logger.info(f"DATA CHANGES DETECTED in Google Sheets for {sync_config['username']}")
-                    
-                    previous_data_path = f"realtime_data/{sync_config['username']}_sheets.csv"
-                    new_data.to_csv(previous_data_path, index=False)
-                    
-                    user_data_path = f"user_data/{sync_config['username']}.csv"
-                    new_data.to_csv(user_data_path, index=False)
-                    logger.info(f"Updated user data file: {user_data_path}")
-                    
-                    sync_config['last_data_hash'] = new_data_hash
-                    
-                    return {
-                        "success": True, 
-                        "has_changes": True,
-                        "data_shape": f"{len(new_data)} rows, {len(new_data.columns)} columns",
-                        "timestamp": datetime.now().isoformat(),
-                        "data_hash": new_data_hash
-                    }
-                else:
-                    logger.info(f"No data changes detected for {sync_config['username']}")
-                    return {
-                        "success": True,
-                        "has_changes": False,
-                        "timestamp": datetime.now().isoformat(),
-                        "data_hash": new_data_hash
-                    }
+                return self._process_synced_data(sync_config, new_data, 'sheets', 'Google Sheets')
             else:
                 logger.error(f"Google Sheets HTTP error: {response.status_code}")
                 return {"success": False, "error": f"HTTP {response.status_code}"}
@@ -298,7 +435,8 @@ class RealTimeSyncManager:
                 return {"success": False, "error": "No API URL provided"}
             
             logger.info(f"Fetching data from REST API: {api_url}")
-            response = requests.get(api_url)
+            fetch_start = time.perf_counter()
+            response = requests.get(api_url, timeout=self.request_timeout)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -314,39 +452,10 @@ class RealTimeSyncManager:
                 else:
                     return {"success": False, "error": "Unsupported data format"}
                 
+                self._observe_fetch(sync_config, fetch_start, new_data, len(response.content))
                 logger.info(f"Successfully fetched {len(new_data)} rows from REST API")
                 
-                new_data_hash = self._calculate_data_hash(new_data)
-                previous_data_hash = sync_config.get('last_data_hash')
-                
-                has_changes = new_data_hash != previous_data_hash
-                
-                if has_changes:
-                    logger.info(f"DATA CHANGES DETECTED in REST API for {sync_config['username']}")
-                    
-                    previous_data_path = f"realtime_data/{sync_config['username']}_api.csv"
-                    new_data.to_csv(previous_data_path, index=False)
-                    
-                    user_data_path = f"user_data/{sync_config['username']}.csv"
-                    new_data.to_csv(user_data_path, index=False)
-                    
-                    sync_config['last_data_hash'] = new_data_hash
-                    
-                    return {
-                        "success": True, 
-                        "has_changes": True,
-                        "data_shape": f"{len(new_data)} rows, {len(new_data.columns)} columns",
-                        "timestamp": datetime.now().isoformat(),
-                        "data_hash": new_data_hash
-                    }
-                else:
-                    logger.info(f"No data changes detected for {sync_config['username']}")
-                    return {
-                        "success": True,
-                        "has_changes": False,
-                        "timestamp": datetime.now().isoformat(),
-                        "data_hash": new_data_hash
-                    }
+                return self._process_synced_data(sync_config, new_data, 'api', 'REST API')
             else:
                 logger.error(f"REST API HTTP error: {response.status_code}")
                 return {"success": False, "error": f"HTTP {response.status_code}"}
@@ -366,6 +475,7 @@ class RealTimeSyncManager:
                 return {"success": False, "error": "Missing database configuration"}
             
             logger.info(f"Fetching data from {db_type} database")
+            fetch_start = time.perf_counter()
             
             if db_type == "MySQL":
                 import pymysql
@@ -391,73 +501,127 @@ class RealTimeSyncManager:
             
             new_data = pd.read_sql(query, connection)
             connection.close()
+            self._observe_fetch(sync_config, fetch_start, new_data)
             
             logger.info(f"Successfully fetched {len(new_data)} rows from {db_type} database")
             
-            new_data_hash = self._calculate_data_hash(new_data)
-            previous_data_hash = sync_config.get('last_data_hash')
-            
-            has_changes = new_data_hash != previous_data_hash
-            
-            if has_changes:
-                logger.info(f"DATA CHANGES DETECTED in {db_type} database for {sync_config['username']}")
-                
-                previous_data_path = f"realtime_data/{sync_config['username']}_sql.csv"
-                new_data.to_csv(previous_data_path, index=False)
-                
-                user_data_path = f"user_data/{sync_config['username']}.csv"
-                new_data.to_csv(user_data_path, index=False)
-                
-                sync_config['last_data_hash'] = new_data_hash
-                
-                return {
-                    "success": True, 
-                    "has_changes": True,
-                    "data_shape": f"{len(new_data)} rows, {len(new_data.columns)} columns",
-                    "timestamp": datetime.now().isoformat(),
-                    "data_hash": new_data_hash
-                }
-            else:
-                logger.info(f"No data changes detected for {sync_config['username']}")
-                return {
-                    "success": True,
-                    "has_changes": False,
-                    "timestamp": datetime.now().isoformat(),
-                    "data_hash": new_data_hash
-                }
+            return self._process_synced_data(sync_config, new_data, 'sql', f"{db_type} database")
                 
         except Exception as e:
             logger.error(f"{db_type} database sync error: {e}")
             return {"success": False, "error": str(e)}
     
-    def _should_trigger_alert(self, alert_config: Dict) -> bool:
-        """Check if alert should be triggered"""
-        return True
+    def _should_trigger_alert(self, alert_id: str, alert_config: Dict, key: str) -> bool:
+        """Check if a met condition should be delivered or suppressed as a duplicate or by cooldown"""
+        reason = self.alert_state.on_condition_met(alert_config, key)
+        if reason is None:
+            return True
+        ALERT_SUPPRESSED.inc(reason=reason)
+        logger.info(f"Suppressed alert {alert_id} ({reason}); {alert_config['suppressed_count']} suppressed so far")
+        return False
+    
+    def _resolve_if_recovered(self, alert_config: Dict, data: pd.DataFrame, delta: Dict = None) -> bool:
+        """Move a firing rule whose condition is no longer met to resolved once it clears its hysteresis band"""
+        if alert_config.get('alert_state') != FIRING:
+            return False
+        rule = alert_config['rule']
+        column = rule.get('column')
+        scope = self._rule_scope(rule, data, delta)
+        if column in scope.columns and pd.api.types.is_numeric_dtype(scope[column]):
+            values = scope[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = np.array([])
+        return self.alert_state.on_condition_not_met(alert_config, values)
+    
+    def check_alert_rules(self, username: str, data: pd.DataFrame, delta: Dict = None) -> List[Dict]:
+        """Check all alert rules for a user against current data and deliver firings inline"""
+        triggered_alerts = self.evaluate_alert_rules(username, data, delta)
+        for firing in triggered_alerts:
+            self.deliver_alert(firing)
+        return triggered_alerts
+    
+    def evaluate_alert_rules(self, username: str, data: pd.DataFrame, delta: Dict = None) -> List[Dict]:
+        """Evaluate a user's alert rules and return the firings to deliver.
+        
+        When a sync delta is given, rules whose monitored column did not change are
+        skipped and row-level rules only look at the new and changed rows. Only rule
+        state is updated here; logging, notifications and email happen in deliver_alert.
+        Runs under the config lock so a merge of config changes from disk never
+        interleaves with rule state updates.
+        """
+        with self.config_lock:
+            return self._evaluate_user_rules(username, data, delta)
     
-    def check_alert_rules(self, username: str, data: pd.DataFrame) -> List[Dict]:
-        """Check all alert rules for a user against current data"""
+    def _evaluate_user_rules(self, username: str, data: pd.DataFrame, delta: Dict = None) -> List[Dict]:
         triggered_alerts = []
+        state_changed = False
         
         active_alerts_count = len([a for a in self.alerts_config.values() if a['username'] == username and a['is_active']])
         logger.info(f"Checking {active_alerts_count} active alert rules for {username}")
         
-        for alert_id, alert_config in self.alerts_config.items():
+        # Evaluate every affected rule in grouped, vectorized passes up front
+        affected_alerts = {
+            alert_id: alert_config for alert_id, alert_config in self.alerts_config.items()
+            if alert_config['username'] == username and alert_config['is_active']
+            and self._rule_affected_by_delta(alert_config['rule'], delta)
+        }
+        anomaly_bounds = {
+            alert_id: self._update_anomaly_sketch(alert_config, data, delta)
+            for alert_id, alert_config in affected_alerts.items()
+            if alert_config['rule'].get('condition_type') == 'anomaly'
+        }
+        for stale_id in set(self.rolling_windows) - set(self.alerts_config):
+            del self.rolling_windows[stale_id]  # rule deleted here or in another process
+        rolling_windows = {
+            alert_id: self._update_rolling_window(alert_id, alert_config, data, delta)
+            for alert_id, alert_config in affected_alerts.items()
+            if alert_config['rule'].get('condition_type') in ROLLING_CONDITIONS
+        }
+        compiled_rules = CompiledAlertRules(affected_alerts)
+        evaluations = compiled_rules.evaluate(data, delta, anomaly_bounds, rolling_windows)
+        column_stats = {}
+        
+        for alert_id, alert_config in list(self.alerts_config.items()):
             if (alert_config['username'] == username and 
                 alert_config['is_active']):
                 
-                # Log alert details before evaluation
-                alert_email = alert_config['rule'].get('email')
+                # One structured record per rule; the per-cycle summary below stays at INFO
                 alert_name = alert_config['rule'].get('name', 'Unnamed Rule')
-                logger.info(f"Evaluating alert: {alert_name}")
-                logger.info(f"   Alert ID: {alert_id}")
-                logger.info(f"   Email configured: {alert_email if alert_email else 'NO EMAIL'}")
-                logger.info(f"   SMTP Status: {'WORKING' if self.smtp_working else 'NOT WORKING'}")
-                logger.info(f"   Active: {alert_config['is_active']}")
+                logger.debug(f"Evaluating alert: {alert_name}", extra={'fields': {
+                    'alert_id': alert_id,
+                    'email': bool(alert_config['rule'].get('email')),
+                    'smtp_working': self.smtp_working
+                }})
                 
-                is_condition_met = self._evaluate_alert_rule(alert_config['rule'], data)
+                if not self._rule_affected_by_delta(alert_config['rule'], delta):
+                    logger.debug(f"Skipping {alert_name}: column '{alert_config['rule'].get('column')}' unchanged")
+                    continue
+                
+                result = evaluations.get(alert_id)
+                if result is not None:
+                    is_condition_met = result['triggered']
+                else:
+                    is_condition_met = self._evaluate_alert_rule(alert_config['rule'], data, delta, anomaly_bounds.get(alert_id))
+                ALERT_EVALUATIONS.inc(alert_id=alert_id)
                 
                 if is_condition_met:
-                    logger.info(f"ALERT CONDITION MET: {alert_name}")
+                    logger.info(f"ALERT CONDITION MET: {alert_name}", extra={'key': f"condition_met:{alert_id}", 'fields': {
+                        'alert_id': alert_id,
+                        'hit_count': result['hit_count'] if result is not None else None,
+                        'value': result['first_hit_value'] if result is not None else None
+                    }})
+                    ALERT_FIRINGS.inc(alert_id=alert_id)
+                    
+                    # Decide on duplicates and cooldown before any logging, notification or email I/O
+                    state_changed = True
+                    scope, hit_mask = compiled_rules.scoped_mask(alert_id, data, delta, anomaly_bounds.get(alert_id),
+                                                                 rolling_windows.get(alert_id))
+                    key = dedup_key(alert_id, scope, alert_config['rule'].get('column'), hit_mask)
+                    if not self._should_trigger_alert(alert_id, alert_config, key):
+                        continue
+                    
+                    evaluation = compiled_rules.explain(alert_id, data, delta, anomaly_bounds.get(alert_id), column_stats,
+                                                        rolling_windows.get(alert_id), scoped=(scope, hit_mask))
                     
                     alert_config['last_triggered'] = datetime.now().isoformat()
                     alert_config['trigger_count'] += 1
@@ -466,61 +630,186 @@ class RealTimeSyncManager:
                         'alert_id': alert_id,
                         'rule': alert_config['rule'],
                         'dashboard_id': alert_config['dashboard_id'],
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': datetime.now().isoformat(),
+                        'username': username,
+                        'alert_config': alert_config,
+                        'evaluation': evaluation,
+                        'data': data
                     })
                     
-                    # FIX: Wrap log_alert in try-except to prevent it from blocking email sending
-                    try:
-                        self._log_alert(alert_id, alert_config, data)
-                    except Exception as e:
-                        logger.warning(f"Could not log alert (non-critical): {e}")
-                    
-                    self._create_main_notification(alert_config, data)
-                    
-                    # ENHANCED: Email sending with error handling to ensure it runs
-                    if alert_email and alert_email.strip():
-                        logger.info("")
-                        logger.info("=" * 60)
-                        logger.info("ALERT EMAIL PROCESS - INITIATING")
-                        logger.info("=" * 60)
-                        logger.info(f"   Alert Name: {alert_name}")
-                        logger.info(f"   Recipient: {alert_email}")
-                        logger.info(f"   SMTP User: {self.smtp_user}")
-                        logger.info(f"   SMTP Host: {self.smtp_host}:{self.smtp_port}")
-                        logger.info(f"   SMTP Working: {self.smtp_working}")
-                        
-                        # FIX: Ensure email sending always runs even if other parts fail
-                        try:
-                            email_sent = self._send_email_notification_direct(alert_config, data, alert_email, username)
-                            if email_sent:
-                                logger.info("EMAIL SENT SUCCESSFULLY!")
-                            else:
-                                logger.error("EMAIL SENDING FAILED!")
-                        except Exception as e:
-                            logger.error(f"CRITICAL: Email sending failed with error: {e}")
-                        logger.info("=" * 60)
-                        logger.info("")
-                    else:
-                        logger.warning(f"No email configured for alert: {alert_name}")
-                    
                 else:
                     logger.debug(f"Alert condition not met for: {alert_name}")
+                    if self._resolve_if_recovered(alert_config, data, delta):
+                        state_changed = True
+                        logger.info(f"Alert resolved: {alert_name}")
         
-        if triggered_alerts:
+        if triggered_alerts or state_changed:
             self.save_alerts_config()
-            logger.info(f"ALERTS TRIGGERED: {len(triggered_alerts)} alerts fired for {username}")
-            for alert in triggered_alerts:
-                logger.info(f"   {alert['rule'].get('name', 'Unnamed Rule')}")
+        if triggered_alerts:
+            logger.info(f"ALERTS TRIGGERED: {len(triggered_alerts)} alerts fired for {username}", extra={'fields': {
+                'alerts': [alert['rule'].get('name', 'Unnamed Rule') for alert in triggered_alerts]
+            }})
         else:
             logger.info(f"No alerts triggered for {username}")
         
         return triggered_alerts
     
-    def _create_main_notification(self, alert_config: Dict, data: pd.DataFrame):
+    def deliver_alert(self, firing: Dict):
+        """Log, notify and email one firing returned by evaluate_alert_rules"""
+        alert_id = firing['alert_id']
+        alert_config = firing['alert_config']
+        evaluation = firing['evaluation']
+        data = firing['data']
+        username = firing['username']
+        alert_email = alert_config['rule'].get('email')
+        alert_name = alert_config['rule'].get('name', 'Unnamed Rule')
+        
+        # FIX: Wrap log_alert in try-except to prevent it from blocking email sending
+        try:
+            self._log_alert(alert_id, alert_config, data, evaluation)
+        except Exception as e:
+            logger.warning(f"Could not log alert (non-critical): {e}")
+        
+        self._create_main_notification(alert_config, evaluation)
+        
+        # Non-critical alerts wait for the recipient's digest; critical ones go out right away
+        if (alert_email and alert_email.strip() and self.alert_digests.window_seconds > 0
+                and alert_config['rule'].get('priority') != 'critical'):
+            self.alert_digests.add(alert_email, username, alert_id, alert_config['rule'],
+                                   evaluation, firing['timestamp'])
+            logger.info(f"Queued {alert_name} for the {alert_email} digest ({self.alert_digests.pending_count()} pending)")
+        # Critical alerts (or no digest window) go out right away; _send_email logs the outcome
+        elif alert_email and alert_email.strip():
+            logger.debug(f"Sending alert email for {alert_name}", extra={'fields': {'alert_id': alert_id}})
+            try:
+                with EMAIL_SEND_SECONDS.time():
+                    email_sent = self._send_email_notification_direct(alert_config, evaluation, alert_email, username)
+            except Exception as e:
+                logger.warning(f"Alert email for {alert_name} failed: {e}", extra={'fields': {'alert_id': alert_id}})
+                email_sent = False
+            if email_sent:
+                EMAILS_SENT.inc(kind='immediate')
+            else:
+                EMAIL_FAILURES.inc()
+        else:
+            logger.warning(f"No email configured for alert: {alert_name}")
+    
+    def send_due_digests(self, force: bool = False) -> int:
+        """Send one digest email per recipient whose window has closed (all of them if ``force``)"""
+        sent = 0
+        for recipient, username, items in self.alert_digests.pop_due(force):
+            try:
+                with EMAIL_SEND_SECONDS.time():
+                    email_sent = self._send_digest_email(recipient, username, items)
+            except Exception as e:
+                logger.error(f"Digest email to {recipient} failed with error: {e}")
+                email_sent = False
+            if email_sent:
+                sent += 1
+                EMAILS_SENT.inc(kind='digest')
+                logger.info(f"Sent digest of {len(items)} alerts to {recipient}")
+            else:
+                EMAIL_FAILURES.inc()
+                logger.error(f"Digest of {len(items)} alerts to {recipient} could not be sent")
+        return sent
+    
+    def _rule_affected_by_delta(self, rule: Dict, delta: Dict = None) -> bool:
+        """Check whether a sync delta can change the outcome of a rule"""
+        if delta is None:
+            return True
+        if rule.get('column') not in delta['changed_columns']:
+            return False
+        if rule.get('condition_type') in ('threshold', 'anomaly'):
+            return not delta['rows'].empty
+        return True
+    
+    def _update_anomaly_sketch(self, alert_config: Dict, data: pd.DataFrame, delta: Dict = None):
+        """Fold new rows into an anomaly rule's quantile sketch and return its IQR bounds.
+        
+        Pure appends only add the delta rows. The sketch is rebuilt from the full
+        column when rows were removed or modified, the monitored column changed,
+        or its row count no longer matches the data.
+        """
+        column = alert_config['rule'].get('column')
+        if column not in data.columns or not pd.api.types.is_numeric_dtype(data[column]):
+            return None
+        
+        state = alert_config.get('anomaly_sketch')
+        row_count = int(data[column].count())
+        sketch = None
+        if state and state.get('column') == column:
+            sketch = KLLSketch.from_dict(state)
+            if delta is not None and not delta.get('rows_removed') and not delta.get('rows_modified'):
+                sketch.update(delta['rows'][column].to_numpy(dtype=np.float64, na_value=np.nan))
+            if sketch.n != row_count:
+                sketch = None
+        if sketch is None:
+            sketch = KLLSketch()
+            sketch.update(data[column].to_numpy(dtype=np.float64, na_value=np.nan))
+            logger.info(f"Rebuilt quantile sketch for {column} from {row_count:,} rows")
+        
+        alert_config['anomaly_sketch'] = dict(sketch.to_dict(), column=column)
+        return sketch_iqr_bounds(sketch)
+    
+    def _update_rolling_window(self, alert_id: str, alert_config: Dict, data: pd.DataFrame, delta: Dict = None):
+        """Append new rows to a rolling rule's window and return it.
+        
+        Like the anomaly sketch, pure appends only add the delta rows. The window is
+        rebuilt from the tail of the data when rows were removed or modified, the
+        rule's window changed, or the rows seen no longer match the data.
+        """
+        rule = alert_config['rule']
+        column = rule.get('column')
+        size, seconds, time_column = window_spec(rule)
+        if column not in data.columns or not pd.api.types.is_numeric_dtype(data[column]):
+            return None
+        if time_column is not None and time_column not in data.columns:
+            return None
+        
+        def window_rows(frame: pd.DataFrame):
+            values = frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            times = None
+            if time_column is not None:
+                times = pd.to_datetime(frame[time_column], errors='coerce').to_numpy(dtype='datetime64[ns]').astype(np.int64)
+            return values, times
+        
+        spec = (column, time_column, size, seconds)
+        cached = self.rolling_windows.get(alert_id)
+        window = None
+        if cached is not None and cached[0] == spec:
+            window = cached[1]
+            if delta is not None and not delta.get('rows_removed') and not delta.get('rows_modified'):
+                window.update(*window_rows(delta['rows']))
+            if window.n != len(data):
+                window = None
+        if window is None:
+            window = RollingWindow(size, seconds)
+            # Row windows only need the tail; time windows filter on the time column
+            tail = data if seconds is not None else data.iloc[-size:]
+            window.update(*window_rows(tail))
+            window.n = len(data)
+            logger.info(f"Rebuilt rolling window for {column} ({len(window.values)} rows)")
+        
+        self.rolling_windows[alert_id] = (spec, window)
+        # Only the window's shape goes in the config file, which is rewritten every few seconds
+        alert_config['rolling_window'] = dict(window.state(), column=column, time_column=time_column)
+        return window
+    
+    def _rule_scope(self, rule: Dict, data: pd.DataFrame, delta: Dict = None) -> pd.DataFrame:
+        """Rows a rule is checked against: the delta for row-level rules, otherwise the full data.
+        
+        Anomaly bounds and trend averages still describe the full data.
+        """
+        if delta is not None and rule.get('condition_type') in ('threshold', 'anomaly'):
+            return delta['rows']
+        return data
+    
+    def _create_main_notification(self, alert_config: Dict, evaluation: AlertEvaluation):
         """Create detailed notification for main interface with threshold values"""
         try:
             rule = alert_config['rule']
             username = alert_config['username']
+            stats = evaluation.stats
             
             condition_type = rule.get('condition_type')
             column = rule.get('column')
@@ -529,15 +818,15 @@ class RealTimeSyncManager:
             
             if condition_type == 'threshold':
                 if operator == 'greater_than':
-                    triggered_values = data[data[column] > value][column].tolist()
+                    triggered_values = evaluation.triggered_values
                     notification_title = f"Threshold Alert: {rule.get('name', 'Unnamed Rule')}"
                     notification_message = f"""
 THRESHOLD ALERT TRIGGERED
 
 Condition: {column} > {value}
 Triggered Values: {triggered_values[:5]}
-Total Records: {len(data)}
-Latest Value: {data[column].iloc[-1] if len(data) > 0 else 'N/A'}
+Total Records: {stats['total_records']}
+Latest Value: {stats.get('latest', 'N/A')}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -545,15 +834,15 @@ Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Please review your dashboard for detailed insights.
                     """
                 elif operator == 'less_than':
-                    triggered_values = data[data[column] < value][column].tolist()
+                    triggered_values = evaluation.triggered_values
                     notification_title = f"Threshold Alert: {rule.get('name', 'Unnamed Rule')}"
                     notification_message = f"""
 THRESHOLD ALERT TRIGGERED
 
 Condition: {column} < {value}
 Triggered Values: {triggered_values[:5]}
-Total Records: {len(data)}
-Latest Value: {data[column].iloc[-1] if len(data) > 0 else 'N/A'}
+Total Records: {stats['total_records']}
+Latest Value: {stats.get('latest', 'N/A')}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -561,15 +850,15 @@ Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Please review your dashboard for detailed insights.
                     """
                 elif operator == 'equals':
-                    triggered_values = data[data[column] == value][column].tolist()
+                    triggered_values = evaluation.triggered_values
                     notification_title = f"Threshold Alert: {rule.get('name', 'Unnamed Rule')}"
                     notification_message = f"""
 THRESHOLD ALERT TRIGGERED
 
 Condition: {column} = {value}
 Triggered Values: {triggered_values[:5]}
-Total Records: {len(data)}
-Latest Value: {data[column].iloc[-1] if len(data) > 0 else 'N/A'}
+Total Records: {stats['total_records']}
+Latest Value: {stats.get('latest', 'N/A')}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -577,15 +866,15 @@ Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Please review your dashboard for detailed insights.
                     """
                 else:
-                    triggered_values = data[data[column] != value][column].tolist()
+                    triggered_values = evaluation.triggered_values
                     notification_title = f"Threshold Alert: {rule.get('name', 'Unnamed Rule')}"
                     notification_message = f"""
 THRESHOLD ALERT TRIGGERED
 
 Condition: {column} ≠ {value}
 Triggered Values: {triggered_values[:5]}
-Total Records: {len(data)}
-Latest Value: {data[column].iloc[-1] if len(data) > 0 else 'N/A'}
+Total Records: {stats['total_records']}
+Latest Value: {stats.get('latest', 'N/A')}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -594,23 +883,17 @@ Please review your dashboard for detailed insights.
                     """
             
             elif condition_type == 'anomaly':
-                Q1 = data[column].quantile(0.25)
-                Q3 = data[column].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                anomalies = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
-                anomaly_values = anomalies[column].tolist()
+                lower_bound, upper_bound = evaluation.bounds or (np.nan, np.nan)
                 
                 notification_title = f"Anomaly Alert: {rule.get('name', 'Unnamed Rule')}"
                 notification_message = f"""
 ANOMALY ALERT TRIGGERED
 
 Condition: Anomaly detected in {column}
-Anomaly Values: {anomaly_values[:5]}
-Total Anomalies: {len(anomalies)}
+Anomaly Values: {evaluation.triggered_values[:5]}
+Total Anomalies: {evaluation.hit_count}
 Normal Range: {lower_bound:.2f} to {upper_bound:.2f}
-Total Records: {len(data)}
+Total Records: {stats['total_records']}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -619,9 +902,9 @@ Please review your dashboard for detailed insights.
                 """
             
             elif condition_type == 'trend':
-                last_value = data[column].iloc[-1] if len(data) > 0 else 0
-                avg_value = data[column].mean()
-                change_percent = ((last_value - avg_value) / avg_value) * 100
+                last_value = evaluation.last_value or 0
+                avg_value = evaluation.avg_value or 0
+                change_percent = evaluation.change_percent or 0
                 
                 trend_direction = "increasing" if operator == 'increasing' else "decreasing"
                 
@@ -633,7 +916,25 @@ Condition: {trend_direction} trend in {column} (> {value}% change)
 Current Value: {last_value:.2f}
 Average Value: {avg_value:.2f}
 Change Percentage: {change_percent:.2f}%
-Total Records: {len(data)}
+Total Records: {stats['total_records']}
+
+Alert Rule: {rule.get('name', 'Unnamed Rule')}
+Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+Please review your dashboard for detailed insights.
+                """
+            elif condition_type in ROLLING_CONDITIONS:
+                window = evaluation.window or {}
+                
+                notification_title = f"Rolling Window Alert: {rule.get('name', 'Unnamed Rule')}"
+                notification_message = f"""
+ROLLING WINDOW ALERT TRIGGERED
+
+Condition: {self._describe_rolling_condition(rule)}
+Window Statistic: {window.get('statistic', float('nan')):.2f}
+Rows in Window: {window.get('rows', 'N/A')}
+Latest Value: {window.get('last_value', 'N/A')}
+Total Records: {stats['total_records']}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -648,7 +949,7 @@ ALERT TRIGGERED
 Condition Type: {condition_type}
 Column: {column}
 Value: {value}
-Total Records: {len(data)}
+Total Records: {stats['total_records']}
 
 Alert Rule: {rule.get('name', 'Unnamed Rule')}
 Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -656,15 +957,16 @@ Triggered At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Please review your dashboard for detailed insights.
                 """
             
-            self._create_user_notification(username, notification_title, notification_message)
+            self._create_user_notification(username, notification_title, notification_message, evaluation.alert_id)
             logger.info(f"Created main interface notification for {username}: {notification_title}")
             
         except Exception as e:
             logger.error(f"Error creating main notification: {e}")
     
-    def _evaluate_alert_rule(self, rule: Dict, data: pd.DataFrame) -> bool:
+    def _evaluate_alert_rule(self, rule: Dict, data: pd.DataFrame, delta: Dict = None, bounds=None) -> bool:
         """Evaluate if an alert rule condition is met"""
         try:
+            scope = self._rule_scope(rule, data, delta)
             condition_type = rule.get('condition_type')
             column = rule.get('column')
             value = rule.get('value')
@@ -674,28 +976,30 @@ Please review your dashboard for detailed insights.
                 logger.warning(f"Column '{column}' not found in data")
                 return False
             
-            logger.info(f"Evaluating alert condition: {rule.get('name', 'Unnamed Rule')} on column '{column}'")
+            logger.debug(f"Evaluating alert condition: {rule.get('name', 'Unnamed Rule')} on column '{column}'")
             
             if condition_type == 'threshold':
                 if operator == 'greater_than':
-                    result = bool((data[column] > value).any())
+                    result = bool((scope[column] > value).any())
                     if result:
-                        triggered_values = data[data[column] > value][column].tolist()
-                        logger.info(f"THRESHOLD ALERT: {column} > {value} - Triggered values: {triggered_values}")
+                        triggered_values = scope[scope[column] > value][column].tolist()
+                        logger.info(f"THRESHOLD ALERT: {column} > {value} - Triggered values: {truncate_values(triggered_values)}",
+                                    extra={'fields': {'column': column, 'hit_count': len(triggered_values)}})
                     return result
                 elif operator == 'less_than':
-                    result = bool((data[column] < value).any())
+                    result = bool((scope[column] < value).any())
                     if result:
-                        triggered_values = data[data[column] < value][column].tolist()
-                        logger.info(f"THRESHOLD ALERT: {column} < {value} - Triggered values: {triggered_values}")
+                        triggered_values = scope[scope[column] < value][column].tolist()
+                        logger.info(f"THRESHOLD ALERT: {column} < {value} - Triggered values: {truncate_values(triggered_values)}",
+                                    extra={'fields': {'column': column, 'hit_count': len(triggered_values)}})
                     return result
                 elif operator == 'equals':
-                    result = bool((data[column] == value).any())
+                    result = bool((scope[column] == value).any())
                     if result:
                         logger.info(f"THRESHOLD ALERT: {column} = {value}")
                     return result
                 elif operator == 'not_equals':
-                    result = bool((data[column] != value).any())
+                    result = bool((scope[column] != value).any())
                     if result:
                         logger.info(f"THRESHOLD ALERT: {column} ≠ {value}")
                     return result
@@ -704,23 +1008,21 @@ Please review your dashboard for detailed insights.
                 if len(data) < 2:
                     logger.warning(f"Need at least 2 data points for anomaly detection")
                     return False
-                    
-                Q1 = data[column].quantile(0.25)
-                Q3 = data[column].quantile(0.75)
-                IQR = Q3 - Q1
                 
-                if IQR == 0:
+                if bounds is None:
+                    bounds = iqr_bounds(data[column].to_numpy(dtype=np.float64, na_value=np.nan))
+                if bounds is None:
                     logger.warning(f"No variance in data for anomaly detection")
                     return False
-                    
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
                 
-                anomalies = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
+                lower_bound, upper_bound = bounds
+                
+                anomalies = scope[(scope[column] < lower_bound) | (scope[column] > upper_bound)]
                 result = len(anomalies) > 0
                 if result:
                     anomaly_values = anomalies[column].tolist()
-                    logger.info(f"ANOMALY ALERT: {len(anomalies)} anomalies in {column} - Anomaly values: {anomaly_values}")
+                    logger.info(f"ANOMALY ALERT: {len(anomalies)} anomalies in {column} - Anomaly values: {truncate_values(anomaly_values)}",
+                                extra={'fields': {'column': column, 'hit_count': len(anomalies)}})
                 return result
             
             elif condition_type == 'trend':
@@ -738,170 +1040,106 @@ Please review your dashboard for detailed insights.
                         logger.info(f"TREND ALERT: {column} decreasing - Last: {last_value:.2f}, Avg: {avg_value:.2f}, Change: {change_percent:.2f}%")
                         return True
                     else:
-                        logger.info(f"No trend detected for {column} - Last: {last_value:.2f}, Avg: {avg_value:.2f}")
+                        logger.debug(f"No trend detected for {column} - Last: {last_value:.2f}, Avg: {avg_value:.2f}")
             
-            logger.info(f"Alert condition not met for {rule.get('name', 'Unnamed Rule')}")
+            logger.debug(f"Alert condition not met for {rule.get('name', 'Unnamed Rule')}")
             return False
             
         except Exception as e:
             logger.error(f"Error evaluating alert rule: {e}")
             return False
     
-    def _log_alert(self, alert_id: str, alert_config: Dict, data: pd.DataFrame):
-        """Log triggered alert to file - FIXED with better error handling"""
+    def _log_alert(self, alert_id: str, alert_config: Dict, data: pd.DataFrame, evaluation: AlertEvaluation):
+        """Append the triggered alert to the alert history"""
         try:
-            log_entry = {
+            self.alert_history.append({
                 'alert_id': alert_id,
+                'username': alert_config['username'],
                 'rule': alert_config['rule'],
                 'timestamp': datetime.now().isoformat(),
                 'data_snapshot': {
                     'rows': len(data),
                     'columns': list(data.columns),
-                    'triggered_value': self._get_triggered_value(alert_config['rule'], data)
+                    'triggered_value': evaluation.triggered_value,
+                    'hit_count': evaluation.hit_count
                 }
-            }
-            
-            log_file = f"alert_logs/{alert_id}_{datetime.now().strftime('%Y%m%d')}.json"
-            log_data = []
-            
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, 'r') as f:
-                        log_data = json.load(f)
-                except json.JSONDecodeError:
-                    # If file is corrupted, start fresh
-                    log_data = []
-            
-            log_data.append(log_entry)
-            
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            })
         except Exception as e:
             # Don't raise the exception, just log it and continue
             logger.warning(f"Could not log alert to file (non-critical): {e}")
     
-    def _send_email_notification_direct(self, alert_config: Dict, data: pd.DataFrame, user_email: str, username: str) -> bool:
+    def _send_email_notification_direct(self, alert_config: Dict, evaluation: AlertEvaluation, user_email: str, username: str) -> bool:
         """Send email notification directly using SMTP - UPDATED with creative content"""
-        logger.info("STARTING EMAIL SENDING PROCESS")
+        rule = alert_config['rule']
+        # UPDATED: Creative subject line
+        subject = f"🚨 ALERT: {rule.get('name', 'Unnamed Rule')} - {username} - Inferaboard AI Analytics"
+        return self._send_email(user_email, subject, self._format_email_alert_message(rule, evaluation, username))
+    
+    def _send_digest_email(self, user_email: str, username: str, items: List[Dict]) -> bool:
+        """Send one email covering every alert collected for a recipient in a digest window"""
+        subject = f"🚨 ALERT DIGEST: {len(items)} alerts - {username} - Inferaboard AI Analytics"
+        return self._send_email(user_email, subject, self._format_digest_email_message(username, items))
+    
+    def _send_email(self, user_email: str, subject: str, message_body: str) -> bool:
+        """Send one email through a fresh SMTP session.
+        
+        Logs a single structured INFO record on success and a WARNING naming the
+        failed step otherwise; the per-step SMTP trace is at DEBUG.
+        """
+        if not user_email or not user_email.strip():
+            logger.warning("No valid email provided for alert")
+            return False
+        
+        if not self.smtp_user or not self.smtp_pass:
+            logger.warning("SMTP credentials not configured. Email functionality disabled.")
+            return False
+        
+        # Validate email format
+        import re
+        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        if not re.match(email_pattern, user_email):
+            logger.warning("Invalid email format", extra={'fields': {'recipient': user_email}})
+            return False
+        
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_user
+        msg['To'] = user_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(message_body, 'plain'))
         
+        start = time.perf_counter()
+        step = "connect"
         try:
-            rule = alert_config['rule']
-            
-            if not user_email or not user_email.strip():
-                logger.error("No valid email provided for alert")
-                return False
-            
-            if not self.smtp_user or not self.smtp_pass:
-                logger.error("SMTP credentials not configured. Email functionality disabled.")
-                return False
-            
-            # Validate email format
-            import re
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, user_email):
-                logger.error(f"Invalid email format: {user_email}")
-                return False
-            
-            # UPDATED: Creative subject line
-            subject = f"🚨 ALERT: {rule.get('name', 'Unnamed Rule')} - {username} - Inferaboard AI Analytics"
-            message_body = self._format_email_alert_message(rule, data, username)
-            
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_user
-            msg['To'] = user_email
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(message_body, 'plain'))
-            
-            # SMTP DEBUGGING
-            logger.info("SMTP DEBUGGING - STEP BY STEP")
-            logger.info("=" * 50)
-            
-            try:
-                # Step 1: Connect to SMTP server
-                logger.info("Step 1/7: Creating SMTP connection...")
-                logger.info(f"   Host: {self.smtp_host}")
-                logger.info(f"   Port: {self.smtp_port}")
-                
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
-                logger.info("SUCCESS: SMTP connection object created")
-                
-                # Step 2: Enable debug output
-                logger.info("Step 2/7: Enabling SMTP debug output...")
-                server.set_debuglevel(1)
-                logger.info("SUCCESS: SMTP debug level set to 1")
-                
-                # Step 3: EHLO command
-                logger.info("Step 3/7: Sending EHLO command...")
+            logger.debug(f"SMTP connecting to {self.smtp_host}:{self.smtp_port}")
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as server:
+                step = "starttls"
                 server.ehlo()
-                logger.info("SUCCESS: EHLO command successful")
-                
-                # Step 4: Start TLS
-                logger.info("Step 4/7: Starting TLS encryption...")
                 server.starttls()
-                logger.info("SUCCESS: TLS started successfully")
-                
-                # Step 5: EHLO after TLS
-                logger.info("Step 5/7: Sending EHLO after TLS...")
                 server.ehlo()
-                logger.info("SUCCESS: EHLO after TLS successful")
-                
-                # Step 6: Login
-                logger.info("Step 6/7: Attempting SMTP login...")
-                logger.info(f"   Username: {self.smtp_user}")
-                
+                logger.debug("SMTP TLS started")
+                step = "login"
                 server.login(self.smtp_user, self.smtp_pass)
-                logger.info("SUCCESS: SMTP login successful")
-                
-                # Step 7: Send email
-                logger.info("Step 7/7: Sending email message...")
-                logger.info(f"   From: {self.smtp_user}")
-                logger.info(f"   To: {user_email}")
-                logger.info(f"   Subject: {subject}")
-                
-                text = msg.as_string()
-                server.sendmail(self.smtp_user, user_email, text)
-                logger.info("SUCCESS: Email sent successfully")
-                
-                # Final step: Quit
-                logger.info("Final step: Closing SMTP connection...")
-                server.quit()
-                logger.info("SUCCESS: SMTP connection closed properly")
-                
-                logger.info("EMAIL SENT SUCCESSFULLY!")
-                logger.info("=" * 50)
-                return True
-                
-            except smtplib.SMTPAuthenticationError as e:
-                logger.error(f"SMTP Authentication failed at Step 6: {e}")
-                return False
-            except smtplib.SMTPConnectError as e:
-                logger.error(f"SMTP Connection failed at Step 1: {e}")
-                return False
-            except smtplib.SMTPSenderRefused as e:
-                logger.error(f"SMTP Sender refused at Step 7: {e}")
-                return False
-            except smtplib.SMTPRecipientsRefused as e:
-                logger.error(f"SMTP Recipient refused at Step 7: {e}")
-                return False
-            except smtplib.SMTPException as e:
-                logger.error(f"SMTP error occurred: {e}")
-                return False
-            except Exception as e:
-                logger.error(f"Unexpected SMTP error: {e}")
-                return False
-            
+                logger.debug("SMTP login successful")
+                step = "send"
+                server.sendmail(self.smtp_user, user_email, msg.as_string())
         except Exception as e:
-            logger.error(f"Failed to send email alert: {e}")
+            logger.warning(f"Email could not be sent ({step} failed): {e}", extra={'fields': {
+                'recipient': user_email,
+                'step': step,
+                'error': type(e).__name__,
+                'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
+            }})
             return False
+        
+        logger.info("Email sent", extra={'fields': {
+            'recipient': user_email,
+            'subject': subject,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
+        }})
+        return True
     
-    def _format_email_alert_message(self, rule: Dict, data: pd.DataFrame, username: str) -> str:
+    def _format_email_alert_message(self, rule: Dict, evaluation: AlertEvaluation, username: str) -> str:
         """Format detailed email alert message with creative content - UPDATED"""
-        condition_type = rule.get('condition_type')
-        column = rule.get('column')
-        value = rule.get('value')
-        operator = rule.get('operator')
-        
         # Creative email header
         message = "🚨 INFERABOARD ALERT NOTIFICATION 🚨\n\n"
         message += "="*60 + "\n\n"
@@ -912,68 +1150,75 @@ Please review your dashboard for detailed insights.
         message += f"🔸 Status: ACTIVE\n\n"
         message += "="*60 + "\n\n"
         
+        message += self._format_alert_details(rule, evaluation)
+        message += self._format_email_footer()
+        
+        return message
+    
+    def _format_alert_details(self, rule: Dict, evaluation: AlertEvaluation) -> str:
+        """Alert details and data statistics section of an alert email"""
+        stats = evaluation.stats
+        condition_type = rule.get('condition_type')
+        column = rule.get('column')
+        value = rule.get('value')
+        operator = rule.get('operator')
+        
         # Alert details section
-        message += "📈 ALERT DETAILS\n\n"
+        message = "📈 ALERT DETAILS\n\n"
         
         if condition_type == 'threshold':
             if operator == 'greater_than':
-                triggered_values = data[data[column] > value][column].tolist()
+                triggered_values = evaluation.triggered_values
                 message += f"🎯 TYPE: Threshold Alert (Greater Than)\n\n"
                 message += f"📋 CONDITION:\n"
                 message += f"   • Column: {column}\n"
                 message += f"   • Threshold: > {value}\n"
                 message += f"   • Triggered Values: {triggered_values[:8]}\n"
-                message += f"   • Total Records Exceeding: {len(triggered_values)}\n\n"
+                message += f"   • Total Records Exceeding: {evaluation.hit_count}\n\n"
                 message += f"💡 INSIGHT: Values have crossed the upper threshold limit\n\n"
             elif operator == 'less_than':
-                triggered_values = data[data[column] < value][column].tolist()
+                triggered_values = evaluation.triggered_values
                 message += f"🎯 TYPE: Threshold Alert (Less Than)\n\n"
                 message += f"📋 CONDITION:\n"
                 message += f"   • Column: {column}\n"
                 message += f"   • Threshold: < {value}\n"
                 message += f"   • Triggered Values: {triggered_values[:8]}\n"
-                message += f"   • Total Records Below: {len(triggered_values)}\n\n"
+                message += f"   • Total Records Below: {evaluation.hit_count}\n\n"
                 message += f"💡 INSIGHT: Values have dropped below the minimum threshold\n\n"
             elif operator == 'equals':
-                triggered_values = data[data[column] == value][column].tolist()
+                triggered_values = evaluation.triggered_values
                 message += f"🎯 TYPE: Threshold Alert (Equals)\n\n"
                 message += f"📋 CONDITION:\n"
                 message += f"   • Column: {column}\n"
                 message += f"   • Target Value: = {value}\n"
                 message += f"   • Matching Values: {triggered_values[:8]}\n"
-                message += f"   • Total Matches: {len(triggered_values)}\n\n"
+                message += f"   • Total Matches: {evaluation.hit_count}\n\n"
                 message += f"💡 INSIGHT: Values matching the exact target have been detected\n\n"
             else:
-                triggered_values = data[data[column] != value][column].tolist()
+                triggered_values = evaluation.triggered_values
                 message += f"🎯 TYPE: Threshold Alert (Not Equals)\n\n"
                 message += f"📋 CONDITION:\n"
                 message += f"   • Column: {column}\n"
                 message += f"   • Excluded Value: ≠ {value}\n"
                 message += f"   • Different Values: {triggered_values[:8]}\n"
-                message += f"   • Total Different: {len(triggered_values)}\n\n"
+                message += f"   • Total Different: {evaluation.hit_count}\n\n"
                 message += f"💡 INSIGHT: Values different from the specified value detected\n\n"
         
         elif condition_type == 'anomaly':
-            Q1 = data[column].quantile(0.25)
-            Q3 = data[column].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            anomalies = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
-            anomaly_values = anomalies[column].tolist()
+            lower_bound, upper_bound = evaluation.bounds or (np.nan, np.nan)
             
             message += f"🎯 TYPE: Anomaly Detection Alert\n\n"
             message += f"📋 CONDITION:\n"
             message += f"   • Column: {column}\n"
-            message += f"   • Anomaly Values: {anomaly_values[:8]}\n"
-            message += f"   • Total Anomalies: {len(anomalies)}\n"
+            message += f"   • Anomaly Values: {evaluation.triggered_values}\n"
+            message += f"   • Total Anomalies: {evaluation.hit_count}\n"
             message += f"   • Normal Range: {lower_bound:.2f} to {upper_bound:.2f}\n\n"
             message += f"💡 INSIGHT: Unusual patterns detected outside normal behavior range\n\n"
         
         elif condition_type == 'trend':
-            last_value = data[column].iloc[-1] if len(data) > 0 else 0
-            avg_value = data[column].mean()
-            change_percent = ((last_value - avg_value) / avg_value) * 100
+            last_value = evaluation.last_value or 0
+            avg_value = evaluation.avg_value or 0
+            change_percent = evaluation.change_percent or 0
             
             trend_direction = "increasing" if operator == 'increasing' else "decreasing"
             
@@ -987,17 +1232,32 @@ Please review your dashboard for detailed insights.
             message += f"   • Actual Change: {change_percent:.2f}%\n\n"
             message += f"💡 INSIGHT: Significant {trend_direction} trend detected in the data\n\n"
         
+        elif condition_type in ROLLING_CONDITIONS:
+            window = evaluation.window or {}
+            
+            message += f"🎯 TYPE: Rolling Window Alert\n\n"
+            message += f"📋 CONDITION:\n"
+            message += f"   • Rule: {self._describe_rolling_condition(rule)}\n"
+            message += f"   • Window Statistic: {window.get('statistic', float('nan')):.2f}\n"
+            message += f"   • Rows in Window: {window.get('rows', 'N/A')}\n"
+            message += f"   • First / Latest Value: {window.get('first_value')} / {window.get('last_value')}\n\n"
+            message += f"💡 INSIGHT: Recent values moved outside the expected range for this window\n\n"
+        
         # Data statistics section
         message += "📊 DATA STATISTICS\n\n"
-        message += f"   • Total Records Analyzed: {len(data):,}\n"
-        if column in data.columns:
-            message += f"   • Current Range: {data[column].min():.2f} to {data[column].max():.2f}\n"
-            message += f"   • Latest Value: {data[column].iloc[-1]:.2f}\n"
-            message += f"   • Average Value: {data[column].mean():.2f}\n"
-            message += f"   • Median Value: {data[column].median():.2f}\n\n"
+        message += f"   • Total Records Analyzed: {stats['total_records']:,}\n"
+        if 'mean' in stats:
+            message += f"   • Current Range: {stats['min']:.2f} to {stats['max']:.2f}\n"
+            message += f"   • Latest Value: {stats['latest']:.2f}\n"
+            message += f"   • Average Value: {stats['mean']:.2f}\n"
+            message += f"   • Median Value: {stats['median']:.2f}\n\n"
         
+        return message
+    
+    def _format_email_footer(self) -> str:
+        """Recommended actions and sign-off shared by alert and digest emails"""
         # Action required section
-        message += "="*60 + "\n\n"
+        message = "="*60 + "\n\n"
         message += "🚀 RECOMMENDED ACTIONS\n\n"
         message += "🔹 Review the dashboard for detailed analysis\n"
         message += "🔹 Investigate the root cause of this alert\n"
@@ -1018,30 +1278,34 @@ Please review your dashboard for detailed insights.
         
         return message
     
-    def _create_user_notification(self, username: str, title: str, message: str):
+    def _format_digest_email_message(self, username: str, items: List[Dict]) -> str:
+        """Format one email covering every alert collected in a digest window"""
+        message = "🚨 INFERABOARD ALERT DIGEST 🚨\n\n"
+        message += "="*60 + "\n\n"
+        message += f"📊 DIGEST SUMMARY\n\n"
+        message += f"🔸 User: {username}\n"
+        message += f"🔸 Alerts: {len(items)}\n"
+        message += f"🔸 Window: {items[0]['triggered_at'][:19].replace('T', ' ')} to {items[-1]['triggered_at'][11:19]}\n\n"
+        for i, item in enumerate(items, 1):
+            message += f"   {i}. {item['rule'].get('name', 'Unnamed Rule')} ({item['triggered_at'][11:19]})\n"
+        message += "\n" + "="*60 + "\n\n"
+        
+        for i, item in enumerate(items, 1):
+            message += f"🔔 ALERT {i} OF {len(items)}: {item['rule'].get('name', 'Unnamed Rule')}\n"
+            message += f"🔸 Triggered: {item['triggered_at'][:19].replace('T', ' ')}\n\n"
+            message += self._format_alert_details(item['rule'], item['evaluation'])
+            message += "-"*60 + "\n\n"
+        
+        message += self._format_email_footer()
+        return message
+    
+    def _create_user_notification(self, username: str, title: str, message: str, alert_id: str = None):
         """Create in-app notification for user"""
+        write_start = time.perf_counter()
         try:
-            notifications_file = f"user_notifications/{username}.json"
-            notifications = []
-            
-            if os.path.exists(notifications_file):
-                with open(notifications_file, 'r') as f:
-                    notifications = json.load(f)
-            
-            notification = {
-                'id': f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
-                'title': title,
-                'message': message,
-                'timestamp': datetime.now().isoformat(),
-                'read': False,
-                'type': 'alert'
-            }
-            
-            notifications.insert(0, notification)
-            notifications = notifications[:100]
-            
-            with open(notifications_file, 'w') as f:
-                json.dump(notifications, f, indent=2)
+            notification = self.notifications.add(username, title, message, 'alert', alert_id)
+            NOTIFICATION_WRITE_SECONDS.observe(time.perf_counter() - write_start)
+            self.hub.publish(username, {'type': 'notification', 'id': notification['id'], 'title': title})
                 
             logger.info(f"Created notification for {username}: {title}")
             
@@ -1056,50 +1320,156 @@ Please review your dashboard for detailed insights.
             'equals': '=',
             'not_equals': '≠',
             'increasing': 'increasing',
-            'decreasing': 'decreasing'
+            'decreasing': 'decreasing',
+            'above': 'above',
+            'below': 'below',
+            'either': 'beyond ±'
         }
         return operator_map.get(operator, operator)
     
-    def _get_triggered_value(self, rule: Dict, data: pd.DataFrame):
-        """Get the value that triggered the alert"""
-        try:
-            condition_type = rule.get('condition_type')
-            column = rule.get('column')
-            value = rule.get('value')
-            operator = rule.get('operator')
-            
-            if condition_type == 'threshold':
-                if operator == 'greater_than':
-                    return data[data[column] > value][column].iloc[0] if len(data[data[column] > value]) > 0 else None
-                elif operator == 'less_than':
-                    return data[data[column] < value][column].iloc[0] if len(data[data[column] < value]) > 0 else None
-                elif operator == 'equals':
-                    return data[data[column] == value][column].iloc[0] if len(data[data[column] == value]) > 0 else None
-                elif operator == 'not_equals':
-                    return data[data[column] != value][column].iloc[0] if len(data[data[column] != value]) > 0 else None
-            elif condition_type == 'anomaly':
-                Q1 = data[column].quantile(0.25)
-                Q3 = data[column].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                anomalies = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
-                return anomalies[column].iloc[0] if len(anomalies) > 0 else None
-            elif condition_type == 'trend':
-                return data[column].iloc[-1] if len(data) > 0 else None
-                
-            return None
-        except Exception as e:
-            logger.error(f"Error getting triggered value: {e}")
-            return None
+    def _describe_rolling_condition(self, rule: Dict) -> str:
+        """Human-readable condition of a rolling-window rule"""
+        size, seconds, _ = window_spec(rule)
+        span = f"last {seconds / 60:g} min" if seconds is not None else f"last {size} rows"
+        column, value, operator = rule.get('column'), rule.get('value'), rule.get('operator')
+        condition_type = rule.get('condition_type')
+        if condition_type == 'rate_of_change':
+            return f"{column} {operator} by {value}% or more over the {span}"
+        if condition_type == 'rolling_zscore':
+            return f"z-score of {column} vs the {span} {self._get_operator_text(operator)} {value}"
+        aggregate = 'sum' if condition_type == 'rolling_sum' else 'mean'
+        return f"rolling {aggregate} of {column} over the {span} {self._get_operator_text(operator)} {value}"
+    
+    def get_alert_history(self, alert_id: str, hours: float = 24, limit: int = None) -> List[Dict]:
+        """Firings of one alert rule in the last ``hours`` hours, newest first"""
+        return self.alert_history.firings(alert_id, start=datetime.now() - timedelta(hours=hours), limit=limit)
+    
+    def count_alert_firings(self, alert_id: str, hours: float = 24) -> int:
+        """Number of firings of one alert rule in the last ``hours`` hours"""
+        return self.alert_history.count_firings(alert_id, start=datetime.now() - timedelta(hours=hours))
+    
+    def backtest_alert_rule(self, rule: Dict, data: pd.DataFrame, time_column: str = None,
+                            sync_interval_seconds: float = None) -> Dict:
+        """Replay a dataset through a candidate rule and report how often it would have fired"""
+        cooldown_minutes = self.alert_state.cooldown(rule).total_seconds() / 60
+        result = backtest_rule(rule, data, time_column, sync_interval_seconds, cooldown_minutes)
+        if result['success']:
+            logger.info(f"Backtested rule on {result['rows']} rows: {result['firings']} firings in {result['elapsed_ms']}ms")
+        return result
     
     def get_user_alerts(self, username: str):
         """Get all alert rules for a user"""
+        self._refresh_if_follower()
         return {alert_id: config for alert_id, config in self.alerts_config.items() 
                 if config['username'] == username}
     
+    def _is_sync_due(self, sync_config: Dict, now: datetime) -> bool:
+        """Check whether a source is due, honouring its backoff and circuit state"""
+        next_attempt = sync_config.get('next_attempt')
+        if next_attempt and now < datetime.fromisoformat(next_attempt):
+            return False
+        
+        if sync_config.get('circuit_state') == 'open':
+            # Probe window reached - let a single attempt through
+            sync_config['circuit_state'] = 'half_open'
+            logger.info(f"Circuit half-open, probing source: {sync_config['username']} - {sync_config['source_type']}")
+            return True
+        
+        last_sync = sync_config.get('last_sync')
+        sync_interval = sync_config.get('sync_interval', 60)
+        return not last_sync or (
+            now - datetime.fromisoformat(last_sync) > timedelta(seconds=sync_interval)
+        )
+    
+    def _observe_fetch(self, sync_config: Dict, fetch_start: float, data: pd.DataFrame, nbytes: int = None):
+        """Record fetch latency, rows and bytes for a source"""
+        labels = {'sync_id': sync_config.get('sync_id', ''), 'source_type': sync_config['source_type']}
+        FETCH_SECONDS.observe(time.perf_counter() - fetch_start, **labels)
+        FETCH_ROWS.inc(len(data), **labels)
+        if nbytes is not None:
+            FETCH_BYTES.inc(nbytes, **labels)
+    
+    def get_metrics_summary(self) -> Dict:
+        """Headline numbers from the sync leader's metrics"""
+        if self.is_leader:
+            text = metrics.render()
+        elif os.path.exists(self.metrics_file):
+            try:
+                with open(self.metrics_file, 'r') as f:
+                    text = f.read()
+            except OSError:
+                return {}
+        else:
+            return {}
+        
+        totals = parse_metric_totals(text, by_label='stage')
+        
+        def average_ms(name, stage=None):
+            suffix = f":{stage}" if stage else ""
+            count = totals.get(f"{name}_count{suffix}", 0)
+            return round(totals.get(f"{name}_sum{suffix}", 0) / count * 1000, 1) if count else None
+        
+        return {
+            'rows_fetched': int(totals.get('inferaboard_sync_fetched_rows_total', 0)),
+            'bytes_fetched': int(totals.get('inferaboard_sync_fetched_bytes_total', 0)),
+            'sync_failures': int(totals.get('inferaboard_sync_failures_total', 0)),
+            'avg_fetch_ms': average_ms('inferaboard_sync_fetch_seconds'),
+            'avg_change_detect_ms': average_ms('inferaboard_sync_change_detect_seconds'),
+            'alert_evaluations': int(totals.get('inferaboard_alert_evaluations_total', 0)),
+            'alert_firings': int(totals.get('inferaboard_alert_firings_total', 0)),
+            'alerts_suppressed': int(totals.get('inferaboard_alert_suppressed_total', 0)),
+            'emails_sent': int(totals.get('inferaboard_alert_emails_sent_total', 0)),
+            'email_failures': int(totals.get('inferaboard_alert_email_failures_total', 0)),
+            'avg_email_ms': average_ms('inferaboard_alert_email_send_seconds'),
+            'avg_notification_write_ms': average_ms('inferaboard_notification_write_seconds'),
+            'pipeline': {
+                stage: {
+                    'avg_wait_ms': average_ms('inferaboard_alert_pipeline_queue_wait_seconds', stage),
+                    'avg_run_ms': average_ms('inferaboard_alert_pipeline_stage_seconds', stage),
+                    'queued': int(totals.get(f'inferaboard_alert_pipeline_queue_depth:{stage}', 0)),
+                    'blocked_s': round(totals.get(f'inferaboard_alert_pipeline_blocked_seconds_total:{stage}', 0), 1)
+                }
+                for stage in ('evaluate', 'deliver')
+            }
+        }
+    
+    def _record_sync_success(self, sync_id: str, sync_config: Dict):
+        """Reset backoff and close the circuit after a successful sync"""
+        if sync_config.get('circuit_state', 'closed') != 'closed':
+            logger.info(f"Circuit closed for {sync_id} after successful sync")
+        with self.config_lock:
+            sync_config['last_sync'] = datetime.now().isoformat()
+            sync_config['consecutive_failures'] = 0
+            sync_config['circuit_state'] = 'closed'
+            sync_config['next_attempt'] = None
+            sync_config['last_error'] = None
+    
+    def _record_sync_failure(self, sync_id: str, sync_config: Dict, error: str):
+        """Schedule the next attempt with exponential backoff, opening the circuit after repeated failures"""
+        SYNC_FAILURES.inc(sync_id=sync_id, source_type=sync_config['source_type'])
+        with self.config_lock:
+            failures = sync_config.get('consecutive_failures', 0) + 1
+            sync_config['consecutive_failures'] = failures
+            sync_config['last_error'] = error
+            sync_config['last_failure'] = datetime.now().isoformat()
+            
+            if failures >= self.circuit_failure_threshold:
+                if sync_config.get('circuit_state') != 'open':
+                    logger.warning(f"Circuit opened for {sync_id} after {failures} consecutive failures: {error}")
+                sync_config['circuit_state'] = 'open'
+                delay = self.circuit_probe_seconds
+            else:
+                sync_config['circuit_state'] = 'closed'
+                delay = min(self.backoff_base_seconds * (2 ** (failures - 1)), self.backoff_max_seconds)
+                logger.warning(f"Sync failed for {sync_id} ({failures} in a row), retrying in {delay}s: {error}")
+            
+            # Jitter keeps sources that failed together from retrying in lockstep
+            delay += random.uniform(0, delay * 0.1)
+            sync_config['next_attempt'] = (datetime.now() + timedelta(seconds=delay)).isoformat()
+    
     def get_sync_status(self, username: str) -> Dict:
         """Get synchronization status for a user"""
+        self._refresh_if_follower()
         user_syncs = {
             sync_id: config for sync_id, config in self.sync_config.items()
             if config['username'] == username
@@ -1108,89 +1478,195 @@ Please review your dashboard for detailed insights.
         status = {
             'active_syncs': len([c for c in user_syncs.values() if c['is_active']]),
             'last_sync': None,
-            'next_sync': None
+            'next_sync': None,
+            'failing_syncs': 0,
+            'open_circuits': 0,
+            'sources': [],
+            'sync_role': 'leader' if self.is_leader else 'follower',
+            'leader': self.leader_lock.read_owner(),
+            'metrics': self.get_metrics_summary()
         }
         
-        active_syncs = [c for c in user_syncs.values() if c['is_active']]
+        active_syncs = {sync_id: c for sync_id, c in user_syncs.items() if c['is_active']}
         if active_syncs:
-            last_syncs = [c.get('last_sync') for c in active_syncs if c.get('last_sync')]
+            last_syncs = [c.get('last_sync') for c in active_syncs.values() if c.get('last_sync')]
             if last_syncs:
                 status['last_sync'] = max(last_syncs)
             
             next_syncs = []
-            for sync_config in active_syncs:
-                if sync_config.get('last_sync'):
+            for sync_id, sync_config in active_syncs.items():
+                if sync_config.get('next_attempt'):
+                    next_syncs.append(datetime.fromisoformat(sync_config['next_attempt']))
+                elif sync_config.get('last_sync'):
                     last_sync = datetime.fromisoformat(sync_config['last_sync'])
                     next_sync = last_sync + timedelta(seconds=sync_config.get('sync_interval', 60))
                     next_syncs.append(next_sync)
+                
+                circuit_state = sync_config.get('circuit_state', 'closed')
+                failures = sync_config.get('consecutive_failures', 0)
+                if failures:
+                    status['failing_syncs'] += 1
+                if circuit_state != 'closed':
+                    status['open_circuits'] += 1
+                
+                status['sources'].append({
+                    'sync_id': sync_id,
+                    'source_type': sync_config['source_type'],
+                    'circuit_state': circuit_state,
+                    'consecutive_failures': failures,
+                    'last_error': sync_config.get('last_error'),
+                    'next_attempt': sync_config.get('next_attempt'),
+                    'last_io_ms': sync_config.get('last_io_ms')
+                })
             
             if next_syncs:
                 status['next_sync'] = min(next_syncs).isoformat()
         
         return status
     
+    def _run_scheduled_sync(self, sync_id: str, sync_config: Dict) -> bool:
+        """Run one sync for a source and evaluate alerts if its data changed; returns whether it did"""
+        logger.info(f"Running scheduled sync for: {sync_id}")
+        sync_config.setdefault('sync_id', sync_id)
+        
+        source_type = sync_config['source_type']
+        sync_result = None
+        
+        if source_type == 'google_sheets':
+            sync_result = self.sync_google_sheets(sync_config)
+        elif source_type == 'rest_api':
+            sync_result = self.sync_rest_api(sync_config)
+        elif source_type == 'sql_database':
+            sync_result = self.sync_sql_database(sync_config)
+        else:
+            sync_result = {"success": False, "error": f"Unsupported source type: {source_type}"}
+        
+        if not sync_result.get('success'):
+            self._record_sync_failure(sync_id, sync_config, sync_result.get('error', 'Unknown error'))
+            return False
+        
+        self._record_sync_success(sync_id, sync_config)
+        
+        if sync_result.get('has_changes'):
+            logger.info(f"SYNC COMPLETED WITH CHANGES: {sync_id}")
+            
+            username = sync_config['username']
+            try:
+                if self.alert_pipeline.is_running:
+                    # Evaluation and delivery run on the pipeline workers so slow I/O never stalls other sources
+                    logger.info(f"QUEUING ALERT EVALUATION after data change for {username}")
+                    self.alert_pipeline.submit(username, sync_result['data_hash'], sync_result['data'], sync_result['delta'])
+                else:
+                    logger.info(f"CHECKING ALERT RULES after data change for {username}")
+                    triggered_alerts = self.check_alert_rules(username, sync_result['data'], sync_result['delta'])
+                    logger.info(f"ALERTS FIRED: {len(triggered_alerts)} alerts triggered for {username}")
+            except Exception as e:
+                logger.error(f"Error checking alert rules: {e}")
+        else:
+            logger.info(f"Sync completed without changes: {sync_id}")
+        return bool(sync_result.get('has_changes'))
+    
+    def _sync_source(self, sync_id: str, sync_config: Dict):
+        """Run one due source on a sync worker, persist its new status and announce real changes"""
+        health = (sync_config.get('circuit_state'), sync_config.get('last_error'))
+        data_changed = False
+        try:
+            data_changed = self._run_scheduled_sync(sync_id, sync_config)
+        except Exception as e:
+            logger.error(f"Sync worker error for {sync_id}: {e}")
+            self._record_sync_failure(sync_id, sync_config, str(e))
+        finally:
+            self._syncs_in_flight.discard(sync_id)
+        self.save_sync_config()
+        # Routine syncs only move last_sync; sessions refresh on new data or a change in source health
+        if data_changed or health != (sync_config.get('circuit_state'), sync_config.get('last_error')):
+            self._publish_change(BROADCAST, {'type': 'sync_status', 'sync_id': sync_id})
+    
+    def _merge_configs_from_disk(self):
+        """Pick up config changes written by other processes.
+        
+        Fields changed in this process since it last read or wrote the file win
+        (the leader's runtime state, a rule just edited here); everything else,
+        including rules added or deleted elsewhere, is taken from disk. Each
+        flush does the same merge before writing, so neither side overwrites
+        the other's changes.
+        """
+        for store in (self.sync_store, self.alerts_store):
+            store.merge_from_disk()
+    
+    def _refresh_if_follower(self):
+        """Re-read configs written by the sync leader when this process is not the leader"""
+        if not self.is_leader:
+            self._merge_configs_from_disk()
+    
     def start_sync_service(self):
-        """Start the real-time synchronization service"""
+        """Start the real-time synchronization service.
+        
+        Only the process holding the leader lock for the data directory runs the
+        sync loop. Others stand by and take over if the leader exits, unless
+        SYNC_MODE=follower, in which case they only read status.
+        """
         if self.is_running:
             return
         
         self.is_running = True
         
+        if self.sync_mode == 'follower':
+            logger.info("Sync service in follower mode - status is read from the sync leader")
+            return
+        
         def sync_worker():
             while self.is_running:
-                try:
-                    for sync_id, sync_config in self.sync_config.items():
-                        if sync_config['is_active']:
-                            last_sync = sync_config.get('last_sync')
-                            sync_interval = sync_config.get('sync_interval', 60)
-                            
-                            if not last_sync or (
-                                datetime.now() - datetime.fromisoformat(last_sync) > 
-                                timedelta(seconds=sync_interval)
-                            ):
-                                logger.info(f"Running scheduled sync for: {sync_id}")
-                                
-                                source_type = sync_config['source_type']
-                                sync_result = None
-                                
-                                if source_type == 'google_sheets':
-                                    sync_result = self.sync_google_sheets(sync_config)
-                                elif source_type == 'rest_api':
-                                    sync_result = self.sync_rest_api(sync_config)
-                                elif source_type == 'sql_database':
-                                    sync_result = self.sync_sql_database(sync_config)
-                                
-                                if sync_result and sync_result.get('success'):
-                                    sync_config['last_sync'] = datetime.now().isoformat()
-                                    
-                                    if sync_result.get('has_changes'):
-                                        logger.info(f"SYNC COMPLETED WITH CHANGES: {sync_id}")
-                                        
-                                        username = sync_config['username']
-                                        user_data_path = f"user_data/{username}.csv"
-                                        if os.path.exists(user_data_path):
-                                            try:
-                                                data = pd.read_csv(user_data_path)
-                                                logger.info(f"CHECKING ALERT RULES after data change for {username}")
-                                                triggered_alerts = self.check_alert_rules(username, data)
-                                                if triggered_alerts:
-                                                    logger.info(f"ALERTS FIRED: {len(triggered_alerts)} alerts triggered for {username}")
-                                                    for alert in triggered_alerts:
-                                                        logger.info(f"   {alert['rule'].get('name', 'Unnamed Rule')}")
-                                                else:
-                                                    logger.info(f"No alerts triggered for {username}")
-                                            except Exception as e:
-                                                logger.error(f"Error checking alert rules: {e}")
-                                    else:
-                                        logger.info(f"Sync completed without changes: {sync_id}")
-                                
-                                self.save_sync_config()
-                    
-                    time.sleep(10)
+                if not self.is_leader:
+                    if not self.leader_lock.try_acquire():
+                        time.sleep(self.leader_retry_seconds)
+                        continue
+                    self.is_leader = True
+                    logger.info("This process is now the sync leader")
+                    self.alert_pipeline.start()
+                    self.sync_executor = ThreadPoolExecutor(max_workers=self.sync_workers, thread_name_prefix='sync')
+                    if self.metrics_port:
+                        metrics.serve(self.metrics_port)
+                
+                self._merge_configs_from_disk()
+                
+                # Snapshot the items so sources added from the UI don't break iteration
+                for sync_id, sync_config in list(self.sync_config.items()):
+                    if not self.is_running:
+                        break
+                    if not sync_config.get('is_active') or sync_id in self._syncs_in_flight:
+                        continue
                     
-                except Exception as e:
-                    logger.error(f"Sync worker error: {e}")
-                    time.sleep(30)
+                    # Each due source runs on its own worker, so a slow or failing fetch never stalls the others;
+                    # sources that are not due are left untouched and cause no config write
+                    try:
+                        with self.config_lock:
+                            due = self._is_sync_due(sync_config, datetime.now())
+                    except Exception as e:
+                        logger.error(f"Sync worker error for {sync_id}: {e}")
+                        self._record_sync_failure(sync_id, sync_config, str(e))
+                        self.save_sync_config()
+                        continue
+                    if due:
+                        self._syncs_in_flight.add(sync_id)
+                        self.sync_executor.submit(self._sync_source, sync_id, sync_config)
+                
+                if not self.alert_pipeline.submit_task(self.send_due_digests):
+                    logger.warning("Alert delivery queue is full; digests will be sent next cycle")
+                metrics.write_textfile(self.metrics_file)
+                self.alert_history.flush()
+                time.sleep(10)
+            
+            if self.is_leader:
+                self.sync_executor.shutdown(wait=True, cancel_futures=True)
+                self._syncs_in_flight.clear()
+                self.alert_pipeline.stop()
+                self.send_due_digests(force=True)
+                self.sync_store.flush(force=True)
+                self.alerts_store.flush(force=True)
+                self.alert_history.flush()
+                self.is_leader = False
+                self.leader_lock.release()
         
         self.sync_thread = threading.Thread(target=sync_worker, daemon=True)
         self.sync_thread.start()
@@ -1200,43 +1676,96 @@ Please review your dashboard for detailed insights.
     def stop_sync_service(self):
         """Stop the real-time synchronization service"""
         self.is_running = False
+        self.sync_store.flush(force=True)
+        self.alerts_store.flush(force=True)
+        self.alert_history.flush()
         logger.info("Real-time sync service stopped")
     
-    def get_user_notifications(self, username: str, unread_only: bool = True) -> List[Dict]:
-        """Get notifications for a user"""
-        notifications_file = f"user_notifications/{username}.json"
-        
-        if not os.path.exists(notifications_file):
+    def get_user_notifications(self, username: str, unread_only: bool = True, limit: int = None) -> List[Dict]:
+        """Get notifications for a user, newest first"""
+        try:
+            return self.notifications.notifications(username, unread_only, limit)
+        except Exception as e:
+            logger.error(f"Error reading notifications: {e}")
             return []
+    
+    def _notification_filters(self, read: bool = None, alert_id: str = None, hours: float = None) -> Dict:
+        filters = {'read': read, 'alert_id': alert_id}
+        if hours:
+            filters['start'] = datetime.now() - timedelta(hours=hours)
+        return filters
+    
+    def get_notifications_page(self, username: str, page: int = 1, page_size: int = 20, read: bool = None,
+                               alert_id: str = None, hours: float = None) -> Dict:
+        """One page of a user's notifications matching the filters, newest first, with paging totals"""
+        filters = self._notification_filters(read, alert_id, hours)
+        try:
+            total = self.notifications.count(username, **filters)
+            pages = max(1, -(-total // page_size))
+            page = min(max(1, page), pages)
+            items = self.notifications.notifications(
+                username, unread_only=False, limit=page_size, offset=(page - 1) * page_size, **filters
+            )
+        except Exception as e:
+            logger.error(f"Error reading notifications page: {e}")
+            return {'items': [], 'total': 0, 'page': 1, 'pages': 1}
+        return {'items': items, 'total': total, 'page': page, 'pages': pages}
+    
+    def mark_notifications_read(self, username: str, ids: List[str] = None, alert_id: str = None,
+                                hours: float = None) -> int:
+        """Mark the given notifications, or every one matching the filters, read in a single update"""
+        try:
+            updated = self.notifications.mark_all_read(username, ids=ids, **self._notification_filters(None, alert_id, hours))
+        except Exception as e:
+            logger.error(f"Error marking notifications as read: {e}")
+            return 0
+        if updated:
+            self.hub.publish(username, {'type': 'read', 'count': updated})
+        return updated
+    
+    def delete_notifications(self, username: str, ids: List[str] = None, read: bool = None, alert_id: str = None,
+                             hours: float = None) -> int:
+        """Delete the given notifications, or every one matching the filters, in a single update"""
+        try:
+            deleted = self.notifications.delete(username, ids=ids, **self._notification_filters(read, alert_id, hours))
+        except Exception as e:
+            logger.error(f"Error deleting notifications: {e}")
+            return 0
+        if deleted:
+            self.hub.publish(username, {'type': 'deleted', 'count': deleted})
+        return deleted
+    
+    def subscribe_notifications(self, username: str):
+        """Subscription a UI session polls to learn when its notifications or sync status changed"""
+        return self.hub.subscribe(username)
+    
+    def _disk_version(self):
+        """Cheap change marker for state written by another process (the sync leader).
         
+        Config file mtimes are deliberately left out: the leader rewrites them
+        for routine bookkeeping every few seconds.
+        """
+        if self.is_leader:
+            return None
         try:
-            with open(notifications_file, 'r') as f:
-                notifications = json.load(f)
-            
-            if unread_only:
-                notifications = [n for n in notifications if not n.get('read', False)]
-            
-            return sorted(notifications, key=lambda x: x['timestamp'], reverse=True)
-        except:
-            return []
+            marker = os.stat(self.change_marker_file).st_mtime_ns
+        except OSError:
+            marker = None
+        return (self.notifications.data_version(), marker)
+    
+    def get_unread_count(self, username: str) -> int:
+        """Number of unread notifications for a user"""
+        try:
+            return self.notifications.unread_count(username)
+        except Exception as e:
+            logger.error(f"Error counting notifications: {e}")
+            return 0
     
     def mark_notification_read(self, username: str, notification_id: str):
         """Mark a notification as read"""
-        notifications_file = f"user_notifications/{username}.json"
-        
-        if not os.path.exists(notifications_file):
-            return
-        
         try:
-            with open(notifications_file, 'r') as f:
-                notifications = json.load(f)
-            
-            for notification in notifications:
-                if notification.get('id') == notification_id:
-                    notification['read'] = True
-            
-            with open(notifications_file, 'w') as f:
-                json.dump(notifications, f, indent=2)
+            if self.notifications.mark_read(username, notification_id):
+                self.hub.publish(username, {'type': 'read', 'id': notification_id})
         except Exception as e:
             logger.error(f"Error marking notification as read: {e}")
 
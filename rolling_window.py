@@ -0,0 +1,128 @@
+from typing import Dict
+
+import numpy as np
+
+ROLLING_CONDITIONS = ('rate_of_change', 'rolling_zscore', 'rolling_sum', 'rolling_mean')
+ROLLING_OPERATORS = {
+    'rate_of_change': ('increasing', 'decreasing'),
+    'rolling_zscore': ('above', 'below', 'either'),
+    'rolling_sum': ('greater_than', 'less_than'),
+    'rolling_mean': ('greater_than', 'less_than'),
+}
+DEFAULT_WINDOW_ROWS = 20
+# Largest window a rule can hold, in rows; time windows keep at most this many of their latest rows
+MAX_WINDOW_ROWS = 100_000
+
+
+def window_spec(rule: Dict):
+    """(rows, seconds, time_column) of a rolling rule; time windows need a time column"""
+    minutes = rule.get('window_minutes')
+    if minutes and rule.get('time_column'):
+        return None, float(minutes) * 60, rule['time_column']
+    return int(rule.get('window') or DEFAULT_WINDOW_ROWS), None, None
+
+
+def window_statistic(condition_type: str, values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Statistic of every window ``values[starts[i]:ends[i] + 1]``, vectorized with prefix sums.
+
+    ``rate_of_change`` is the percent change from the first to the last value,
+    ``rolling_zscore`` the z-score of the last value against the rows before
+    it, and ``rolling_sum``/``rolling_mean`` aggregate the whole window. NaN
+    values are skipped; a window without enough data yields NaN.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if condition_type == 'rate_of_change':
+            first, last = values[starts], values[ends]
+            return np.where(first != 0, (last - first) / np.abs(first) * 100, np.nan)
+
+        valid = ~np.isnan(values)
+        # Shift by a typical value so the sums of squares stay well conditioned
+        shift = values[valid][0] if valid.any() else 0.0
+        clean = np.where(valid, values - shift, 0.0)
+        sums = np.concatenate(([0.0], np.cumsum(clean)))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+
+        if condition_type == 'rolling_sum':
+            return sums[ends + 1] - sums[starts] + shift * (counts[ends + 1] - counts[starts])
+        if condition_type == 'rolling_mean':
+            count = counts[ends + 1] - counts[starts]
+            return np.where(count > 0, (sums[ends + 1] - sums[starts]) / count + shift, np.nan)
+        if condition_type == 'rolling_zscore':
+            squares = np.concatenate(([0.0], np.cumsum(clean * clean)))
+            count = counts[ends] - counts[starts]
+            mean = (sums[ends] - sums[starts]) / count
+            variance = (squares[ends] - squares[starts] - count * mean * mean) / (count - 1)
+            std = np.sqrt(np.maximum(variance, 0))
+            z = (values[ends] - shift - mean) / std
+            return np.where((count >= 2) & (std > 0), z, np.nan)
+    return np.full(len(ends), np.nan)
+
+
+def rolling_condition_met(rule: Dict, statistic: np.ndarray) -> np.ndarray:
+    """Whether each window statistic meets the rule; NaN never does"""
+    condition_type = rule.get('condition_type')
+    operator = rule.get('operator')
+    threshold = float(rule.get('value'))
+    if condition_type == 'rate_of_change':
+        return statistic >= threshold if operator == 'increasing' else statistic <= -threshold
+    if condition_type == 'rolling_zscore':
+        if operator == 'above':
+            return statistic >= threshold
+        if operator == 'below':
+            return statistic <= -threshold
+        return np.abs(statistic) >= threshold
+    if operator == 'less_than':
+        return statistic < threshold
+    return statistic > threshold
+
+
+class RollingWindow:
+    """The last ``size`` rows, or the rows from the last ``seconds``, of one column.
+
+    Kept per rolling rule and fed only the rows each sync appends, so
+    evaluating the rule costs O(window) instead of a scan of the column.
+    ``n`` counts every row seen, which lets the caller spot when the data no
+    longer matches the state and the window must be rebuilt. Windows live in
+    memory only; after a restart they are rebuilt from the tail of the data.
+    """
+
+    def __init__(self, size: int = None, seconds: float = None, max_rows: int = MAX_WINDOW_ROWS):
+        self.size = size
+        self.seconds = seconds
+        self.max_rows = max_rows
+        self.n = 0
+        self.values = np.empty(0, dtype=np.float64)
+        self.times = np.empty(0, dtype=np.int64)
+
+    def update(self, values: np.ndarray, times: np.ndarray = None):
+        """Append rows (with int64 nanosecond times for time windows) and drop those that fell out"""
+        self.n += len(values)
+        if self.seconds is not None:
+            keep = times != np.iinfo(np.int64).min  # NaT
+            self.values = np.concatenate((self.values, values[keep]))
+            self.times = np.concatenate((self.times, times[keep]))
+            if len(self.times):
+                inside = self.times >= self.times.max() - int(self.seconds * 1e9)
+                self.values, self.times = self.values[inside][-self.max_rows:], self.times[inside][-self.max_rows:]
+        else:
+            self.values = np.concatenate((self.values, values))[-self.size:]
+
+    def statistic(self, condition_type: str) -> float:
+        if len(self.values) == 0:
+            return np.nan
+        return float(window_statistic(condition_type, self.values, np.array([0]), np.array([len(self.values) - 1]))[0])
+
+    def summary(self, condition_type: str) -> Dict:
+        """Window evidence for alert messages"""
+        return {
+            'statistic': self.statistic(condition_type),
+            'rows': len(self.values),
+            'first_value': float(self.values[0]) if len(self.values) else None,
+            'last_value': float(self.values[-1]) if len(self.values) else None
+        }
+
+    def state(self) -> Dict:
+        """Shape of the window for the rule config; the rows themselves stay in memory"""
+        return {'size': self.size, 'seconds': self.seconds, 'n': self.n}
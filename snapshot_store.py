@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import logging
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa  # only needed for the columnar snapshot format
+    PARQUET_AVAILABLE = True
+    PARQUET_ERRORS = (pa.ArrowException, ValueError)
+except ImportError:
+    PARQUET_AVAILABLE = False
+    PARQUET_ERRORS = (ValueError,)
+
+logger = logging.getLogger(__name__)
+
+USER_DATA_DIR = "user_data"
+
+
+def _atomic_replace(write_func, target_path: str):
+    """Write through ``write_func(tmp_path)`` next to the target, fsync it and rename it into place"""
+    directory = os.path.dirname(target_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+    os.close(fd)
+    try:
+        write_func(tmp_path)
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SnapshotWriter:
+    """Single write path for synced datasets.
+
+    The data is serialized once (Parquet when pyarrow is installed, CSV
+    otherwise) to a temp file and atomically renamed into ``realtime_data``.
+    Frames Arrow cannot convert (e.g. object columns mixing numbers and
+    strings, common in JSON sources) are written as CSV instead.
+    ``user_data/{username}.snapshot.json`` is a small manifest pointing at
+    that file, so readers always see either the previous or the new snapshot,
+    never a half-written one.
+    """
+
+    def __init__(self, snapshot_dir: str = "realtime_data", user_data_dir: str = USER_DATA_DIR):
+        self.snapshot_dir = snapshot_dir
+        self.user_data_dir = user_data_dir
+        self.format = "parquet" if PARQUET_AVAILABLE else "csv"
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        os.makedirs(self.user_data_dir, exist_ok=True)
+
+    def snapshot_path(self, name: str, file_format: str = None) -> str:
+        return os.path.join(self.snapshot_dir, f"{name}.{file_format or self.format}")
+
+    def write_snapshot(self, data: pd.DataFrame, name: str) -> Dict:
+        """Atomically write ``data`` to the snapshot file for ``name`` and report the I/O cost"""
+        file_format = self.format
+        path = self.snapshot_path(name, file_format)
+        start = time.perf_counter()
+
+        if file_format == "parquet":
+            try:
+                _atomic_replace(lambda tmp: data.to_parquet(tmp, index=False), path)
+            except PARQUET_ERRORS as e:
+                logger.warning(f"Snapshot {name} cannot be stored as Parquet, writing CSV instead: {e}")
+                file_format = "csv"
+                path = self.snapshot_path(name, file_format)
+        if file_format == "csv":
+            _atomic_replace(lambda tmp: data.to_csv(tmp, index=False), path)
+
+        return {
+            'path': path,
+            'format': file_format,
+            'bytes_written': os.path.getsize(path),
+            'write_seconds': time.perf_counter() - start
+        }
+
+    def publish(self, data: pd.DataFrame, username: str, name: str) -> Dict:
+        """Write the snapshot once and point the user's dataset manifest at it"""
+        result = self.write_snapshot(data, name)
+
+        start = time.perf_counter()
+        manifest = {
+            'path': result['path'],
+            'format': result['format'],
+            'rows': len(data),
+            'columns': len(data.columns),
+            'updated_at': datetime.now().isoformat()
+        }
+        manifest_path = manifest_path_for(username, self.user_data_dir)
+
+        def write_manifest(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+
+        _atomic_replace(write_manifest, manifest_path)
+        result['manifest_path'] = manifest_path
+        result['io_seconds'] = result['write_seconds'] + (time.perf_counter() - start)
+        return result
+
+
+def manifest_path_for(username: str, user_data_dir: str = USER_DATA_DIR) -> str:
+    return os.path.join(user_data_dir, f"{username}.snapshot.json")
+
+
+def clear_snapshot_manifest(username: str, user_data_dir: str = USER_DATA_DIR):
+    """Drop the sync manifest so an uploaded CSV takes precedence again"""
+    manifest_path = manifest_path_for(username, user_data_dir)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def read_snapshot(path: str, file_format: str) -> pd.DataFrame:
+    if file_format == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_user_dataset(username: str, user_data_dir: str = USER_DATA_DIR) -> Optional[pd.DataFrame]:
+    """Load a user's current dataset: the latest synced snapshot if any, otherwise the uploaded CSV"""
+    manifest_path = manifest_path_for(username, user_data_dir)
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            return read_snapshot(manifest['path'], manifest['format'])
+        except Exception as e:
+            logger.warning(f"Could not read synced snapshot for {username}, falling back to CSV: {e}")
+
+    csv_path = os.path.join(user_data_dir, f"{username}.csv")
+    if os.path.exists(csv_path):
+        return pd.read_csv(csv_path)
+    return None
@@ -0,0 +1,135 @@
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict
+
+import numpy as np
+
+MAX_LIST_ITEMS = 10
+# Third-party loggers that flood the alert log at INFO/DEBUG (image export, HTTP, plotting)
+NOISY_LOGGERS = ('kaleido', 'choreographer', 'urllib3', 'matplotlib', 'PIL', 'httpx', 'httpcore', 'asyncio')
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def truncate_values(values, limit: int = MAX_LIST_ITEMS):
+    """A loggable copy of ``values``: at most ``limit`` items plus a count of the rest"""
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    if not isinstance(values, (list, tuple)) or len(values) <= limit:
+        return values
+    return list(values[:limit]) + [f"... {len(values) - limit} more"]
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return truncate_values(value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any ``fields`` extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in getattr(record, 'fields', {}).items():
+            entry[key] = _jsonable(value)
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most ``burst`` records per message key through every ``interval`` seconds.
+
+    The key is the ``key`` extra when given, otherwise the call site (logger
+    and line), so a message logged per rule per cycle counts as one stream.
+    Records at WARNING and above always pass. The first record let through
+    after a quiet period carries how many were dropped in ``suppressed``.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.burst <= 0:
+            return True
+        key = getattr(record, 'key', None) or (record.name, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                dropped = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if dropped:
+                    record.suppressed = dropped
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+def configure_logging(log_file: str = 'realtime_alerts.log', level: int = logging.INFO,
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                      burst: int = 20, interval: float = 60.0) -> QueueListener:
+    """Route all logging through a queue to a rotating JSON file and the console.
+
+    Callers only pay for putting the record on an in-memory queue; a
+    background listener formats and writes it. Safe to call more than once:
+    only the first call installs the handlers.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(burst, interval))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        for name in NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Write out queued records and stop the background listener"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
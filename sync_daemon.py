@@ -0,0 +1,47 @@
+"""Run the real-time sync service as a standalone daemon.
+
+Start one (or more, for failover) of these next to the Streamlit app and run
+the app with SYNC_MODE=follower so UI processes only read sync status:
+
+    python sync_daemon.py
+    SYNC_MODE=follower streamlit run main_dashboard.py
+
+Only the process holding realtime_data/sync_leader.lock runs the sync loop;
+a standby daemon takes over when the leader exits.
+"""
+import signal
+import threading
+import logging
+
+from realtime_alerts_manager import realtime_manager
+
+logger = logging.getLogger("sync_daemon")
+
+
+def main():
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down sync daemon")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    if realtime_manager.sync_mode == 'follower':
+        logger.warning("SYNC_MODE=follower is meant for UI processes; the daemon will compete for leadership")
+        realtime_manager.sync_mode = 'auto'
+
+    realtime_manager.start_sync_service()
+    logger.info("Sync daemon running - waiting for leadership if another process holds the lock")
+
+    while not stop_event.wait(1):
+        pass
+
+    realtime_manager.stop_sync_service()
+    if realtime_manager.sync_thread is not None:
+        realtime_manager.sync_thread.join(timeout=15)
+
+
+if __name__ == "__main__":
+    main()
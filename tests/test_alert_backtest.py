@@ -0,0 +1,54 @@
+import os
+import sys
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alert_backtest import backtest_rule
+
+THRESHOLD_RULE = {'condition_type': 'threshold', 'column': 'value', 'operator': 'greater_than', 'value': 5}
+
+
+def test_rows_with_nat_time_are_dropped_and_counted():
+    data = pd.DataFrame({
+        'ts': ['2024-01-01 00:00', None, '2024-01-01 00:10', '2024-01-02 00:00', 'not a date'],
+        'value': [10, 10, 1, 10, 10]
+    })
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        result = backtest_rule(THRESHOLD_RULE, data, time_column='ts')
+
+    assert result['success']
+    assert result['rows'] == 3
+    assert result['dropped_rows'] == 2
+    assert result['firings'] == 2
+    assert result['firings_per_day'] == 2.0
+    assert result['firing_times'] == ['2024-01-01T00:00:00', '2024-01-02T00:00:00']
+
+
+def test_rolling_time_window_ignores_nat_rows():
+    times = list(pd.date_range('2024-01-01', periods=6, freq='min'))
+    times[2] = None
+    data = pd.DataFrame({'ts': times, 'value': [1.0, 1.0, 100.0, 1.0, 1.0, 1.0]})
+    rule = {'condition_type': 'rolling_sum', 'column': 'value', 'operator': 'greater_than', 'value': 2.5,
+            'window_minutes': 2, 'time_column': 'ts'}
+
+    result = backtest_rule(rule, data)
+
+    assert result['success']
+    assert result['dropped_rows'] == 1
+    # Rows remain at minutes 0, 1, 3, 4 and 5; only the window ending at minute 5 holds three of them
+    assert result['condition_met'] == 1
+    assert result['firing_times'] == ['2024-01-01T00:05:00']
+
+
+def test_all_nat_times_report_an_error():
+    data = pd.DataFrame({'ts': [None, None], 'value': [1, 2]})
+
+    result = backtest_rule(THRESHOLD_RULE, data, time_column='ts')
+
+    assert not result['success']
+    assert 'ts' in result['error']
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_store import JsonConfigStore
+
+
+def _stores(tmp_path):
+    path = str(tmp_path / "alerts_config.json")
+    seed = JsonConfigStore(path)
+    seed.data.update({'rule_a': {'is_active': True, 'trigger_count': 0}})
+    seed.mark_dirty()
+    seed.flush(force=True)
+    leader, ui = JsonConfigStore(path), JsonConfigStore(path)
+    leader.load()
+    ui.load()
+    return path, leader, ui
+
+
+def _pause():
+    # Give the next write a different mtime on coarse-grained filesystems
+    time.sleep(0.01)
+
+
+def test_leader_flush_keeps_rule_added_by_ui(tmp_path):
+    path, leader, ui = _stores(tmp_path)
+
+    ui.data['rule_b'] = {'is_active': True, 'trigger_count': 0}
+    ui.mark_dirty()
+    ui.flush(force=True)
+    _pause()
+
+    leader.data['rule_a']['trigger_count'] = 3
+    leader.mark_dirty()
+    leader.flush(force=True)
+
+    reader = JsonConfigStore(path)
+    data = reader.load()
+    assert set(data) == {'rule_a', 'rule_b'}
+    assert data['rule_a']['trigger_count'] == 3
+    assert 'rule_b' in leader.data
+    assert not leader.changed_on_disk()
+
+
+def test_fields_changed_on_both_sides_are_merged(tmp_path):
+    path, leader, ui = _stores(tmp_path)
+
+    ui.data['rule_a']['is_active'] = False
+    ui.mark_dirty()
+    ui.flush(force=True)
+    _pause()
+
+    leader.data['rule_a']['trigger_count'] = 1
+    leader.mark_dirty()
+    leader.flush(force=True)
+
+    data = JsonConfigStore(path).load()
+    assert data['rule_a'] == {'is_active': False, 'trigger_count': 1}
+
+
+def test_merge_from_disk_applies_deletions_and_keeps_entry_identity(tmp_path):
+    path, leader, ui = _stores(tmp_path)
+    rule_a = leader.data['rule_a']
+
+    ui.data['rule_b'] = {'is_active': True}
+    ui.mark_dirty()
+    ui.flush(force=True)
+    _pause()
+    ui.data['rule_a']['is_active'] = False
+    del ui.data['rule_b']
+    ui.mark_dirty()
+    ui.flush(force=True)
+
+    assert leader.merge_from_disk()
+    assert set(leader.data) == {'rule_a'}
+    assert leader.data['rule_a'] is rule_a
+    assert rule_a['is_active'] is False
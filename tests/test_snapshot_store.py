@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot_store import PARQUET_AVAILABLE, SnapshotWriter, load_user_dataset
+
+
+def test_mixed_object_column_falls_back_to_csv(tmp_path):
+    writer = SnapshotWriter(str(tmp_path / "realtime_data"), str(tmp_path / "user_data"))
+    # REST/JSON sources routinely return columns mixing numbers and strings
+    data = pd.DataFrame({'id': [1, 2, 3, 4], 'value': [10, 'n/a', 12.5, None]})
+
+    result = writer.publish(data, "alice", "alice_api")
+
+    assert result['format'] == "csv"
+    assert result['path'].endswith(".csv")
+    assert os.path.exists(result['path'])
+    loaded = load_user_dataset("alice", str(tmp_path / "user_data"))
+    assert len(loaded) == 4
+    assert list(loaded.columns) == ['id', 'value']
+
+
+def test_clean_frame_uses_configured_format(tmp_path):
+    writer = SnapshotWriter(str(tmp_path / "realtime_data"), str(tmp_path / "user_data"))
+    data = pd.DataFrame({'id': [1, 2, 3], 'value': [1.5, 2.5, 3.5]})
+
+    result = writer.publish(data, "bob", "bob_api")
+
+    assert result['format'] == ("parquet" if PARQUET_AVAILABLE else "csv")
+    loaded = load_user_dataset("bob", str(tmp_path / "user_data"))
+    pd.testing.assert_frame_equal(loaded, data)